@@ -0,0 +1,168 @@
+# app/arrow.py
+"""
+Arrow IPC batch scoring
+
+``POST /batch_predict/arrow`` takes an Arrow IPC stream with one column per
+``CustomerData`` field and returns an Arrow IPC stream with one row per
+input row. Numeric columns are read as NumPy views of the Arrow buffers
+when they have a single chunk and no nulls. String columns are
+dictionary-encoded, so validation and one-hot encoding work on the codes
+and run once per category rather than once per row. Needs pyarrow.
+"""
+
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .features import CategoricalColumn
+from .model import RISK_LEVELS, RISK_THRESHOLDS, ChurnPredictor
+from .schema import CustomerData
+from .timing import stage
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional dependency
+    pa = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+PREDICTIONS = ["No", "Yes"]
+
+
+class ArrowInputError(ValueError):
+    """Raised when an Arrow payload does not match the CustomerData columns"""
+
+
+def pyarrow_available() -> bool:
+    return pa is not None
+
+
+def _categorical(column) -> CategoricalColumn:
+    if not pa.types.is_dictionary(column.type):
+        column = pc.dictionary_encode(column)
+    codes = column.indices
+    if codes.null_count:
+        codes = pc.fill_null(codes, -1)
+    return CategoricalColumn(
+        codes=codes.to_numpy(zero_copy_only=False),
+        categories=column.dictionary.to_pylist(),
+    )
+
+
+def read_columns(table) -> Tuple[Dict[str, object], int]:
+    """Turn an Arrow table into the column arrays FeatureEncoder understands"""
+    # One chunk per column, sharing one dictionary for dictionary columns
+    table = table.unify_dictionaries().combine_chunks()
+    columns = {}
+    for name, field in CustomerData.model_fields.items():
+        if name not in table.column_names:
+            raise ArrowInputError(f"Missing column: {name}")
+        column = table.column(name)
+        column = column.chunk(0) if column.num_chunks else pa.array([], column.type)
+        value_type = column.type
+        if pa.types.is_dictionary(value_type):
+            value_type = value_type.value_type
+
+        if field.annotation is str:
+            if not (
+                pa.types.is_string(value_type) or pa.types.is_large_string(value_type)
+            ):
+                raise ArrowInputError(f"Column {name} must be a string column")
+            columns[name] = _categorical(column)
+        else:
+            if not (
+                pa.types.is_integer(value_type) or pa.types.is_floating(value_type)
+            ):
+                raise ArrowInputError(f"Column {name} must be a numeric column")
+            # Zero-copy for primitive columns without nulls; nulls become NaN
+            values = column.to_numpy(zero_copy_only=False)
+            columns[name] = values.astype(np.float64, copy=False)
+    return columns, table.num_rows
+
+
+def _dictionary(codes: np.ndarray, valid: np.ndarray, categories):
+    indices = pa.array(codes.astype(np.int8), mask=~valid, type=pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, pa.array(categories, pa.string()))
+
+
+def _error_column(errors: Mapping[int, str], n_rows: int):
+    if not errors:
+        return pa.nulls(n_rows, pa.string())
+    messages = sorted(set(errors.values()))
+    positions = {message: code for code, message in enumerate(messages)}
+    codes = np.full(n_rows, -1, dtype=np.int32)
+    rows = np.fromiter(errors, dtype=np.intp, count=len(errors))
+    codes[rows] = [positions[errors[i]] for i in rows.tolist()]
+    indices = pa.array(codes, mask=codes < 0, type=pa.int32())
+    return pa.DictionaryArray.from_arrays(indices, pa.array(messages, pa.string()))
+
+
+def _response_ipc(predictor, table, scored, errors, id_column) -> bytes:
+    """Write the scored rows as an Arrow IPC stream"""
+    n_rows = table.num_rows
+    probabilities = scored["churn_probability"]
+    valid = ~np.isnan(probabilities)
+    filled = np.where(valid, probabilities, 0.0)
+    arrays = [
+        pa.array(probabilities, mask=~valid),
+        _dictionary(scored["churn_prediction"] == "Yes", valid, PREDICTIONS),
+        pa.array(scored["confidence"], mask=~valid),
+        _dictionary(
+            np.searchsorted(RISK_THRESHOLDS, filled, "right"),
+            valid,
+            RISK_LEVELS.tolist(),
+        ),
+        _error_column(errors, n_rows),
+    ]
+    names = [
+        "churn_probability",
+        "churn_prediction",
+        "confidence",
+        "risk_level",
+        "error",
+    ]
+    if id_column is not None:
+        arrays.insert(0, table.column(id_column).combine_chunks())
+        names.insert(0, id_column)
+
+    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+    batch = batch.replace_schema_metadata(
+        {"model_version": predictor.model_version or ""}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+
+    return sink.getvalue().to_pybytes()
+
+
+def score_ipc(
+    predictor: ChurnPredictor, body: bytes, id_column: Optional[str] = None
+) -> Tuple[bytes, np.ndarray, np.ndarray]:
+    """Score an Arrow IPC stream of customers
+
+    Returns the response IPC stream, plus the prediction and risk level of
+    the scored rows for metrics.
+    """
+    with stage("parse"):
+        try:
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        except pa.ArrowException as e:
+            raise ArrowInputError(f"Invalid Arrow IPC stream: {e}")
+        if id_column is not None and id_column not in table.column_names:
+            raise ArrowInputError(f"Missing id column: {id_column}")
+        columns, n_rows = read_columns(table)
+
+    with stage("validate"):
+        errors = predictor.get_validator().column_errors(columns, n_rows)
+    X, encode_errors = predictor.preprocess_columns(columns, n_rows)
+    for i, error in encode_errors.items():
+        errors.setdefault(i, error)
+    scored = predictor.predict_arrays(X, errors)
+
+    with stage("serialize"):
+        content = _response_ipc(predictor, table, scored, errors, id_column)
+
+    valid = ~np.isnan(scored["churn_probability"])
+    return content, scored["churn_prediction"][valid], scored["risk_level"][valid]
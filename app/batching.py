@@ -0,0 +1,150 @@
+# app/batching.py
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from prometheus_client import Histogram
+
+logger = logging.getLogger(__name__)
+
+microbatch_size = Histogram(
+    "churn_microbatch_size",
+    "Number of /predict requests scored together in one micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+microbatch_wait = Histogram(
+    "churn_microbatch_queue_wait_seconds",
+    "Time a /predict request waited in the micro-batch queue",
+    buckets=(0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-customer predictions into batch calls
+
+    Requests are queued and a background task drains the queue into batches
+    of at most ``max_batch_size``, waiting no longer than ``max_wait_ms``
+    after the first request of a batch arrives. Each batch is scored with a
+    single ``predict_batch`` call and every caller gets its own result.
+    Customers submitted with a ``predictor`` are only batched with others
+    for the same predictor, which is passed to ``predict_batch`` as its
+    second argument, so a request keeps the model it started with.
+    ``predict_batch`` may be a plain function or a coroutine function (e.g.
+    one that runs the batch in the inference pool); in the latter case the
+    next batch is collected while the previous one is still being scored.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Dict]], List[Dict]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Strong references to batches still being scored
+        self._dispatching = set()
+
+    def _ensure_started(self):
+        """Start the worker on the running event loop if it isn't already"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._loop is loop and not self._task.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run())
+
+    async def submit(self, customer: Dict, predictor=None) -> Dict:
+        """Queue one customer and wait for its prediction"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((customer, future, time.perf_counter(), predictor))
+        return await future
+
+    async def stop(self):
+        """Stop the worker and fail any requests still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if self._dispatching:
+            await asyncio.gather(*self._dispatching, return_exceptions=True)
+        while not self._queue.empty():
+            _, future, _, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+        self._task = None
+
+    async def _collect(self) -> List:
+        """Wait for the first request, then fill the batch until size or deadline"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            dispatched = time.perf_counter()
+
+            microbatch_size.observe(len(batch))
+            for _, _, enqueued, _ in batch:
+                microbatch_wait.observe(dispatched - enqueued)
+
+            # One call per predictor, in case a model reload split the batch
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[3]), []).append(item)
+            for group in groups.values():
+                task = self._loop.create_task(self._dispatch(group))
+                self._dispatching.add(task)
+                task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch: List):
+        """Score a batch and hand each caller its own result"""
+        customers = [customer for customer, _, _, _ in batch]
+        predictor = batch[0][3]
+        try:
+            if predictor is None:
+                results = self.predict_batch(customers)
+            else:
+                results = self.predict_batch(customers, predictor)
+            if inspect.isawaitable(results):
+                results = await results
+        except Exception as e:
+            logger.error(f"Micro-batch prediction error: {str(e)}")
+            results = [e] * len(batch)
+
+        for (_, future, _, _), result in zip(batch, results):
+            if future.done():
+                # Caller went away (e.g. client disconnected)
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            elif "error" in result:
+                future.set_exception(ValueError(result["error"]))
+            else:
+                future.set_result(result)
@@ -0,0 +1,169 @@
+# app/bundle.py
+"""
+Single-file model bundle
+
+A bundle holds the estimator, scaler, feature layout and training metadata
+in one uncompressed joblib file, followed by a SHA-256 trailer over the
+pickle bytes. Being uncompressed, the NumPy arrays inside can be
+memory-mapped (``mmap_mode="r"``) so several worker processes on one host
+share them through the page cache instead of each holding a private copy.
+
+Convert existing artifacts with:
+    python -m app.bundle --model-dir app --output app/churn_bundle.joblib
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import joblib
+import sklearn
+
+from .features import FeatureEncoder
+
+BUNDLE_FILENAME = "churn_bundle.joblib"
+FORMAT_VERSION = 1
+
+_TRAILER_PREFIX = b"\nCHURN-BUNDLE-SHA256:"
+_TRAILER_SIZE = len(_TRAILER_PREFIX) + 64
+
+
+class BundleError(Exception):
+    """Raised when a bundle is missing, corrupt or of an unknown format"""
+
+
+def _file_sha256(path: Path, length: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def save_bundle(
+    path: Path,
+    model,
+    scaler,
+    feature_names: List[str],
+    metadata: Optional[Dict] = None,
+) -> str:
+    """Write a bundle atomically and return its checksum
+
+    The file is written next to ``path`` and renamed into place, so processes
+    that still have the previous bundle memory-mapped keep a valid file.
+    """
+    path = Path(path)
+    feature_names = list(feature_names)
+    payload = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "scaler": scaler,
+        "feature_layout": {
+            "feature_names": feature_names,
+            "categories": FeatureEncoder(feature_names).categories,
+        },
+        "metadata": {
+            "model_type": type(model).__name__,
+            "created_at": time.time(),
+            "sklearn_version": sklearn.__version__,
+            **(metadata or {}),
+        },
+    }
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        # No compression: compressed arrays cannot be memory-mapped
+        joblib.dump(payload, tmp_name)
+        checksum = _file_sha256(Path(tmp_name), os.path.getsize(tmp_name))
+        with open(tmp_name, "ab") as f:
+            f.write(_TRAILER_PREFIX + checksum.encode())
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return checksum
+
+
+def read_checksum(path: Path) -> str:
+    """Return the checksum recorded in a bundle's trailer"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < _TRAILER_SIZE:
+            raise BundleError(f"Not a model bundle: {path}")
+        f.seek(-_TRAILER_SIZE, os.SEEK_END)
+        trailer = f.read()
+    if not trailer.startswith(_TRAILER_PREFIX):
+        raise BundleError(f"Not a model bundle: {path}")
+    return trailer[-64:].decode()
+
+
+def verify_bundle(path: Path) -> str:
+    """Check the bundle against its recorded checksum and return it"""
+    expected = read_checksum(path)
+    actual = _file_sha256(path, os.path.getsize(path) - _TRAILER_SIZE)
+    if actual != expected:
+        raise BundleError(f"Checksum mismatch for {path}: bundle is corrupt")
+    return expected
+
+
+def load_bundle(
+    path: Path, mmap_mode: Optional[str] = "r", verify: bool = True
+) -> Dict:
+    """Load a bundle, memory-mapping its arrays unless mmap_mode is None"""
+    path = Path(path)
+    if not path.exists():
+        raise BundleError(f"Bundle not found: {path}")
+    checksum = verify_bundle(path) if verify else read_checksum(path)
+
+    payload = joblib.load(path, mmap_mode=mmap_mode)
+    if payload.get("format_version") != FORMAT_VERSION:
+        raise BundleError(
+            f"Unsupported bundle format {payload.get('format_version')} in {path}"
+        )
+    payload["checksum"] = checksum
+    return payload
+
+
+def main(argv=None):
+    from .model import ChurnPredictor
+
+    parser = argparse.ArgumentParser(description="Build a model bundle")
+    parser.add_argument(
+        "--model-dir",
+        type=Path,
+        default=Path(__file__).parent,
+        help="Directory holding churn_model.pkl, scaler.pkl and feature_names.pkl",
+    )
+    parser.add_argument("--output", type=Path, help="Bundle path to write")
+    args = parser.parse_args(argv)
+
+    predictor = ChurnPredictor()
+    predictor.model_path = args.model_dir
+    if not predictor.load_legacy_artifacts():
+        raise SystemExit(f"Failed to load model artifacts from {args.model_dir}")
+
+    output = args.output or args.model_dir / BUNDLE_FILENAME
+    checksum = save_bundle(
+        output,
+        predictor.model,
+        predictor.scaler,
+        predictor.feature_names,
+        metadata={"source": "legacy artifacts"},
+    )
+    print(f"Wrote {output} (sha256 {checksum})")
+
+
+if __name__ == "__main__":
+    main()
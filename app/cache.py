@@ -0,0 +1,85 @@
+# app/cache.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter
+
+cache_hits = Counter("churn_prediction_cache_hits_total", "Prediction cache hits")
+cache_misses = Counter("churn_prediction_cache_misses_total", "Prediction cache misses")
+cache_evictions = Counter(
+    "churn_prediction_cache_evictions_total",
+    "Prediction cache evictions",
+    ["reason"],
+)
+
+
+def customer_key(customer_data: Dict) -> bytes:
+    """Canonical, field-order independent hash of validated customer data"""
+    canonical = json.dumps(customer_data, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+
+class PredictionCache:
+    """Size-bounded LRU cache of predictions with TTL expiry
+
+    Entries belong to the model they were computed with: looking up with a
+    different model object (e.g. after a reload) clears the cache first.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._model = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_model(self, model: Any):
+        if model is not self._model:
+            if self._entries:
+                cache_evictions.labels(reason="model_reload").inc(len(self._entries))
+            self._entries.clear()
+            self._model = model
+
+    def get(self, customer_data: Dict, model: Any) -> Optional[Any]:
+        """Return the cached prediction for this customer and model, if fresh"""
+        key = customer_key(customer_data)
+        with self._lock:
+            self._check_model(model)
+            entry = self._entries.get(key)
+            if entry is None:
+                cache_misses.inc()
+                return None
+
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                cache_evictions.labels(reason="expired").inc()
+                cache_misses.inc()
+                return None
+
+            self._entries.move_to_end(key)
+            cache_hits.inc()
+            return value
+
+    def put(self, customer_data: Dict, model: Any, value: Any):
+        """Store a prediction, evicting the least recently used entry if full"""
+        key = customer_key(customer_data)
+        with self._lock:
+            self._check_model(model)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                cache_evictions.labels(reason="size").inc()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
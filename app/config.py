@@ -0,0 +1,99 @@
+# app/config.py
+
+import os
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# Micro-batching of concurrent /predict requests
+MICRO_BATCH_ENABLED = env_bool("MICRO_BATCH_ENABLED", False)
+MICRO_BATCH_MAX_SIZE = env_int("MICRO_BATCH_MAX_SIZE", 32)
+MICRO_BATCH_MAX_WAIT_MS = env_float("MICRO_BATCH_MAX_WAIT_MS", 2.0)
+
+# Pool that runs blocking inference off the event loop ("thread" or "process")
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = env_int("INFERENCE_WORKERS", min(4, os.cpu_count() or 1))
+INFERENCE_MAX_QUEUE = env_int("INFERENCE_MAX_QUEUE", 64)
+
+# Customers scored per chunk by /batch_predict/stream
+STREAM_CHUNK_SIZE = env_int("STREAM_CHUNK_SIZE", 1000)
+
+# In-process LRU cache of /predict results
+PREDICTION_CACHE_ENABLED = env_bool("PREDICTION_CACHE_ENABLED", False)
+PREDICTION_CACHE_SIZE = env_int("PREDICTION_CACHE_SIZE", 10000)
+PREDICTION_CACHE_TTL_SECONDS = env_float("PREDICTION_CACHE_TTL_SECONDS", 3600)
+
+# Hot model reload
+MODEL_WATCH_ENABLED = env_bool("MODEL_WATCH_ENABLED", False)
+MODEL_WATCH_INTERVAL_SECONDS = env_float("MODEL_WATCH_INTERVAL_SECONDS", 10.0)
+# When set, POST /admin/reload requires a matching X-Admin-Token header
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Model bundle loading: memory-map arrays and verify the bundle checksum
+MODEL_MMAP = env_bool("MODEL_MMAP", True)
+MODEL_BUNDLE_VERIFY = env_bool("MODEL_BUNDLE_VERIFY", True)
+
+# Fold the StandardScaler into the estimator at load time ("fused" inference)
+FUSED_SCALER = env_bool("FUSED_SCALER", False)
+FUSED_SCALER_TOLERANCE = env_float("FUSED_SCALER_TOLERANCE", 1e-9)
+
+# NumPy tree-ensemble engine for batches of at most TREE_ENGINE_MAX_ROWS rows
+TREE_ENGINE = env_bool("TREE_ENGINE", False)
+TREE_ENGINE_MAX_ROWS = env_int("TREE_ENGINE_MAX_ROWS", 64)
+
+# Inference precision ("float64" or "float32") and the customers CSV used for
+# the load-time accuracy report (synthetic rows around the scaler mean if unset)
+INFERENCE_PRECISION = os.getenv("INFERENCE_PRECISION", "float64")
+PRECISION_REFERENCE_DATA = os.getenv("PRECISION_REFERENCE_DATA")
+
+# Per-stage latency histograms, and the same durations in a Server-Timing
+# response header
+STAGE_TIMING_ENABLED = env_bool("STAGE_TIMING_ENABLED", True)
+SERVER_TIMING_ENABLED = env_bool("SERVER_TIMING_ENABLED", False)
+
+# Asynchronous log of every prediction (ndjson or parquet), written in batches
+# by a background task. PREDICTION_LOG_OVERFLOW decides what happens when the
+# queue is full: drop_new, drop_oldest, or block for up to
+# PREDICTION_LOG_BLOCK_TIMEOUT_MS before dropping
+PREDICTION_LOG_ENABLED = env_bool("PREDICTION_LOG_ENABLED", False)
+PREDICTION_LOG_DIR = os.getenv("PREDICTION_LOG_DIR", "prediction_logs")
+PREDICTION_LOG_FORMAT = os.getenv("PREDICTION_LOG_FORMAT", "ndjson")
+PREDICTION_LOG_MAX_QUEUE = env_int("PREDICTION_LOG_MAX_QUEUE", 100000)
+PREDICTION_LOG_BATCH_SIZE = env_int("PREDICTION_LOG_BATCH_SIZE", 1000)
+PREDICTION_LOG_FLUSH_INTERVAL_SECONDS = env_float(
+    "PREDICTION_LOG_FLUSH_INTERVAL_SECONDS", 1.0
+)
+PREDICTION_LOG_ROTATE_MB = env_float("PREDICTION_LOG_ROTATE_MB", 100)
+PREDICTION_LOG_OVERFLOW = os.getenv("PREDICTION_LOG_OVERFLOW", "drop_new")
+PREDICTION_LOG_BLOCK_TIMEOUT_MS = env_float("PREDICTION_LOG_BLOCK_TIMEOUT_MS", 5.0)
+
+# Sliding-window drift of features and predictions against the reference
+# profile in the model bundle (or DRIFT_PROFILE_PATH, a JSON file), exported
+# as PSI/KS gauges every DRIFT_UPDATE_INTERVAL_SECONDS once the window holds
+# DRIFT_MIN_ROWS predictions. Scored requests wait in a queue of up to
+# DRIFT_MAX_QUEUE predictions until the next update.
+DRIFT_MONITOR_ENABLED = env_bool("DRIFT_MONITOR_ENABLED", False)
+DRIFT_PROFILE_PATH = os.getenv("DRIFT_PROFILE_PATH")
+DRIFT_WINDOW_SECONDS = env_float("DRIFT_WINDOW_SECONDS", 3600)
+DRIFT_WINDOW_BUCKETS = env_int("DRIFT_WINDOW_BUCKETS", 12)
+DRIFT_MIN_ROWS = env_int("DRIFT_MIN_ROWS", 100)
+DRIFT_UPDATE_INTERVAL_SECONDS = env_float("DRIFT_UPDATE_INTERVAL_SECONDS", 15.0)
+DRIFT_MAX_QUEUE = env_int("DRIFT_MAX_QUEUE", 100000)
@@ -0,0 +1,344 @@
+# app/drift.py
+"""
+Streaming drift monitor
+
+Training writes a reference profile into the model bundle's metadata
+(``drift_profile``):
+
+- fixed-bin histograms of the numeric features, with bin edges at the
+  training data's deciles
+- category counts of the string features
+- a histogram of the predicted churn probability on the held-out test split
+
+Request handlers hand scored requests to ``DriftMonitor.submit``, which
+only appends them to a bounded queue, as the prediction log does. Every
+``interval`` seconds a background task takes the queue and, in a thread,
+adds it to the same bins with ``observe`` (one NumPy pass per feature)
+and refreshes the gauges. The counts are kept per time bucket in a ring
+of ``buckets`` slots spanning ``window_seconds``, so memory does not grow
+with traffic and old buckets drop out of the sliding window. ``refresh``
+compares the window with the reference and sets the PSI of every feature,
+and the KS statistic of ordered ones, as Prometheus gauges. KS is
+computed on the bins, so it is a lower bound of the exact statistic.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from prometheus_client import Counter, Gauge
+
+from .features import BINARY_MAPPINGS, CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+PROBABILITY = "churn_probability"
+STRING_COLUMNS = list(BINARY_MAPPINGS) + CATEGORICAL_COLUMNS
+
+# Floor on bin proportions, so empty bins do not make the PSI infinite
+PSI_EPSILON = 1e-4
+
+drift_psi = Gauge(
+    "churn_feature_drift_psi",
+    "Population stability index of a feature in the sliding window",
+    ["feature"],
+)
+drift_ks = Gauge(
+    "churn_feature_drift_ks",
+    "Kolmogorov-Smirnov statistic of a feature in the sliding window, on bins",
+    ["feature"],
+)
+drift_window_rows = Gauge(
+    "churn_drift_window_rows", "Predictions in the drift monitor's sliding window"
+)
+drift_dropped_rows = Counter(
+    "churn_drift_dropped_rows_total",
+    "Predictions left out of the drift window because its queue was full",
+)
+
+
+def histogram(values: np.ndarray, bins: int = 10) -> Dict[str, List]:
+    """Bin edges at the deciles (for bins=10) of values, and the counts"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+    return {"edges": edges.tolist(), "counts": bin_counts(values, edges).tolist()}
+
+
+def bin_counts(values: np.ndarray, edges: Sequence[float]) -> np.ndarray:
+    """Count finite values into the len(edges) + 1 bins split at edges"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    bins = np.searchsorted(edges, values, side="right")
+    return np.bincount(bins, minlength=len(edges) + 1)
+
+
+def feature_profile(df, bins: int = 10) -> Dict[str, Dict]:
+    """Reference histograms and category counts of a raw customer frame"""
+    profile = {"numeric": {}, "categorical": {}}
+    for col in NUMERIC_COLUMNS:
+        profile["numeric"][col] = histogram(df[col].to_numpy(dtype=np.float64), bins)
+    for col in STRING_COLUMNS:
+        counts = df[col].astype(str).value_counts(sort=False)
+        profile["categorical"][col] = {
+            "categories": counts.index.tolist(),
+            "counts": counts.to_numpy().tolist(),
+        }
+    return profile
+
+
+def probability_profile(probabilities: np.ndarray, bins: int = 10) -> Dict[str, List]:
+    """Reference histogram of churn probabilities, in equal-width bins"""
+    edges = np.linspace(0, 1, bins + 1)[1:-1]
+    return {
+        "edges": edges.tolist(),
+        "counts": bin_counts(probabilities, edges).tolist(),
+    }
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two sets of bin counts"""
+    e = np.maximum(expected / max(expected.sum(), 1), PSI_EPSILON)
+    a = np.maximum(actual / max(actual.sum(), 1), PSI_EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Largest gap between the cumulative distributions of two bin counts"""
+    e = np.cumsum(expected) / max(expected.sum(), 1)
+    a = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+class _Sketch(NamedTuple):
+    """Where one feature's bins live in the window's count arrays"""
+
+    name: str
+    span: slice
+    reference: np.ndarray
+    # Numeric bin edges, or the categories in bin order (unknowns in the last bin)
+    edges: Optional[np.ndarray]
+    categories: Optional[pd.Index]
+
+    @property
+    def ordered(self) -> bool:
+        return self.edges is not None
+
+
+def load_profile(path: Optional[Path]) -> Optional[Dict]:
+    """Read a reference profile saved as JSON, or None if there is no file"""
+    if path is None or not Path(path).exists():
+        return None
+    return json.loads(Path(path).read_text())
+
+
+class DriftMonitor:
+    """Sliding-window feature and prediction distributions against a reference"""
+
+    def __init__(
+        self,
+        window_seconds: float = 3600,
+        buckets: int = 12,
+        min_rows: int = 100,
+        profile_path: Optional[Path] = None,
+        max_queue: int = 100000,
+    ):
+        self.bucket_seconds = window_seconds / buckets
+        self.buckets = buckets
+        self.min_rows = min_rows
+        self.profile_path = profile_path
+        self.max_queue = max_queue
+        self._queue: "deque[Tuple]" = deque()
+        self._queued_rows = 0
+        self.model_version = None
+        self.sketches: List[_Sketch] = []
+        self._counts = np.zeros((buckets, 0), dtype=np.int64)
+        self._rows = np.zeros(buckets, dtype=np.int64)
+        self._epochs = np.full(buckets, -1, dtype=np.int64)
+
+    @property
+    def active(self) -> bool:
+        """Whether there is a reference profile to compare with"""
+        return bool(self.sketches)
+
+    def set_reference(self, profile: Optional[Mapping], model_version=None):
+        """Compare with a new reference profile from now on, emptying the window"""
+        self.model_version = model_version
+        self.sketches = []
+        if profile is None:
+            logger.info(f"No drift reference profile for model {model_version}")
+        else:
+            features = [
+                (name, hist, np.asarray(hist["edges"]), None)
+                for name, hist in profile["numeric"].items()
+            ]
+            features += [
+                (
+                    name,
+                    # An extra bin for categories the reference never saw
+                    {"counts": counts["counts"] + [0]},
+                    None,
+                    pd.Index(counts["categories"]),
+                )
+                for name, counts in profile["categorical"].items()
+            ]
+            if "probability" in profile:
+                hist = profile["probability"]
+                features.append((PROBABILITY, hist, np.asarray(hist["edges"]), None))
+
+            start = 0
+            for name, hist, edges, categories in features:
+                reference = np.asarray(hist["counts"], dtype=np.float64)
+                stop = start + len(reference)
+                self.sketches.append(
+                    _Sketch(name, slice(start, stop), reference, edges, categories)
+                )
+                start = stop
+
+        width = self.sketches[-1].span.stop if self.sketches else 0
+        self._counts = np.zeros((self.buckets, width), dtype=np.int64)
+        self._rows[:] = 0
+        self._epochs[:] = -1
+        drift_psi.clear()
+        drift_ks.clear()
+        drift_window_rows.set(0)
+
+    def reference_for(self, predictor) -> Optional[Dict]:
+        """The profile in the model bundle, else the one at profile_path"""
+        profile = predictor.metadata.get("drift_profile")
+        if profile is None:
+            profile = load_profile(self.profile_path)
+        return profile
+
+    def _slot(self, now: float) -> int:
+        """The ring slot for time now, emptied if it held an older bucket"""
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.buckets
+        if self._epochs[slot] != epoch:
+            self._counts[slot] = 0
+            self._rows[slot] = 0
+            self._epochs[slot] = epoch
+        return slot
+
+    def observe(
+        self,
+        customers: Sequence[Dict],
+        probabilities: Sequence[float],
+        predictor,
+        now: Optional[float] = None,
+    ):
+        """Add scored customers and their churn probabilities to the window
+
+        A new model version brings its own reference profile, so the window
+        starts again when the predictor's version changes.
+        """
+        if predictor.model_version != self.model_version:
+            self.set_reference(self.reference_for(predictor), predictor.model_version)
+        if not self.sketches or not len(customers):
+            return
+
+        slot = self._slot(time.time() if now is None else now)
+        counts = self._counts[slot]
+        self._rows[slot] += len(customers)
+        frame = pd.DataFrame.from_records(customers)
+        for sketch in self.sketches:
+            if sketch.name == PROBABILITY:
+                bins = bin_counts(probabilities, sketch.edges)
+            elif sketch.ordered:
+                values = frame[sketch.name].to_numpy(dtype=np.float64)
+                bins = bin_counts(values, sketch.edges)
+            else:
+                unknown = len(sketch.categories)
+                codes = sketch.categories.get_indexer(frame[sketch.name].astype(str))
+                codes[codes < 0] = unknown
+                bins = np.bincount(codes, minlength=unknown + 1)
+            counts[sketch.span] += bins
+
+    def submit(
+        self, customers: Sequence[Dict], probabilities: Sequence[float], predictor
+    ) -> bool:
+        """Queue scored customers for the background task; False if dropped
+
+        Only appends to the queue, so it is cheap enough for the event loop.
+        """
+        rows = len(customers)
+        if not rows:
+            return True
+        if self._queued_rows + rows > self.max_queue:
+            drift_dropped_rows.inc(rows)
+            return False
+        self._queue.append((customers, probabilities, predictor, time.time()))
+        self._queued_rows += rows
+        return True
+
+    def take(self) -> List[Tuple]:
+        """Empty the queue, returning what was in it"""
+        queued = list(self._queue)
+        self._queue.clear()
+        self._queued_rows = 0
+        return queued
+
+    def update(self, queued: Sequence[Tuple], now: Optional[float] = None):
+        """Add queued requests to the window when they were submitted, then refresh"""
+        for customers, probabilities, predictor, submitted in queued:
+            self.observe(customers, probabilities, predictor, now=submitted)
+        self.refresh(now)
+
+    def window(self, now: Optional[float] = None):
+        """Counts and row total of the buckets still inside the window"""
+        epoch = int((time.time() if now is None else now) // self.bucket_seconds)
+        current = self._epochs > epoch - self.buckets
+        return self._counts[current].sum(axis=0), int(self._rows[current].sum())
+
+    def scores(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """PSI (and KS for ordered features) of every feature in the window
+
+        Empty until the window holds at least min_rows predictions.
+        """
+        if not self.sketches:
+            return {}
+        counts, rows = self.window(now)
+        if rows < self.min_rows:
+            return {}
+        scores = {}
+        for sketch in self.sketches:
+            actual = counts[sketch.span]
+            scores[sketch.name] = {"psi": psi(sketch.reference, actual)}
+            if sketch.ordered:
+                scores[sketch.name]["ks"] = ks(sketch.reference, actual)
+        return scores
+
+    def refresh(self, now: Optional[float] = None):
+        """Export the current window's drift scores as Prometheus gauges"""
+        if not self.sketches:
+            return
+        drift_window_rows.set(self.window(now)[1])
+        scores = self.scores(now)
+        if not scores:
+            # Too few rows to judge: export nothing rather than noisy scores
+            drift_psi.clear()
+            drift_ks.clear()
+            return
+        for feature, values in scores.items():
+            drift_psi.labels(feature=feature).set(values["psi"])
+            if "ks" in values:
+                drift_ks.labels(feature=feature).set(values["ks"])
+
+    async def run(self, interval: float):
+        """Update the window and gauges every interval seconds, until cancelled
+
+        The queue is taken on the event loop, so submit never races with it;
+        the binning runs in a thread.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.update, self.take())
+            except Exception as e:
+                logger.error(f"Drift monitor update failed: {e}")
@@ -0,0 +1,202 @@
+# app/executor.py
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from . import model
+from .model import ChurnPredictor, get_predictor
+from .timing import StageTimer, call_timed
+
+logger = logging.getLogger(__name__)
+
+pool_workers = Gauge(
+    "churn_inference_pool_workers", "Number of workers in the inference pool"
+)
+pool_active = Gauge(
+    "churn_inference_pool_active", "Inference calls currently running in the pool"
+)
+pool_queued = Gauge(
+    "churn_inference_pool_queued", "Inference calls waiting for a free pool worker"
+)
+pool_rejected = Counter(
+    "churn_inference_pool_rejected_total",
+    "Inference calls rejected because the pool queue was full",
+)
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference pool has no room for another call"""
+
+
+def _load_worker_model():
+    """Process pool initializer: each worker loads its own copy of the model"""
+    worker_predictor = ChurnPredictor()
+    if not worker_predictor.load_model():
+        logger.error("Inference worker failed to load model!")
+    model.swap_predictor(worker_predictor)
+
+
+def _predict(customer_data: Dict):
+    worker_predictor = get_predictor()
+    return (*worker_predictor.predict(customer_data), worker_predictor.model_version)
+
+
+def _predict_batch(customers: List[Dict]) -> List[Dict]:
+    return get_predictor().predict_batch(customers)
+
+
+def _predict_batch_arrays(customers: List[Dict]):
+    return get_predictor().predict_batch_arrays(customers)
+
+
+def _call_with_predictor(fn, *args):
+    return fn(get_predictor(), *args)
+
+
+class InferenceExecutor:
+    """Bounded pool that runs blocking inference off the event loop
+
+    ``kind="thread"`` runs the caller's predictor in-process; the sklearn and
+    NumPy kernels release the GIL for most of the work. ``kind="process"``
+    starts workers that each load the model themselves, for estimators whose
+    inference holds the GIL; ``restart`` replaces them after a model reload.
+    At most ``max_workers + max_queue`` calls are accepted at once; further
+    calls raise ``InferenceQueueFull``. Calls given a ``StageTimer`` have
+    their pipeline stages, and the time spent waiting for a worker, added
+    to it.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        pool_workers.set(max_workers)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=_load_worker_model
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            logger.info(
+                f"Started {self.kind} inference pool with {self.max_workers} workers"
+            )
+        return self._pool
+
+    def _update_gauges(self):
+        pool_active.set(min(self._in_flight, self.max_workers))
+        pool_queued.set(max(self._in_flight - self.max_workers, 0))
+
+    async def run(self, fn, *args, timer: Optional[StageTimer] = None):
+        """Run ``fn(*args)`` in the pool, rejecting the call if it is saturated"""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                pool_rejected.inc()
+                raise InferenceQueueFull("Inference queue is full")
+            self._in_flight += 1
+            self._update_gauges()
+
+        try:
+            loop = asyncio.get_running_loop()
+            if timer is None:
+                return await loop.run_in_executor(self._get_pool(), fn, *args)
+            start = time.perf_counter()
+            result, durations, elapsed = await loop.run_in_executor(
+                self._get_pool(), call_timed, fn, *args
+            )
+            # Waiting for a free worker, plus handing the call over and back
+            timer.add("queue", time.perf_counter() - start - elapsed)
+            timer.merge(durations)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._update_gauges()
+
+    async def predict(
+        self,
+        customer_data: Dict,
+        predictor: Optional[ChurnPredictor] = None,
+        timer: Optional[StageTimer] = None,
+    ):
+        """Score one customer in the pool
+
+        Returns the prediction and the version of the model that made it: the
+        worker's own model in process mode, else ``predictor``.
+        """
+        if self.kind == "process":
+            return await self.run(_predict, customer_data, timer=timer)
+        predictor = predictor or get_predictor()
+        result = await self.run(predictor.predict, customer_data, timer=timer)
+        return (*result, predictor.model_version)
+
+    async def predict_batch(
+        self,
+        customers: List[Dict],
+        predictor: Optional[ChurnPredictor] = None,
+        timer: Optional[StageTimer] = None,
+    ) -> List[Dict]:
+        """Score a batch of customers in the pool"""
+        if self.kind == "process":
+            return await self.run(_predict_batch, customers, timer=timer)
+        predictor = predictor or get_predictor()
+        return await self.run(predictor.predict_batch, customers, timer=timer)
+
+    async def predict_batch_arrays(
+        self,
+        customers: List[Dict],
+        predictor: Optional[ChurnPredictor] = None,
+        timer: Optional[StageTimer] = None,
+    ) -> Tuple[Dict[str, np.ndarray], Dict[int, str], str]:
+        """Score a batch in the pool into per-field arrays, errors and version"""
+        if self.kind == "process":
+            return await self.run(_predict_batch_arrays, customers, timer=timer)
+        predictor = predictor or get_predictor()
+        return await self.run(predictor.predict_batch_arrays, customers, timer=timer)
+
+    async def run_with_predictor(
+        self,
+        fn,
+        *args,
+        predictor: Optional[ChurnPredictor] = None,
+        timer: Optional[StageTimer] = None,
+    ):
+        """Run ``fn(predictor, *args)`` in the pool
+
+        In process mode ``fn`` runs against the worker's own model, so it must
+        be a module-level function.
+        """
+        if self.kind == "process":
+            return await self.run(_call_with_predictor, fn, *args, timer=timer)
+        return await self.run(fn, predictor or get_predictor(), *args, timer=timer)
+
+    def restart(self):
+        """Replace process workers so they load the current model files
+
+        Calls already submitted to the old pool still run to completion there.
+        """
+        if self.kind != "process" or self._pool is None:
+            return
+        old_pool, self._pool = self._pool, None
+        old_pool.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,192 @@
+# app/features.py
+
+import math
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Binary columns mapped to 0/1 (same mapping as training)
+BINARY_MAPPINGS = {
+    "gender": {"Male": 1, "Female": 0},
+    "Partner": {"Yes": 1, "No": 0},
+    "Dependents": {"Yes": 1, "No": 0},
+    "PhoneService": {"Yes": 1, "No": 0},
+    "PaperlessBilling": {"Yes": 1, "No": 0},
+}
+
+# Multi-class columns one-hot encoded as "<column>_<category>"
+CATEGORICAL_COLUMNS = [
+    "MultipleLines",
+    "InternetService",
+    "OnlineSecurity",
+    "OnlineBackup",
+    "DeviceProtection",
+    "TechSupport",
+    "StreamingTV",
+    "StreamingMovies",
+    "Contract",
+    "PaymentMethod",
+]
+
+# Raw numeric columns copied into the feature matrix
+NUMERIC_COLUMNS = ["SeniorCitizen", "tenure", "MonthlyCharges", "TotalCharges"]
+
+# Engineered features computed from tenure/MonthlyCharges/TotalCharges
+ENGINEERED_FEATURES = ["tenure_MonthlyCharges", "TotalCharges_per_Month"]
+
+
+class CategoricalColumn(NamedTuple):
+    """Dictionary-encoded string column: row values are categories[codes]
+
+    A code of -1 marks a missing value.
+    """
+
+    codes: np.ndarray
+    categories: List[str]
+
+
+class FeatureEncoder:
+    """Encode customer records into the training feature layout
+
+    The layout is compiled once from ``feature_names`` so that encoding a
+    record is a handful of dict lookups and array writes. The output matches
+    the pandas pipeline used in training (binary mapping, ``get_dummies``,
+    engineered features, zero backfill) value for value.
+    """
+
+    def __init__(self, feature_names: Sequence[str], dtype=np.float64):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        # Element type of the encoded matrices (float32 in reduced precision)
+        self.dtype = np.dtype(dtype)
+
+        # (column, output index) for values copied as-is
+        self.numeric_slots = []
+        # (column, mapping, output index) for binary columns
+        self.binary_slots = []
+        # column -> {category: output index} for one-hot columns
+        self.onehot_slots = {col: {} for col in CATEGORICAL_COLUMNS}
+        # engineered feature -> output index
+        self.engineered_slots = {}
+
+        for i, name in enumerate(self.feature_names):
+            if name in BINARY_MAPPINGS:
+                self.binary_slots.append((name, BINARY_MAPPINGS[name], i))
+            elif name in ENGINEERED_FEATURES:
+                self.engineered_slots[name] = i
+            elif name in self.onehot_slots:
+                # Raw categorical columns are dropped by get_dummies
+                continue
+            else:
+                column = self._onehot_column(name)
+                if column is not None:
+                    offset = len(column) + 1
+                    self.onehot_slots[column][name[offset:]] = i
+                else:
+                    self.numeric_slots.append((name, i))
+
+    @staticmethod
+    def _onehot_column(name: str) -> Optional[str]:
+        """Return the categorical column a dummy feature belongs to"""
+        for col in CATEGORICAL_COLUMNS:
+            if name.startswith(col + "_"):
+                return col
+        return None
+
+    @property
+    def categories(self) -> Dict[str, List[str]]:
+        """Categories seen during training for each one-hot column"""
+        return {col: list(slots) for col, slots in self.onehot_slots.items()}
+
+    def encode_into(self, customer: Dict, row: np.ndarray) -> np.ndarray:
+        """Write one encoded customer into a zeroed row of length n_features"""
+        for col, i in self.numeric_slots:
+            if col in customer:
+                row[i] = customer[col]
+
+        for col, mapping, i in self.binary_slots:
+            if col in customer:
+                row[i] = mapping.get(customer[col], math.nan)
+
+        for col, slots in self.onehot_slots.items():
+            i = slots.get(customer[col])
+            if i is not None:
+                row[i] = 1.0
+
+        tenure = customer["tenure"]
+        monthly = customer["MonthlyCharges"]
+        total = customer["TotalCharges"]
+        i = self.engineered_slots.get("tenure_MonthlyCharges")
+        if i is not None:
+            row[i] = tenure * monthly
+        i = self.engineered_slots.get("TotalCharges_per_Month")
+        if i is not None:
+            row[i] = total / (tenure + 1)
+
+        return row
+
+    def encode(self, customer: Dict) -> np.ndarray:
+        """Encode a single customer into a (1, n_features) matrix"""
+        X = np.zeros((1, self.n_features), dtype=self.dtype)
+        self.encode_into(customer, X[0])
+        return X
+
+    def encode_batch(
+        self, customers: Sequence[Dict], out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Encode customers into an (n, n_features) matrix"""
+        if out is None:
+            out = np.zeros((len(customers), self.n_features), dtype=self.dtype)
+        else:
+            out[:] = 0.0
+        for row, customer in zip(out, customers):
+            self.encode_into(customer, row)
+        return out
+
+    def encode_columns(
+        self, columns: Mapping[str, Sequence], n_rows: int
+    ) -> np.ndarray:
+        """Encode column arrays (e.g. a DataFrame chunk) without a per-row loop"""
+        X = np.zeros((n_rows, self.n_features), dtype=self.dtype)
+
+        for col, i in self.numeric_slots:
+            if col in columns:
+                X[:, i] = np.asarray(columns[col], dtype=np.float64)
+
+        for col, mapping, i in self.binary_slots:
+            if col in columns:
+                values = columns[col]
+                if isinstance(values, CategoricalColumn):
+                    # Map each category once, then gather by code (-1 -> NaN)
+                    lookup = [mapping.get(c, math.nan) for c in values.categories]
+                    X[:, i] = np.array(lookup + [math.nan])[values.codes]
+                    continue
+                values = np.asarray(values, dtype=object)
+                X[:, i] = math.nan
+                for category, code in mapping.items():
+                    X[values == category, i] = code
+
+        for col, slots in self.onehot_slots.items():
+            values = columns[col]
+            if isinstance(values, CategoricalColumn):
+                positions = {c: code for code, c in enumerate(values.categories)}
+                for category, i in slots.items():
+                    code = positions.get(category)
+                    if code is not None:
+                        X[:, i] = values.codes == code
+                continue
+            values = np.asarray(values, dtype=object)
+            for category, i in slots.items():
+                X[:, i] = values == category
+
+        tenure = np.asarray(columns["tenure"], dtype=np.float64)
+        monthly = np.asarray(columns["MonthlyCharges"], dtype=np.float64)
+        total = np.asarray(columns["TotalCharges"], dtype=np.float64)
+        i = self.engineered_slots.get("tenure_MonthlyCharges")
+        if i is not None:
+            X[:, i] = tenure * monthly
+        i = self.engineered_slots.get("TotalCharges_per_Month")
+        if i is not None:
+            X[:, i] = total / (tenure + 1)
+
+        return X
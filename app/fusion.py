@@ -0,0 +1,150 @@
+# app/fusion.py
+"""
+Fold a fitted StandardScaler into the estimator
+
+With z = (x - mean) / scale, a linear decision function w.z + b equals
+(w / scale).x + (b - w.(mean / scale)), and a tree split z_j <= t equals
+x_j <= t * scale_j + mean_j. Folding this once at load time lets raw
+encoded features be scored directly, skipping a full pass over the batch.
+"""
+
+import copy
+import logging
+from typing import Optional
+
+import numpy as np
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+logger = logging.getLogger(__name__)
+
+TREE_ENSEMBLES = (
+    RandomForestClassifier,
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+)
+
+
+def _scaler_arrays(scaler: StandardScaler, n_features: int):
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+
+def _fold_linear(model: LogisticRegression, mean: np.ndarray, scale: np.ndarray):
+    fused = copy.deepcopy(model)
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    fused.coef_ = coef / scale
+    fused.intercept_ = np.asarray(model.intercept_, dtype=np.float64) - (
+        coef * (mean / scale)
+    ).sum(axis=1)
+    return fused
+
+
+def _raw_thresholds(
+    threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray
+) -> np.ndarray:
+    """Largest float32 raw value sent left by each scaled-space split
+
+    Trees compare float32 features against float64 thresholds, and a split
+    can sit exactly on a training value, so ``t * scale + mean`` alone may
+    round to the wrong side. Step it to the float32 boundary instead.
+    """
+
+    def goes_left(v):
+        z = ((v.astype(np.float64) - mean) / scale).astype(np.float32)
+        return z <= threshold
+
+    v = (threshold * scale + mean).astype(np.float32)
+    for _ in range(64):
+        up = np.nextafter(v, np.float32(np.inf))
+        down = np.nextafter(v, np.float32(-np.inf))
+        step = np.where(goes_left(v), np.where(goes_left(up), up, v), down)
+        if np.array_equal(step, v):
+            break
+        v = step
+    return v.astype(np.float64)
+
+
+def _fold_tree(tree, mean: np.ndarray, scale: np.ndarray):
+    """Move the thresholds of a fitted sklearn tree into raw feature space"""
+    tree_ = tree.tree_
+    split = tree_.children_left != -1
+    features = tree_.feature[split]
+    # Tree.threshold is a writable view onto the tree's node array
+    tree_.threshold[split] = _raw_thresholds(
+        tree_.threshold[split], mean[features], scale[features]
+    )
+
+
+def fold_scaler(model, scaler) -> Optional[object]:
+    """Return a copy of model that scores unscaled features, or None if unsupported"""
+    if type(scaler) is not StandardScaler:
+        return None
+
+    mean, scale = _scaler_arrays(scaler, scaler.n_features_in_)
+
+    if type(model) is LogisticRegression:
+        return _fold_linear(model, mean, scale)
+
+    if isinstance(model, (DecisionTreeClassifier,) + TREE_ENSEMBLES):
+        fused = copy.deepcopy(model)
+        if isinstance(fused, DecisionTreeClassifier):
+            trees = [fused]
+        else:
+            trees = np.ravel(fused.estimators_)
+        for tree in trees:
+            _fold_tree(tree, mean, scale)
+        return fused
+
+    return None
+
+
+def reference_matrix(scaler, n_rows: int = 2000, seed: int = 0) -> np.ndarray:
+    """Random rows spread around the training distribution, in raw feature space"""
+    mean, scale = _scaler_arrays(scaler, scaler.n_features_in_)
+    rng = np.random.default_rng(seed)
+    X = mean + 2 * scale * rng.standard_normal((n_rows, len(mean)))
+    X[0] = mean
+    return X
+
+
+def max_probability_delta(model, fused, scaler, X: np.ndarray) -> float:
+    """Largest |p_fused - p_unfused| over the rows of X"""
+    expected = model.predict_proba(scaler.transform(X))
+    actual = fused.predict_proba(X)
+    return float(np.max(np.abs(actual - expected)))
+
+
+def fuse_scaler(model, scaler, tolerance: float) -> Optional[object]:
+    """Fold scaler into model, keeping the result only if it matches the pipeline
+
+    Fused trees round raw features to float32 before comparing rather than
+    after scaling, so a value within float32 rounding of a split can still
+    go the other way. Checking on a reference matrix catches a model where
+    that matters and falls back to the unfused pipeline.
+    """
+    fused = fold_scaler(model, scaler)
+    if fused is None:
+        logger.info(
+            f"Scaler fusion not supported for {type(model).__name__}, "
+            "using the unfused pipeline"
+        )
+        return None
+
+    delta = max_probability_delta(model, fused, scaler, reference_matrix(scaler))
+    if delta > tolerance:
+        logger.warning(
+            f"Fused model differs from the unfused pipeline by {delta:.3g} "
+            f"(tolerance {tolerance:.3g}), using the unfused pipeline"
+        )
+        return None
+
+    logger.info(f"Scaler folded into {type(model).__name__} (max delta {delta:.3g})")
+    return fused
@@ -1,23 +1,41 @@
 # app/main.py
 
+import asyncio
+import json
 import logging
 import time
 import uuid
 from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from prometheus_client import Counter, Gauge, Histogram
 from prometheus_fastapi_instrumentator import Instrumentator
-
-from .model import predictor
+from starlette.requests import ClientDisconnect
+
+from . import arrow, config
+from .batching import MicroBatcher
+from .cache import PredictionCache
+from .drift import DriftMonitor
+from .executor import InferenceExecutor, InferenceQueueFull
+from .model import RISK_LEVELS, ChurnPredictor, get_predictor
+from .prediction_log import PredictionLog
+from .reload import ModelReloader, ReloadInProgress
 from .schema import (
     BatchPredictionRequest,
     BatchPredictionResponse,
     CustomerData,
     HealthResponse,
     PredictionResponse,
+    StreamSummary,
 )
+from .serialization import PREDICTION_FIELDS, batch_response_json, dumps
+from .streaming import NDJSONStreamingResponse, iter_lines
+from .timing import StageTimer, timed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,13 +47,32 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
-    if not predictor.load_model():
+    if not get_predictor().load_model():
         logger.error("Failed to load model!")
     else:
         logger.info("Model loaded successfully!")
+    watcher = None
+    if config.MODEL_WATCH_ENABLED:
+        watcher = asyncio.create_task(
+            model_reloader.watch(config.MODEL_WATCH_INTERVAL_SECONDS)
+        )
+    drift_refresher = None
+    if drift_monitor is not None:
+        drift_refresher = asyncio.create_task(
+            drift_monitor.run(config.DRIFT_UPDATE_INTERVAL_SECONDS)
+        )
     yield
     # Shutdown
     logger.info("Shutting down...")
+    if watcher is not None:
+        watcher.cancel()
+    if drift_refresher is not None:
+        drift_refresher.cancel()
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+    if prediction_log is not None:
+        await prediction_log.stop()
+    inference_executor.shutdown()
 
 
 # Create FastAPI app
@@ -75,6 +112,123 @@ high_risk_gauge = Gauge(
 )
 
 
+def request_timer() -> Optional[StageTimer]:
+    """A StageTimer for one request, or None when stage timing is off"""
+    return StageTimer() if config.STAGE_TIMING_ENABLED else None
+
+
+def record_stages(
+    timer: Optional[StageTimer],
+    endpoint: str,
+    response: Optional[Response] = None,
+    rows: Optional[int] = None,
+):
+    """Export a request's stage timings and add its Server-Timing header"""
+    if timer is None:
+        return
+    timer.observe(endpoint, rows)
+    if response is not None and config.SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = timer.server_timing()
+
+
+# Bounded pool that keeps blocking inference off the event loop
+inference_executor = InferenceExecutor(
+    kind=config.INFERENCE_EXECUTOR,
+    max_workers=config.INFERENCE_WORKERS,
+    max_queue=config.INFERENCE_MAX_QUEUE,
+)
+
+# Background loading and atomic swapping of new model versions
+model_reloader = ModelReloader(inference_executor)
+
+# Optional micro-batching of concurrent /predict requests
+micro_batcher = (
+    MicroBatcher(
+        inference_executor.predict_batch,
+        max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS,
+    )
+    if config.MICRO_BATCH_ENABLED
+    else None
+)
+
+
+# Optional cache of /predict results for repeated customer profiles
+prediction_cache = (
+    PredictionCache(
+        max_size=config.PREDICTION_CACHE_SIZE,
+        ttl_seconds=config.PREDICTION_CACHE_TTL_SECONDS,
+    )
+    if config.PREDICTION_CACHE_ENABLED
+    else None
+)
+
+
+# Optional log of every prediction, written in the background
+prediction_log = (
+    PredictionLog(
+        directory=config.PREDICTION_LOG_DIR,
+        fmt=config.PREDICTION_LOG_FORMAT,
+        max_queue=config.PREDICTION_LOG_MAX_QUEUE,
+        batch_size=config.PREDICTION_LOG_BATCH_SIZE,
+        flush_interval=config.PREDICTION_LOG_FLUSH_INTERVAL_SECONDS,
+        rotate_bytes=int(config.PREDICTION_LOG_ROTATE_MB * 2**20),
+        overflow=config.PREDICTION_LOG_OVERFLOW,
+        block_timeout_ms=config.PREDICTION_LOG_BLOCK_TIMEOUT_MS,
+    )
+    if config.PREDICTION_LOG_ENABLED
+    else None
+)
+
+
+# Optional sliding-window drift of features and predictions
+drift_monitor = (
+    DriftMonitor(
+        window_seconds=config.DRIFT_WINDOW_SECONDS,
+        buckets=config.DRIFT_WINDOW_BUCKETS,
+        min_rows=config.DRIFT_MIN_ROWS,
+        profile_path=config.DRIFT_PROFILE_PATH,
+        max_queue=config.DRIFT_MAX_QUEUE,
+    )
+    if config.DRIFT_MONITOR_ENABLED
+    else None
+)
+
+
+async def predict_one(
+    customer_data: dict,
+    predictor: ChurnPredictor,
+    timer: Optional[StageTimer] = None,
+):
+    """Score one customer, using the cache and micro-batcher when enabled
+
+    Returns (probability, prediction, confidence, risk level, model version).
+    """
+    model = predictor.model
+    if prediction_cache is not None:
+        cached = prediction_cache.get(customer_data, model)
+        if cached is not None:
+            return cached
+
+    if micro_batcher is None:
+        result = await inference_executor.predict(customer_data, predictor, timer)
+    else:
+        scored = await micro_batcher.submit(customer_data, predictor)
+        result = (
+            scored["churn_probability"],
+            scored["churn_prediction"],
+            scored["confidence"],
+            scored["risk_level"],
+            scored["model_version"],
+        )
+
+    # Process workers score with their own copy of the model, which may
+    # already be newer than the one this request's cache key is for
+    if prediction_cache is not None and result[-1] == predictor.model_version:
+        prediction_cache.put(customer_data, model, result)
+    return result
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -85,6 +239,10 @@ async def root():
             "health": "/health",
             "predict": "/predict",
             "batch_predict": "/batch_predict",
+            "batch_predict_stream": "/batch_predict/stream",
+            "batch_predict_arrow": "/batch_predict/arrow",
+            "model_info": "/model/info",
+            "reload": "/admin/reload",
             "metrics": "/metrics",
             "docs": "/docs",
         },
@@ -94,7 +252,7 @@ async def root():
 # Health check endpoint
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    model_loaded = predictor.model is not None
+    model_loaded = get_predictor().model is not None
     return HealthResponse(
         status="healthy" if model_loaded else "unhealthy",
         model_loaded=model_loaded,
@@ -104,23 +262,48 @@ async def health_check():
 
 # Single prediction endpoint
 @app.post("/predict", response_model=PredictionResponse)
-async def predict(customer: CustomerData):
+async def predict(customer: CustomerData, response: Response):
     """Make churn prediction for a single customer"""
     start_time = time.time()
+    timer = request_timer()
+    predictor = get_predictor()
 
     # Check if model is loaded
     if predictor.model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
+    customer_data = customer.model_dump()
+
+    # Categorical values must be ones the model was trained on
+    with timed(timer, "validate"):
+        errors = predictor.get_validator().validate_one(customer_data)
+    if errors:
+        raise RequestValidationError(errors)
+
     try:
         # Make prediction
-        probability, prediction, confidence, risk_level = predictor.predict(
-            customer.dict()
-        )
+        (
+            probability,
+            prediction,
+            confidence,
+            risk_level,
+            model_version,
+        ) = await predict_one(customer_data, predictor, timer)
 
         # Update metrics
         prediction_counter.labels(prediction=prediction, risk_level=risk_level).inc()
         prediction_latency.observe(time.time() - start_time)
+        record_stages(timer, "predict", response)
+        if prediction_log is not None:
+            columns = (probability, prediction, confidence, risk_level)
+            await prediction_log.submit(
+                "/predict",
+                [customer_data],
+                {field: [value] for field, value in zip(PREDICTION_FIELDS, columns)},
+                model_version,
+            )
+        if drift_monitor is not None:
+            drift_monitor.submit([customer_data], [probability], predictor)
 
         # Generate customer ID
         customer_id = f"CUST_{str(uuid.uuid4())[:8].upper()}"
@@ -135,44 +318,127 @@ async def predict(customer: CustomerData):
             churn_prediction=prediction,
             confidence=confidence,
             risk_level=risk_level,
+            model_version=model_version,
         )
 
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def record_predictions(predictions: np.ndarray, risk_levels: np.ndarray) -> int:
+    """Count a batch in the prediction counter and return its high-risk count"""
+    for prediction in ("Yes", "No"):
+        is_prediction = predictions == prediction
+        for risk_level in RISK_LEVELS.tolist():
+            count = int(np.count_nonzero(is_prediction & (risk_levels == risk_level)))
+            if count:
+                prediction_counter.labels(
+                    prediction=prediction, risk_level=risk_level
+                ).inc(count)
+    return int(np.count_nonzero(risk_levels == "High"))
+
+
+def body_error(error_type: str, loc: list, msg: str, **extra) -> RequestValidationError:
+    """A request validation error in FastAPI's 422 format"""
+    return RequestValidationError(
+        [{"type": error_type, "loc": loc, "msg": msg, **extra}]
+    )
+
+
+async def read_batch_customers(
+    request: Request, predictor: ChurnPredictor, timer: Optional[StageTimer] = None
+) -> list:
+    """Parse a BatchPredictionRequest body and validate its customers as columns
+
+    This replaces building a CustomerData model per row. Errors are raised in
+    the same 422 format FastAPI uses for request validation.
+    """
+    body = await request.body()
+    try:
+        with timed(timer, "parse"):
+            body = json.loads(body)
+    except ValueError as e:
+        raise body_error(
+            "json_invalid",
+            ["body", getattr(e, "pos", 0)],
+            "JSON decode error",
+            input={},
+            ctx={"error": getattr(e, "msg", str(e))},
+        )
+
+    if not isinstance(body, dict):
+        raise body_error(
+            "model_attributes_type",
+            ["body"],
+            "Input should be a valid dictionary or object to extract fields from",
+            input=body,
+        )
+    if "customers" not in body:
+        raise body_error("missing", ["body", "customers"], "Field required")
+    customers = body["customers"]
+    if not isinstance(customers, list):
+        raise body_error(
+            "list_type",
+            ["body", "customers"],
+            "Input should be a valid list",
+            input=customers,
+        )
+
+    with timed(timer, "validate"):
+        errors = predictor.get_validator().validate(customers)
+    if errors:
+        raise RequestValidationError(errors)
+    return customers
+
+
+# The body is parsed by read_batch_customers, so document its schema here
+BATCH_REQUEST_SCHEMA = BatchPredictionRequest.model_json_schema(
+    ref_template="#/components/schemas/{model}"
+)
+BATCH_REQUEST_SCHEMA.pop("$defs", None)
+
+
 # Batch prediction endpoint
-@app.post("/batch_predict", response_model=BatchPredictionResponse)
-async def batch_predict(request: BatchPredictionRequest):
+@app.post(
+    "/batch_predict",
+    response_model=BatchPredictionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": BATCH_REQUEST_SCHEMA}},
+        }
+    },
+)
+async def batch_predict(request: Request):
     """Make churn predictions for multiple customers"""
     start_time = time.time()
+    timer = request_timer()
+    predictor = get_predictor()
 
     # Check if model is loaded
     if predictor.model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
-    try:
-        # Convert customers to dict format
-        customers_data = [customer.dict() for customer in request.customers]
+    customers_data = await read_batch_customers(request, predictor, timer)
 
+    try:
         # Make predictions
-        predictions_data = predictor.predict_batch(customers_data)
-
-        # Convert to response format
-        predictions = []
-        high_risk_count = 0
-
-        for pred_data in predictions_data:
-            if "error" not in pred_data:
-                predictions.append(PredictionResponse(**pred_data))
-                if pred_data["risk_level"] == "High":
-                    high_risk_count += 1
-                # Update metrics
-                prediction_counter.labels(
-                    prediction=pred_data["churn_prediction"],
-                    risk_level=pred_data["risk_level"],
-                ).inc()
+        scored, errors, model_version = await inference_executor.predict_batch_arrays(
+            customers_data, predictor, timer
+        )
+        for i, error in errors.items():
+            logger.error(f"Error predicting customer {i}: {error}")
+
+        # Rows that failed are left out of the response, as before
+        valid = np.ones(len(customers_data), dtype=bool)
+        valid[list(errors)] = False
+        predictions = scored["churn_prediction"][valid]
+
+        # Update metrics
+        high_risk_count = record_predictions(predictions, scored["risk_level"][valid])
 
         # Update gauges
         high_risk_gauge.set(high_risk_count)
@@ -182,26 +448,246 @@ async def batch_predict(request: BatchPredictionRequest):
             f"Batch prediction completed: {len(predictions)} customers, {high_risk_count} high risk"
         )
 
-        return BatchPredictionResponse(
-            predictions=predictions,
-            total_processed=len(predictions),
-            high_risk_count=high_risk_count,
-        )
-
+        # Serialized straight from the arrays, in the BatchPredictionResponse schema
+        with timed(timer, "serialize"):
+            content = batch_response_json(scored, valid, model_version, high_risk_count)
+        response = Response(content=content, media_type="application/json")
+        record_stages(timer, "batch_predict", response, rows=len(customers_data))
+        if prediction_log is not None:
+            await prediction_log.submit(
+                "/batch_predict", customers_data, scored, model_version
+            )
+        if drift_monitor is not None:
+            drift_monitor.submit(
+                [c for c, ok in zip(customers_data, valid.tolist()) if ok],
+                scored["churn_probability"][valid],
+                predictor,
+            )
+        return response
+
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Batch prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def validate_stream_chunk(
+    chunk: List[Tuple[int, dict, str]], predictor: ChurnPredictor
+):
+    """Replace invalid customers in a stream chunk with their error message"""
+    positions = [k for k, (_, _, error) in enumerate(chunk) if error is None]
+    messages = {}
+    for row, field, _, msg, _ in predictor.get_validator().errors(
+        [chunk[k][1] for k in positions]
+    ):
+        messages.setdefault(positions[row], []).append(
+            f"{field}: {msg}" if field else msg
+        )
+    for k, parts in messages.items():
+        chunk[k] = (chunk[k][0], None, "; ".join(parts))
+
+
+async def score_stream_chunk(
+    chunk: List[Tuple[int, dict, str]],
+    predictor: ChurnPredictor,
+    timer: Optional[StageTimer] = None,
+) -> List[dict]:
+    """Score one chunk of a streamed batch, keeping input line order"""
+    customers = [customer for _, customer, error in chunk if error is None]
+    scored = iter([])
+    while customers:
+        try:
+            scored = iter(
+                await inference_executor.predict_batch(customers, predictor, timer)
+            )
+            break
+        except InferenceQueueFull:
+            # Headers are already sent, so wait for room instead of failing
+            await asyncio.sleep(0.05)
+
+    results = []
+    for line_no, _, error in chunk:
+        result = {"error": error} if error is not None else next(scored)
+        result["customer_id"] = f"CUST_{line_no:04d}"
+        results.append(result)
+    return results
+
+
+async def stream_predictions(
+    request: Request, predictor: ChurnPredictor
+) -> AsyncIterator[bytes]:
+    """Read NDJSON customers chunk by chunk and yield NDJSON predictions"""
+    start_time = time.time()
+    timer = request_timer()
+    total_processed = 0
+    high_risk_count = 0
+    error_count = 0
+    # (line number, customer, validation error) awaiting scoring
+    chunk = []
+
+    async def flush() -> bytes:
+        nonlocal total_processed, high_risk_count, error_count
+        lines = []
+        with timed(timer, "validate"):
+            validate_stream_chunk(chunk, predictor)
+        results = await score_stream_chunk(chunk, predictor, timer)
+        scored = [
+            (customer, result)
+            for (_, customer, _), result in zip(chunk, results)
+            if "error" not in result
+        ]
+        if drift_monitor is not None:
+            drift_monitor.submit(
+                [customer for customer, _ in scored],
+                [result["churn_probability"] for _, result in scored],
+                predictor,
+            )
+        if prediction_log is not None:
+            await prediction_log.submit(
+                "/batch_predict/stream",
+                [customer for customer, _ in scored],
+                {
+                    field: [result[field] for _, result in scored]
+                    for field in PREDICTION_FIELDS
+                },
+                predictor.model_version,
+            )
+        with timed(timer, "serialize"):
+            for result in results:
+                if "error" in result:
+                    error_count += 1
+                else:
+                    total_processed += 1
+                    if result["risk_level"] == "High":
+                        high_risk_count += 1
+                    prediction_counter.labels(
+                        prediction=result["churn_prediction"],
+                        risk_level=result["risk_level"],
+                    ).inc()
+                lines.append(dumps(result))
+        chunk.clear()
+        return b"\n".join(lines) + b"\n"
+
+    try:
+        async for line_no, line in iter_lines(request.stream()):
+            # Customers are validated a chunk at a time, as columns
+            try:
+                with timed(timer, "parse"):
+                    customer = json.loads(line)
+                chunk.append((line_no, customer, None))
+            except ValueError as e:
+                chunk.append((line_no, None, f"Invalid JSON: {e}"))
+
+            if len(chunk) >= config.STREAM_CHUNK_SIZE:
+                yield await flush()
+
+        if chunk:
+            yield await flush()
+
+    except ClientDisconnect:
+        logger.warning(f"Client disconnected after {total_processed} predictions")
+        return
+
+    high_risk_gauge.set(high_risk_count)
+    prediction_latency.observe(time.time() - start_time)
+    # Headers went out with the first chunk, so there is no Server-Timing here
+    record_stages(timer, "batch_predict_stream", rows=total_processed + error_count)
+
+    logger.info(
+        f"Streamed batch prediction completed: {total_processed} customers, "
+        f"{high_risk_count} high risk, {error_count} errors"
+    )
+
+    summary = StreamSummary(
+        total_processed=total_processed,
+        high_risk_count=high_risk_count,
+        error_count=error_count,
+    )
+    yield dumps({"summary": summary.model_dump()}) + b"\n"
+
+
+# Streaming batch prediction endpoint
+@app.post("/batch_predict/stream", response_class=NDJSONStreamingResponse)
+async def batch_predict_stream(request: Request):
+    """Score newline-delimited JSON customers and stream NDJSON predictions
+
+    Each input line is one customer object. Each output line is a prediction
+    or an error for the matching input line, followed by a final
+    ``{"summary": {...}}`` record.
+    """
+    # The whole stream is scored by the model active when it started
+    predictor = get_predictor()
+
+    # Check if model is loaded
+    if predictor.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    return NDJSONStreamingResponse(stream_predictions(request, predictor))
+
+
+# Arrow IPC batch prediction endpoint
+@app.post("/batch_predict/arrow", response_class=Response)
+async def batch_predict_arrow(request: Request, id_column: Optional[str] = None):
+    """Make churn predictions for an Arrow IPC stream of customers
+
+    The response is an Arrow IPC stream with one row per input row:
+    churn_probability, churn_prediction, confidence, risk_level and error,
+    preceded by the ``id_column`` input column if one is named.
+    """
+    start_time = time.time()
+    timer = request_timer()
+    if not arrow.pyarrow_available():
+        raise HTTPException(
+            status_code=501, detail="Arrow support needs pyarrow: pip install pyarrow"
+        )
+    predictor = get_predictor()
+
+    # Check if model is loaded
+    if predictor.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    body = await request.body()
+    try:
+        content, predictions, risk_levels = await inference_executor.run_with_predictor(
+            arrow.score_ipc, body, id_column, predictor=predictor, timer=timer
+        )
+    except arrow.ArrowInputError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Update metrics
+    high_risk_count = record_predictions(predictions, risk_levels)
+    high_risk_gauge.set(high_risk_count)
+    prediction_latency.observe(time.time() - start_time)
+
+    logger.info(
+        f"Arrow batch prediction completed: {len(predictions)} customers, "
+        f"{high_risk_count} high risk"
+    )
+
+    response = Response(content=content, media_type=arrow.ARROW_STREAM_MEDIA_TYPE)
+    record_stages(timer, "batch_predict_arrow", response, rows=len(predictions))
+    return response
+
+
 # Model info endpoint
 @app.get("/model/info")
 async def model_info():
     """Get information about the loaded model"""
+    predictor = get_predictor()
     if predictor.model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     return {
         "model_type": type(predictor.model).__name__,
+        "model_version": predictor.model_version,
+        "inference_mode": predictor.inference_mode,
+        "precision": predictor.precision,
+        "precision_report": predictor.precision_report,
+        "loaded_at": predictor.loaded_at,
+        "metadata": predictor.metadata,
         "feature_count": len(predictor.feature_names) if predictor.feature_names else 0,
         "features": predictor.feature_names[:10]
         if predictor.feature_names
@@ -209,6 +695,32 @@ async def model_info():
     }
 
 
+# Hot model reload endpoint
+@app.post("/admin/reload")
+async def reload_model(x_admin_token: Optional[str] = Header(None)):
+    """Load the model files again and swap them in without downtime"""
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403, detail="Model reload is disabled: ADMIN_TOKEN is not set"
+        )
+    if x_admin_token != config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        previous_version, model_version = await model_reloader.reload()
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Model reload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "status": "reloaded",
+        "previous_version": previous_version,
+        "model_version": model_version,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
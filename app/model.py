@@ -1,15 +1,49 @@
 # app/model.py
 
+import hashlib
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 import joblib
-import pandas as pd
+import numpy as np
+from prometheus_client import Gauge
+from sklearn.preprocessing import StandardScaler
+
+from . import bundle, config
+from .features import FeatureEncoder
+from .fusion import fuse_scaler, reference_matrix
+from .precision import PRECISIONS, accuracy_report, cast_estimator, read_reference
+from .schema import CustomerData
+from .timing import stage
+from .tree_engine import compile_estimator
+from .validation import CustomerValidator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+model_load_duration = Gauge(
+    "churn_model_load_duration_seconds", "Time taken to load the active model"
+)
+
+# Risk level boundaries on churn probability: [0, 0.3) / [0.3, 0.7) / [0.7, 1]
+RISK_THRESHOLDS = np.array([0.3, 0.7])
+RISK_LEVELS = np.array(["Low", "Medium", "High"])
+
+
+def resident_memory_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
 
 class ChurnPredictor:
     """Churn prediction model handler"""
@@ -18,9 +52,96 @@ class ChurnPredictor:
         self.model = None
         self.scaler = None
         self.feature_names = None
+        self.encoder = None
+        self.validator = None
+        # Estimator with the scaler folded in, scoring unscaled features
+        self.fused_model = None
+        # Compiled NumPy tree ensemble for small batches
+        self.tree_engine = None
+        self.precision = "float64"
+        # Load-time comparison of reduced-precision scores with float64
+        self.precision_report = None
+        self.model_version = None
+        self.metadata = {}
+        self.loaded_at = None
         self.model_path = Path(__file__).parent
 
+    @property
+    def artifact_files(self) -> List[Path]:
+        """Files that make up the deployed model"""
+        bundle_file = self.model_path / bundle.BUNDLE_FILENAME
+        if bundle_file.exists():
+            return [bundle_file]
+        return [
+            self.model_path / "churn_model.pkl",
+            self.model_path / "scaler.pkl",
+            self.model_path / "feature_names.pkl",
+        ]
+
     def load_model(self) -> bool:
+        """Load the model bundle, or else the separate model/scaler/feature files"""
+        start_time = time.perf_counter()
+        bundle_file = self.model_path / bundle.BUNDLE_FILENAME
+        if bundle_file.exists():
+            loaded = self.load_bundle(bundle_file)
+        else:
+            loaded = self.load_legacy_artifacts()
+
+        if loaded:
+            self.validator = None
+            self.fused_model = None
+            if config.FUSED_SCALER:
+                self.fused_model = fuse_scaler(
+                    self.model, self.scaler, config.FUSED_SCALER_TOLERANCE
+                )
+            self.tree_engine = None
+            if config.TREE_ENGINE:
+                self.tree_engine = compile_estimator(
+                    self.model if self.fused_model is None else self.fused_model
+                )
+            self.precision = "float64"
+            self.precision_report = None
+            if config.INFERENCE_PRECISION != "float64":
+                self.apply_precision(
+                    config.INFERENCE_PRECISION, config.PRECISION_REFERENCE_DATA
+                )
+
+            load_time = time.perf_counter() - start_time
+            model_load_duration.set(load_time)
+            logger.info(
+                f"Model {self.model_version} loaded in {load_time:.3f}s, "
+                f"resident memory {resident_memory_bytes() / 2**20:.1f} MiB"
+            )
+        return loaded
+
+    def load_bundle(self, bundle_file: Path) -> bool:
+        """Load a single-file model bundle, memory-mapping its arrays"""
+        try:
+            payload = bundle.load_bundle(
+                bundle_file,
+                mmap_mode="r" if config.MODEL_MMAP else None,
+                verify=config.MODEL_BUNDLE_VERIFY,
+            )
+            encoder = FeatureEncoder(payload["feature_layout"]["feature_names"])
+            if encoder.categories != payload["feature_layout"]["categories"]:
+                logger.error(f"Feature layout in {bundle_file} is inconsistent")
+                return False
+
+            self.model = payload["model"]
+            self.scaler = payload["scaler"]
+            self.feature_names = encoder.feature_names
+            self.encoder = encoder
+            self.metadata = payload["metadata"]
+            self.model_version = payload["checksum"][:12]
+            self.loaded_at = time.time()
+            logger.info(f"Model bundle loaded successfully from {bundle_file}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error loading model bundle: {str(e)}")
+            return False
+
+    def load_legacy_artifacts(self) -> bool:
         """Load the trained model, scaler, and feature names"""
         try:
             # Load model
@@ -47,77 +168,169 @@ class ChurnPredictor:
             self.feature_names = joblib.load(features_file)
             logger.info("Feature names loaded successfully")
 
+            # Compile the feature encoder once for all requests
+            self.encoder = FeatureEncoder(self.feature_names)
+
+            # Version is a content hash, so identical artifacts share a version
+            digest = hashlib.sha256()
+            for path in (model_file, scaler_file, features_file):
+                digest.update(path.read_bytes())
+            self.model_version = digest.hexdigest()[:12]
+            self.metadata = {}
+            self.loaded_at = time.time()
+
             return True
 
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             return False
 
-    def preprocess_input(self, customer_data: Dict) -> pd.DataFrame:
-        """Preprocess input data to match training format"""
-        # Create DataFrame
-        df = pd.DataFrame([customer_data])
-
-        # Binary encoding
-        binary_mappings = {
-            "gender": {"Male": 1, "Female": 0},
-            "Partner": {"Yes": 1, "No": 0},
-            "Dependents": {"Yes": 1, "No": 0},
-            "PhoneService": {"Yes": 1, "No": 0},
-            "PaperlessBilling": {"Yes": 1, "No": 0},
-        }
-
-        for col, mapping in binary_mappings.items():
-            if col in df.columns:
-                df[col] = df[col].map(mapping)
-
-        # One-hot encoding for categorical columns
-        categorical_cols = [
-            "MultipleLines",
-            "InternetService",
-            "OnlineSecurity",
-            "OnlineBackup",
-            "DeviceProtection",
-            "TechSupport",
-            "StreamingTV",
-            "StreamingMovies",
-            "Contract",
-            "PaymentMethod",
-        ]
-
-        # Get dummies
-        df_encoded = pd.get_dummies(df, columns=categorical_cols)
-
-        # Feature engineering
-        df_encoded["tenure_MonthlyCharges"] = (
-            df_encoded["tenure"] * df_encoded["MonthlyCharges"]
+    def reference_rows(self, path: Optional[Path] = None) -> np.ndarray:
+        """Encoded reference rows for accuracy checks, from a CSV or synthetic"""
+        if path:
+            columns, n_rows = read_reference(Path(path))
+            X, errors = self.preprocess_columns(columns, n_rows)
+            return np.delete(X, list(errors), axis=0)
+        return reference_matrix(self.scaler)
+
+    def apply_precision(self, precision: str, reference: Optional[Path] = None) -> Dict:
+        """Switch scoring to a reduced precision and report the accuracy change"""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}, expected {PRECISIONS}")
+        if self.precision != "float64":
+            raise ValueError(f"Predictor is already in {self.precision} mode")
+
+        X = self.reference_rows(reference)
+        expected, _ = self.score(X.copy())
+
+        dtype = np.dtype(precision)
+        self.model = cast_estimator(self.model, dtype)
+        self.scaler = cast_estimator(self.scaler, dtype)
+        if self.fused_model is not None:
+            self.fused_model = cast_estimator(self.fused_model, dtype)
+        self.encoder = FeatureEncoder(self.feature_names, dtype=dtype)
+        self.precision = precision
+
+        actual, _ = self.score(X.astype(dtype))
+        self.precision_report = accuracy_report(
+            precision, expected, actual, RISK_THRESHOLDS
         )
-        df_encoded["TotalCharges_per_Month"] = df_encoded["TotalCharges"] / (
-            df_encoded["tenure"] + 1
+        logger.info(
+            f"{precision} inference: max probability delta "
+            f"{self.precision_report['max_probability_delta']:.3g}, "
+            f"{self.precision_report['risk_level_flips']} of "
+            f"{self.precision_report['rows']} reference rows changed risk level"
         )
+        return self.precision_report
+
+    @property
+    def inference_mode(self) -> str:
+        """How encoded rows are scored: standard, fused, compiled or fused+compiled"""
+        modes = []
+        if self.fused_model is not None:
+            modes.append("fused")
+        if self.tree_engine is not None:
+            modes.append("compiled")
+        return "+".join(modes) or "standard"
+
+    def warm_up(self):
+        """Score a sample customer so the first real request pays no setup cost"""
+        sample = CustomerData.Config.json_schema_extra["example"]
+        self.predict(sample)
+        self.predict_batch([sample, sample])
+
+    def get_encoder(self) -> FeatureEncoder:
+        """Return the compiled feature encoder, compiling it if needed"""
+        if self.encoder is None:
+            self.encoder = FeatureEncoder(self.feature_names)
+        return self.encoder
+
+    def get_validator(self) -> CustomerValidator:
+        """Return the validator compiled from the model's category vocabulary"""
+        if self.validator is None:
+            self.validator = CustomerValidator(self.get_encoder())
+        return self.validator
+
+    def preprocess_input(self, customer_data: Dict) -> np.ndarray:
+        """Preprocess input data to match training format"""
+        with stage("preprocess"):
+            return self.get_encoder().encode(customer_data)
+
+    def preprocess_batch(
+        self, customers: List[Dict]
+    ) -> Tuple[np.ndarray, Dict[int, str]]:
+        """Encode customers into one matrix, collecting per-row errors"""
+        encoder = self.get_encoder()
+        with stage("preprocess"):
+            X = np.zeros((len(customers), encoder.n_features), dtype=encoder.dtype)
+            errors = {}
+
+            for i, customer in enumerate(customers):
+                try:
+                    encoder.encode_into(customer, X[i])
+                except Exception as e:
+                    errors[i] = f"Invalid customer data: {str(e)}"
+
+            self._check_finite(X, errors)
+        return X, errors
+
+    def preprocess_columns(
+        self, columns: Mapping[str, Sequence], n_rows: int
+    ) -> Tuple[np.ndarray, Dict[int, str]]:
+        """Encode column arrays into one matrix, collecting per-row errors"""
+        with stage("preprocess"):
+            X = self.get_encoder().encode_columns(columns, n_rows)
+            errors = {}
+            self._check_finite(X, errors)
+        return X, errors
+
+    @staticmethod
+    def _check_finite(X: np.ndarray, errors: Dict[int, str]):
+        """The estimators reject NaN/inf, so isolate those rows up front"""
+        for i in np.flatnonzero(~np.isfinite(X).all(axis=1)).tolist():
+            errors.setdefault(i, "Input contains NaN or infinity")
+
+    def scale(self, X: np.ndarray) -> np.ndarray:
+        """Scale an encoded feature matrix in place"""
+        if isinstance(self.scaler, StandardScaler):
+            # Same arithmetic as StandardScaler.transform, without the
+            # feature-name check that only applies to DataFrame input
+            if self.scaler.with_mean:
+                X -= self.scaler.mean_
+            if self.scaler.with_std:
+                X /= self.scaler.scale_
+            return X
+        return self.scaler.transform(X)
+
+    def score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return churn probabilities and 0/1 labels for encoded rows"""
+        if self.fused_model is not None:
+            model = self.fused_model
+        else:
+            model = self.model
+            with stage("scale"):
+                X = self.scale(X)
+
+        with stage("predict"):
+            if self.tree_engine is not None and len(X) <= config.TREE_ENGINE_MAX_ROWS:
+                proba = self.tree_engine.predict_proba(X)
+            else:
+                proba = model.predict_proba(X)
 
-        # Ensure all features from training are present
-        for feature in self.feature_names:
-            if feature not in df_encoded.columns:
-                df_encoded[feature] = 0
-
-        # Select only the features used during training
-        df_final = df_encoded[self.feature_names]
-
-        return df_final
+            # Same rule as ClassifierMixin.predict, without a second model call
+            labels = self.model.classes_[np.argmax(proba, axis=1)]
+        return proba[:, 1], labels
 
     def predict(self, customer_data: Dict) -> Tuple[float, str, float, str]:
         """Make prediction for a single customer"""
         try:
             # Preprocess data
-            df = self.preprocess_input(customer_data)
-
-            # Scale features
-            X_scaled = self.scaler.transform(df)
+            X = self.preprocess_input(customer_data)
 
             # Get prediction and probability
-            prediction = self.model.predict(X_scaled)[0]
-            probability = self.model.predict_proba(X_scaled)[0, 1]
+            probabilities, labels = self.score(X)
+            probability = probabilities[0]
+            prediction = labels[0]
 
             # Determine risk level
             if probability < 0.3:
@@ -141,13 +354,71 @@ class ChurnPredictor:
             logger.error(f"Prediction error: {str(e)}")
             raise
 
+    def predict_arrays(
+        self, X: np.ndarray, errors: Dict[int, str]
+    ) -> Dict[str, np.ndarray]:
+        """Score encoded rows into one result array per response field
+
+        Rows listed in ``errors`` are not scored and keep NaN/None values. If
+        the model call itself fails, every row is added to ``errors``.
+        """
+        n = len(X)
+        valid = np.ones(n, dtype=bool)
+        valid[list(errors)] = False
+
+        results = {
+            "churn_probability": np.full(n, np.nan),
+            "churn_prediction": np.full(n, None, dtype=object),
+            "confidence": np.full(n, np.nan),
+            "risk_level": np.full(n, None, dtype=object),
+        }
+        if not valid.any():
+            return results
+
+        try:
+            probabilities, labels = self.score(X[valid] if errors else X)
+        except Exception as e:
+            for i in np.flatnonzero(valid).tolist():
+                errors[i] = str(e)
+            return results
+
+        # Vectorized risk level and confidence for the scored rows
+        results["churn_probability"][valid] = probabilities
+        results["churn_prediction"][valid] = np.where(labels == 1, "Yes", "No")
+        results["confidence"][valid] = np.abs(probabilities - 0.5) * 2
+        results["risk_level"][valid] = RISK_LEVELS[
+            np.searchsorted(RISK_THRESHOLDS, probabilities, "right")
+        ]
+        return results
+
+    def predict_batch_arrays(
+        self, customers: List[Dict]
+    ) -> Tuple[Dict[str, np.ndarray], Dict[int, str], str]:
+        """Score customers into per-field result arrays
+
+        Returns the arrays, the per-row errors and the model version that
+        produced them.
+        """
+        X, errors = self.preprocess_batch(customers)
+        return self.predict_arrays(X, errors), errors, self.model_version
+
     def predict_batch(self, customers: List[Dict]) -> List[Dict]:
-        """Make predictions for multiple customers"""
-        results = []
+        """Make predictions for multiple customers in one vectorized pass"""
+        scored, errors, _ = self.predict_batch_arrays(customers)
 
-        for i, customer in enumerate(customers):
-            try:
-                prob, pred, conf, risk = self.predict(customer)
+        results = []
+        for i, (prob, pred, conf, risk) in enumerate(
+            zip(
+                scored["churn_probability"].tolist(),
+                scored["churn_prediction"].tolist(),
+                scored["confidence"].tolist(),
+                scored["risk_level"].tolist(),
+            )
+        ):
+            if i in errors:
+                logger.error(f"Error predicting customer {i}: {errors[i]}")
+                results.append({"customer_id": f"CUST_{i+1:04d}", "error": errors[i]})
+            else:
                 results.append(
                     {
                         "customer_id": f"CUST_{i+1:04d}",
@@ -155,14 +426,29 @@ class ChurnPredictor:
                         "churn_prediction": pred,
                         "confidence": conf,
                         "risk_level": risk,
+                        "model_version": self.model_version,
                     }
                 )
-            except Exception as e:
-                logger.error(f"Error predicting customer {i}: {str(e)}")
-                results.append({"customer_id": f"CUST_{i+1:04d}", "error": str(e)})
 
         return results
 
 
 # Create global predictor instance
 predictor = ChurnPredictor()
+
+
+def get_predictor() -> ChurnPredictor:
+    """Return the active predictor
+
+    Callers should fetch it once per request and keep using that reference,
+    so a request that is already running finishes on the same model even if
+    a reload swaps in a new predictor meanwhile.
+    """
+    return predictor
+
+
+def swap_predictor(new_predictor: ChurnPredictor) -> ChurnPredictor:
+    """Atomically make new_predictor active, returning the previous one"""
+    global predictor
+    old_predictor, predictor = predictor, new_predictor
+    return old_predictor
@@ -0,0 +1,107 @@
+# app/precision.py
+"""
+Reduced-precision (float32) inference
+
+In float32 mode the encoded feature matrix, the scaler statistics and the
+parameters of linear models are stored as float32, halving the memory
+traffic of every scoring pass. Tree models already compare features in
+float32 inside sklearn, so they keep their parameters and only skip the
+float64 -> float32 copy sklearn would otherwise make.
+
+Report the effect on a trained model before enabling it with:
+    python -m app.precision --model-dir app --reference customers.csv
+"""
+
+import argparse
+import copy
+import json
+from pathlib import Path
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from .features import NUMERIC_COLUMNS
+
+PRECISIONS = ("float64", "float32")
+
+
+def cast_estimator(estimator, dtype):
+    """Copy of a fitted model or scaler with its float parameters cast to dtype"""
+    if isinstance(estimator, LogisticRegression):
+        cast = copy.copy(estimator)
+        cast.coef_ = np.asarray(estimator.coef_, dtype=dtype)
+        cast.intercept_ = np.asarray(estimator.intercept_, dtype=dtype)
+        return cast
+
+    if isinstance(estimator, StandardScaler):
+        cast = copy.copy(estimator)
+        for attr in ("mean_", "var_", "scale_"):
+            value = getattr(estimator, attr, None)
+            if value is not None:
+                setattr(cast, attr, np.asarray(value, dtype=dtype))
+        return cast
+
+    return estimator
+
+
+def read_reference(path: Path) -> Tuple[Mapping[str, np.ndarray], int]:
+    """Load reference customers from a CSV file as column arrays"""
+    df = pd.read_csv(path)
+    columns = {col: df[col].to_numpy() for col in df.columns}
+    for col in NUMERIC_COLUMNS:
+        if col in columns:
+            columns[col] = pd.to_numeric(df[col], errors="coerce").to_numpy()
+    return columns, len(df)
+
+
+def accuracy_report(
+    precision: str,
+    expected: np.ndarray,
+    actual: np.ndarray,
+    risk_thresholds: np.ndarray,
+) -> Dict:
+    """Compare reduced-precision churn probabilities with the float64 ones"""
+    delta = np.abs(actual.astype(np.float64) - expected)
+    expected_risk = np.searchsorted(risk_thresholds, expected, "right")
+    actual_risk = np.searchsorted(risk_thresholds, actual, "right")
+    return {
+        "precision": precision,
+        "rows": int(len(expected)),
+        "max_probability_delta": float(delta.max()) if len(delta) else 0.0,
+        "mean_probability_delta": float(delta.mean()) if len(delta) else 0.0,
+        "risk_level_flips": int((expected_risk != actual_risk).sum()),
+        "prediction_flips": int(((expected > 0.5) != (actual > 0.5)).sum()),
+    }
+
+
+def main(argv=None):
+    from . import config
+    from .model import ChurnPredictor
+
+    parser = argparse.ArgumentParser(description="Report reduced-precision accuracy")
+    parser.add_argument(
+        "--model-dir",
+        type=Path,
+        default=Path(__file__).parent,
+        help="Directory holding the model bundle or artifacts",
+    )
+    parser.add_argument("--reference", type=Path, help="CSV of reference customers")
+    parser.add_argument("--precision", default="float32", choices=PRECISIONS[1:])
+    args = parser.parse_args(argv)
+
+    # Load at full precision, the baseline the report compares against
+    config.INFERENCE_PRECISION = "float64"
+    predictor = ChurnPredictor()
+    predictor.model_path = args.model_dir
+    if not predictor.load_model():
+        raise SystemExit(f"Failed to load model from {args.model_dir}")
+
+    report = predictor.apply_precision(args.precision, args.reference)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+# app/prediction_log.py
+"""
+Asynchronous prediction log
+
+Request handlers hand each scored request to ``PredictionLog.submit``,
+which only appends it to a bounded in-memory queue. A background task
+flushes the queue in batches, formatting and writing them in a thread so
+the event loop never waits on disk. Files rotate by size and are written
+as ``<name>.inprogress``, renamed when complete.
+
+NDJSON files hold one line per request in the traffic format read by
+``scripts/replay.py``, so logged traffic can be replayed as is. Parquet
+files (needs pyarrow) hold one row per prediction with its features, for
+auditing and retraining.
+
+When the queue is full the overflow policy decides what happens:
+``drop_new`` drops the new request, ``drop_oldest`` drops the oldest
+queued requests, and ``block`` waits up to ``block_timeout_ms`` for room
+before dropping. Only ``block`` can ever delay a response.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .schema import CustomerData
+from .serialization import PREDICTION_FIELDS, dumps
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "parquet")
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest", "block")
+
+log_records = Counter(
+    "churn_prediction_log_records_total",
+    "Predictions handled by the prediction log",
+    ["result"],
+)
+log_queue_rows = Gauge(
+    "churn_prediction_log_queue_rows", "Predictions waiting to be written to the log"
+)
+log_flush_seconds = Histogram(
+    "churn_prediction_log_flush_seconds", "Time taken to write one batch to the log"
+)
+
+
+def _as_list(values: Sequence) -> list:
+    # NumPy arrays become lists of plain Python values
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+class _Entry:
+    """One scored request: customers plus aligned prediction columns"""
+
+    __slots__ = ("timestamp", "endpoint", "customers", "columns", "model_version")
+
+    def __init__(self, timestamp, endpoint, customers, columns, model_version):
+        self.timestamp = timestamp
+        self.endpoint = endpoint
+        self.customers = customers
+        self.columns = columns
+        self.model_version = model_version
+
+    def predictions(self) -> List[Optional[Dict]]:
+        """Per-customer prediction dicts, None for rows that were not scored"""
+        columns = [_as_list(self.columns[field]) for field in PREDICTION_FIELDS]
+        predictions = []
+        for values in zip(*columns):
+            probability = values[0]
+            if probability is None or probability != probability:  # NaN
+                predictions.append(None)
+            else:
+                predictions.append(dict(zip(PREDICTION_FIELDS, values)))
+        return predictions
+
+
+class _RotatingFile:
+    """Output file that is renamed into place when full or closed"""
+
+    def __init__(self, directory: Path, suffix: str, rotate_bytes: int):
+        self.directory = directory
+        self.suffix = suffix
+        self.rotate_bytes = rotate_bytes
+        self.path: Optional[Path] = None
+        self._sequence = 0
+
+    def next_path(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = self.directory / (
+            f"predictions-{stamp}-{os.getpid()}-{self._sequence:04d}"
+            f"{self.suffix}.inprogress"
+        )
+        return self.path
+
+    def is_full(self) -> bool:
+        return self.path is not None and self.path.stat().st_size >= self.rotate_bytes
+
+    def complete(self):
+        """Rename the current file to its final name"""
+        if self.path is not None:
+            self.path.rename(self.path.with_suffix(""))
+            self.path = None
+
+
+class _NDJSONWriter(_RotatingFile):
+    def __init__(self, directory: Path, rotate_bytes: int):
+        super().__init__(directory, ".ndjson", rotate_bytes)
+        self._file = None
+
+    def write(self, entries: Sequence[_Entry]):
+        lines = []
+        for entry in entries:
+            predictions = entry.predictions()
+            if entry.endpoint == "/predict":
+                if predictions[0] is None:
+                    continue
+                endpoint = "/predict"
+                request = entry.customers[0]
+                response = {**predictions[0], "model_version": entry.model_version}
+            else:
+                # Replayable as a /batch_predict request, whatever the source
+                endpoint = "/batch_predict"
+                request = {"customers": entry.customers}
+                scored = [
+                    {
+                        "customer_id": f"CUST_{i + 1:04d}",
+                        **prediction,
+                        "model_version": entry.model_version,
+                    }
+                    for i, prediction in enumerate(predictions)
+                    if prediction is not None
+                ]
+                response = {"predictions": scored, "model_version": entry.model_version}
+            lines.append(
+                dumps(
+                    {
+                        "timestamp": entry.timestamp,
+                        "endpoint": endpoint,
+                        "source": entry.endpoint,
+                        "request": request,
+                        "response": response,
+                    }
+                )
+            )
+
+        if not lines:
+            return
+        if self._file is None:
+            self._file = open(self.next_path(), "ab")
+        self._file.write(b"\n".join(lines) + b"\n")
+        self._file.flush()
+        if self.is_full():
+            self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.complete()
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    fields = [
+        ("timestamp", pa.float64()),
+        ("endpoint", pa.string()),
+        ("model_version", pa.string()),
+    ]
+    # Numbers as float64, since JSON clients may send 12.0 for an integer
+    for name, field in CustomerData.model_fields.items():
+        fields.append((name, pa.string() if field.annotation is str else pa.float64()))
+    fields += [
+        ("churn_probability", pa.float64()),
+        ("churn_prediction", pa.string()),
+        ("confidence", pa.float64()),
+        ("risk_level", pa.string()),
+    ]
+    return pa.schema(fields)
+
+
+class _ParquetWriter(_RotatingFile):
+    def __init__(self, directory: Path, rotate_bytes: int):
+        super().__init__(directory, ".parquet", rotate_bytes)
+        self._writer = None
+        self._schema = _parquet_schema()
+
+    def write(self, entries: Sequence[_Entry]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = []
+        for entry in entries:
+            for customer, prediction in zip(entry.customers, entry.predictions()):
+                if prediction is not None:
+                    rows.append(
+                        {
+                            "timestamp": entry.timestamp,
+                            "endpoint": entry.endpoint,
+                            "model_version": entry.model_version,
+                            **customer,
+                            **prediction,
+                        }
+                    )
+        if not rows:
+            return
+
+        table = pa.Table.from_pylist(rows, schema=self._schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.next_path(), self._schema)
+        self._writer.write_table(table)
+        if self.is_full():
+            self.close()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self.complete()
+
+
+class PredictionLog:
+    """Bounded queue of scored requests, written in batches by a background task
+
+    ``max_queue`` and ``batch_size`` count predictions (rows), not requests.
+    A batch is written when ``batch_size`` rows are queued or every
+    ``flush_interval`` seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        fmt: str = "ndjson",
+        max_queue: int = 100000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        rotate_bytes: int = 100 * 2**20,
+        overflow: str = "drop_new",
+        block_timeout_ms: float = 5.0,
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown prediction log format: {fmt}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown prediction log overflow policy: {overflow}")
+        if fmt == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise ValueError("Parquet prediction logs need pyarrow")
+
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout_ms / 1000
+        writer = _ParquetWriter if fmt == "parquet" else _NDJSONWriter
+        self._writer = writer(Path(directory), rotate_bytes)
+
+        self._entries: "deque[_Entry]" = deque()
+        self._rows = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def _ensure_started(self):
+        """Start the writer on the running event loop if it isn't already"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._loop is loop and not self._task.done():
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    def _drop(self, rows: int):
+        log_records.labels(result="dropped").inc(rows)
+
+    async def _wait_for_space(self, rows: int):
+        while self._rows + rows > self.max_queue:
+            self._space.clear()
+            await self._space.wait()
+
+    async def submit(
+        self,
+        endpoint: str,
+        customers: List[Dict],
+        columns: Mapping[str, Sequence],
+        model_version: Optional[str],
+    ) -> bool:
+        """Queue a scored request; returns False if it was dropped
+
+        ``columns`` maps each prediction field to one value per customer
+        (NaN/None for rows that were not scored).
+        """
+        rows = len(customers)
+        if not rows:
+            return True
+        self._ensure_started()
+
+        if self._rows + rows > self.max_queue:
+            if self.overflow == "drop_oldest" and rows <= self.max_queue:
+                while self._rows + rows > self.max_queue:
+                    oldest = self._entries.popleft()
+                    self._rows -= len(oldest.customers)
+                    self._drop(len(oldest.customers))
+            elif self.overflow == "block":
+                try:
+                    await asyncio.wait_for(
+                        self._wait_for_space(rows), self.block_timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._drop(rows)
+                    return False
+            else:
+                self._drop(rows)
+                return False
+
+        self._entries.append(
+            _Entry(time.time(), endpoint, customers, columns, model_version)
+        )
+        self._rows += rows
+        log_queue_rows.set(self._rows)
+        if self._rows >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far"""
+        if not self._entries:
+            return
+        entries = list(self._entries)
+        rows = self._rows
+        self._entries.clear()
+        self._rows = 0
+        log_queue_rows.set(0)
+        if self._space is not None:
+            self._space.set()
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._writer.write, entries)
+            log_records.labels(result="written").inc(rows)
+        except Exception as e:
+            logger.error(f"Prediction log write failed: {str(e)}")
+            log_records.labels(result="failed").inc(rows)
+        log_flush_seconds.observe(time.perf_counter() - start)
+
+    async def stop(self):
+        """Stop the writer, write what is queued and complete the current file"""
+        if self._task is not None and not self._task.done():
+            # Let a write in progress finish rather than cancel it midway
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+        self._task = None
+        self._stopping = False
+        await self.flush()
+        await asyncio.to_thread(self._writer.close)
@@ -0,0 +1,108 @@
+# app/reload.py
+
+import asyncio
+import logging
+import threading
+from typing import Optional, Tuple
+
+from prometheus_client import Counter
+
+from .executor import InferenceExecutor
+from .model import ChurnPredictor, get_predictor, swap_predictor
+
+logger = logging.getLogger(__name__)
+
+model_reloads = Counter(
+    "churn_model_reloads_total", "Model reload attempts", ["result"]
+)
+
+
+class ModelLoadError(Exception):
+    """Raised when new model artifacts cannot be loaded"""
+
+
+class ReloadInProgress(Exception):
+    """Raised when a reload is requested while another is still running"""
+
+
+class ModelReloader:
+    """Load, warm up and atomically swap in a new predictor
+
+    The new predictor is built in a background thread while the current one
+    keeps serving. Only a fully loaded and warmed-up predictor is swapped in;
+    if loading fails the current model stays active.
+    """
+
+    def __init__(self, executor: InferenceExecutor):
+        self.executor = executor
+        self._lock = threading.Lock()
+
+    def _load(self) -> ChurnPredictor:
+        new_predictor = ChurnPredictor()
+        new_predictor.model_path = get_predictor().model_path
+        if not new_predictor.load_model():
+            raise ModelLoadError(
+                f"Failed to load model from {new_predictor.model_path}"
+            )
+        new_predictor.warm_up()
+        return new_predictor
+
+    async def reload(self) -> Tuple[Optional[str], str]:
+        """Reload the model files, returning (previous version, new version)"""
+        if not self._lock.acquire(blocking=False):
+            raise ReloadInProgress("A model reload is already in progress")
+
+        try:
+            new_predictor = await asyncio.to_thread(self._load)
+        except Exception:
+            model_reloads.labels(result="failed").inc()
+            raise
+        finally:
+            self._lock.release()
+
+        old_predictor = swap_predictor(new_predictor)
+        self.executor.restart()
+        model_reloads.labels(result="success").inc()
+        logger.info(
+            f"Model reloaded: {old_predictor.model_version} -> "
+            f"{new_predictor.model_version}"
+        )
+        return old_predictor.model_version, new_predictor.model_version
+
+    @staticmethod
+    def _signature():
+        """Modification time and size of every artifact file"""
+        signature = []
+        for path in get_predictor().artifact_files:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return None
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    async def watch(self, interval: float = 10.0):
+        """Poll the artifact files and reload once a change has settled"""
+        current = self._signature()
+        pending = None
+
+        while True:
+            await asyncio.sleep(interval)
+            signature = self._signature()
+            if signature is None or signature == current:
+                pending = None
+                continue
+            if signature != pending:
+                # Files are still changing (or just changed); check again later
+                pending = signature
+                continue
+
+            try:
+                await self.reload()
+                current = signature
+            except ReloadInProgress:
+                continue
+            except Exception as e:
+                logger.error(f"Automatic model reload failed: {str(e)}")
+                current = signature
+            pending = None
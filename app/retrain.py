@@ -0,0 +1,436 @@
+# app/retrain.py
+"""
+Incremental retraining on new labelled customers
+
+Usage:
+    python -m app.retrain new_customers.csv
+    python -m app.retrain new_customers.parquet --history history.parquet \
+        --timestamp-column labelled_at --max-auc-drop 0.005
+
+Starts from the deployed model instead of refitting from scratch, so the
+time taken grows with the new rows rather than the whole history:
+
+- For linear models, StandardScaler statistics are updated with
+  ``partial_fit`` and the coefficients are re-expressed in the updated
+  scaled space, so predictions are unchanged until training continues.
+  Trees depend only on the order of each feature, so they keep the
+  deployed scaler
+- Random forests grow ``--new-trees`` trees fitted on the new rows, and
+  gradient boosting adds ``--new-trees`` stages fitted to its errors on them
+- Models with ``partial_fit`` take one pass over the new rows; logistic
+  regression runs up to ``--max-iter`` solver iterations from its current
+  coefficients
+
+The updated model must pass a validation gate before it is written. Its
+ROC AUC on validation rows (``--validation``, or a stratified slice of the
+new rows) is compared with a model refitted from scratch on ``--history``
+plus the new rows, or with the deployed model without ``--history``. If it
+is more than ``--max-auc-drop`` worse, or over ``--latency-budget-ms`` or
+``--batch-latency-budget-ms`` as measured by app.train (added trees make
+every prediction slower), nothing is written and the exit status is 1.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from .bundle import BUNDLE_FILENAME, load_bundle, save_bundle
+from .features import CATEGORICAL_COLUMNS, FeatureEncoder
+from .fusion import fuse_scaler
+from .train import (
+    TARGET_COLUMN,
+    TARGET_MAPPING,
+    Selection,
+    add_budget_arguments,
+    encode_frame,
+    evaluate,
+    measure_inference,
+    over_budget,
+    read_training_frame,
+    usable_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+GROWABLE_ENSEMBLES = (
+    RandomForestClassifier,
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+)
+
+# Largest prediction change accepted when moving a model to the new scaler
+RESCALE_TOLERANCE = 1e-9
+
+
+class Deployed(NamedTuple):
+    """The model currently served from a model directory"""
+
+    model: object
+    scaler: StandardScaler
+    feature_names: List[str]
+    metadata: Dict
+    version: str
+
+
+def load_deployed(model_dir: Path) -> Deployed:
+    """Load the bundle in model_dir, or else its separate artifact files"""
+    from .model import ChurnPredictor
+
+    bundle_file = Path(model_dir) / BUNDLE_FILENAME
+    if bundle_file.exists():
+        # Not memory-mapped: the arrays are about to be modified
+        payload = load_bundle(bundle_file, mmap_mode=None)
+        return Deployed(
+            payload["model"],
+            payload["scaler"],
+            payload["feature_layout"]["feature_names"],
+            payload["metadata"],
+            payload["checksum"][:12],
+        )
+
+    predictor = ChurnPredictor()
+    predictor.model_path = Path(model_dir)
+    if not predictor.load_legacy_artifacts():
+        raise RuntimeError(f"Failed to load model from {model_dir}")
+    return Deployed(
+        predictor.model,
+        predictor.scaler,
+        predictor.feature_names,
+        {},
+        predictor.model_version,
+    )
+
+
+def read_labelled(
+    path: Path,
+    encoder: FeatureEncoder,
+    timestamp_column: Optional[str] = None,
+    after: Optional[str] = None,
+) -> Tuple[np.ndarray, np.ndarray, Optional[pd.Timestamp]]:
+    """Encode labelled customers into the deployed feature layout
+
+    Rows the deployed layout cannot represent (unknown categories) are
+    dropped. With a timestamp column, so are rows labelled at or before
+    ``after``. Returns the features, the target and the latest timestamp.
+    """
+    extra = [timestamp_column] if timestamp_column else []
+    df = read_training_frame(path, extra)
+    valid = usable_rows(df)
+    for col in CATEGORICAL_COLUMNS:
+        valid &= df[col].isin(list(encoder.onehot_slots[col])).to_numpy()
+    if not valid.all():
+        logger.warning(
+            f"Dropping {int((~valid).sum())} rows of {path} with missing values "
+            "or categories the deployed model was not trained on"
+        )
+
+    latest = None
+    if timestamp_column:
+        timestamps = pd.to_datetime(df[timestamp_column], utc=True)
+        if after is not None:
+            valid &= (timestamps > pd.Timestamp(after)).to_numpy()
+        if valid.any():
+            latest = timestamps[valid].max()
+
+    df = df[valid].reset_index(drop=True)
+    X = np.empty((len(df), encoder.n_features))
+    encode_frame(df.drop(columns=[TARGET_COLUMN] + extra), encoder, X, 500000)
+    y = df[TARGET_COLUMN].map(TARGET_MAPPING).to_numpy(dtype=np.int8)
+    return X, y, latest
+
+
+def rescale_model(model, old_scaler: StandardScaler, new_scaler: StandardScaler):
+    """Re-express a model fitted on old_scaler's output on new_scaler's output
+
+    With z = (x - m) / s, the old scaled features are (z_new - a) / b for
+    a = (m_old - m_new) / s_new and b = s_old / s_new, which is itself a
+    standard scaling, so folding it into the model is a scaler fusion.
+    Returns None if the model type cannot be folded exactly.
+    """
+    bridge = StandardScaler()
+    bridge.mean_ = (old_scaler.mean_ - new_scaler.mean_) / new_scaler.scale_
+    bridge.scale_ = old_scaler.scale_ / new_scaler.scale_
+    bridge.var_ = bridge.scale_**2
+    bridge.n_features_in_ = old_scaler.n_features_in_
+    return fuse_scaler(model, bridge, RESCALE_TOLERANCE)
+
+
+def update_scaler(model, scaler: StandardScaler, X: np.ndarray):
+    """Fold new rows into the scaler statistics, moving the model along
+
+    Returns the model and scaler to continue training. Only logistic
+    regression can be moved to a new scaled space exactly; any other model
+    keeps the deployed scaler.
+    """
+    if not isinstance(model, LogisticRegression) or type(scaler) is not StandardScaler:
+        return model, scaler
+    updated = copy.deepcopy(scaler).partial_fit(X)
+    rescaled = rescale_model(model, scaler, updated)
+    if rescaled is None:
+        logger.warning("Cannot move the model to updated scaler statistics")
+        return model, scaler
+    return rescaled, updated
+
+
+def warm_start(model, X: np.ndarray, y: np.ndarray, new_trees: int, max_iter: int):
+    """Continue training a fitted model on new rows, in place"""
+    if isinstance(model, GROWABLE_ENSEMBLES):
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + new_trees)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+    elif hasattr(model, "partial_fit"):
+        model.partial_fit(X, y, classes=model.classes_)
+    elif isinstance(model, LogisticRegression):
+        deployed_max_iter = model.max_iter
+        model.set_params(warm_start=True, max_iter=max_iter)
+        model.fit(X, y)
+        model.set_params(warm_start=False, max_iter=deployed_max_iter)
+    else:
+        raise ValueError(
+            f"Incremental training not supported for {type(model).__name__}"
+        )
+    return model
+
+
+def row_hashes(X: np.ndarray) -> np.ndarray:
+    """A 64-bit hash of every encoded row"""
+    return pd.util.hash_pandas_object(pd.DataFrame(X), index=False).to_numpy()
+
+
+def full_refit(
+    deployed: Deployed,
+    history: Path,
+    X_new: np.ndarray,
+    y_new: np.ndarray,
+    X_holdout: Optional[np.ndarray] = None,
+) -> Tuple[object, StandardScaler]:
+    """The deployed model type and hyperparameters, fitted from scratch
+
+    History rows with the same features as a new or held-out validation row
+    are dropped first, so a customer in both files is fitted once, with the
+    new label, and validation rows are never fitted.
+    """
+    X_history, y_history, _ = read_labelled(
+        history, FeatureEncoder(deployed.feature_names)
+    )
+    batch = [X_new] if X_holdout is None else [X_new, X_holdout]
+    seen = np.isin(row_hashes(X_history), row_hashes(np.vstack(batch)))
+    if seen.any():
+        logger.info(f"Dropping {int(seen.sum())} history rows repeated in the new rows")
+        X_history, y_history = X_history[~seen], y_history[~seen]
+    X = np.vstack([X_history, X_new])
+    y = np.concatenate([y_history, y_new])
+    del X_history
+    scaler = StandardScaler().fit(X)
+    model = clone(deployed.model).fit(scaler.transform(X, copy=False), y)
+    return model, scaler
+
+
+def retrain(
+    data: Path,
+    model_dir: Path,
+    output: Optional[Path] = None,
+    validation: Optional[Path] = None,
+    validation_size: float = 0.2,
+    history: Optional[Path] = None,
+    timestamp_column: Optional[str] = None,
+    new_trees: int = 10,
+    max_iter: int = 20,
+    max_auc_drop: float = 0.005,
+    selection: Selection = Selection(),
+) -> Dict:
+    """Update the deployed model with new rows and write it if it passes the gate"""
+    output = Path(output or Path(model_dir) / BUNDLE_FILENAME)
+    deployed = load_deployed(model_dir)
+    encoder = FeatureEncoder(deployed.feature_names)
+    after = deployed.metadata.get("trained_through") if timestamp_column else None
+
+    X, y, latest = read_labelled(data, encoder, timestamp_column, after)
+    if not len(X):
+        raise ValueError(f"No new labelled rows in {data}")
+    if validation is not None:
+        X_val, y_val, _ = read_labelled(validation, encoder)
+    else:
+        X, X_val, y, y_val = train_test_split(
+            X, y, test_size=validation_size, stratify=y, random_state=42
+        )
+    if len(np.unique(y_val)) < 2:
+        raise ValueError("Validation rows need both churned and retained customers")
+
+    start_time = time.perf_counter()
+    model, scaler = update_scaler(copy.deepcopy(deployed.model), deployed.scaler, X)
+    warm_start(model, scaler.transform(X), y, new_trees, max_iter)
+    incremental_seconds = time.perf_counter() - start_time
+    metrics = evaluate(y_val, model.predict_proba(scaler.transform(X_val))[:, 1])
+
+    if history is not None:
+        start_time = time.perf_counter()
+        reference_model, reference_scaler = full_refit(deployed, history, X, y, X_val)
+        reference = "full_refit"
+        reference_seconds = time.perf_counter() - start_time
+    else:
+        reference_model, reference_scaler = deployed.model, deployed.scaler
+        reference = "deployed"
+        reference_seconds = None
+    reference_metrics = evaluate(
+        y_val,
+        reference_model.predict_proba(reference_scaler.transform(X_val))[:, 1],
+    )
+
+    auc_drop = reference_metrics["auc_roc"] - metrics["auc_roc"]
+    latency = measure_inference(
+        model, scaler, deployed.feature_names, X_val, selection.batch_size
+    )
+    latency.pop("size_bytes")
+    over = over_budget(latency, selection)
+    results = {
+        "base_model_version": deployed.version,
+        "rows": len(X),
+        "validation_rows": len(X_val),
+        "incremental_seconds": incremental_seconds,
+        "reference": reference,
+        "reference_seconds": reference_seconds,
+        "metrics": metrics,
+        "reference_metrics": reference_metrics,
+        "auc_drop": auc_drop,
+        "max_auc_drop": max_auc_drop,
+        "latency": latency,
+        "over_budget": over,
+        "passed": auc_drop <= max_auc_drop and not over,
+        "bundle": None,
+    }
+    if not results["passed"]:
+        return results
+
+    metadata = {
+        "source": "app.retrain",
+        "base_model_version": deployed.version,
+        "incremental_rows": len(X),
+        "validation_auc": metrics["auc_roc"],
+        "reference": reference,
+        "reference_auc": reference_metrics["auc_roc"],
+        "latency": latency,
+        "selection": selection._asdict(),
+    }
+    if "drift_profile" in deployed.metadata:
+        # The new rows are a small part of what the model has been trained on
+        metadata["drift_profile"] = deployed.metadata["drift_profile"]
+    trained_through = latest or after
+    if trained_through is not None:
+        metadata["trained_through"] = pd.Timestamp(trained_through).isoformat()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    checksum = save_bundle(output, model, scaler, deployed.feature_names, metadata)
+    results.update(bundle=str(output), checksum=checksum)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally retrain the model")
+    parser.add_argument("data", type=Path, help="New labelled .csv or .parquet rows")
+    parser.add_argument(
+        "--model-dir",
+        type=Path,
+        default=Path(__file__).parent,
+        help="Directory holding the deployed model",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Bundle to write (default: in --model-dir)"
+    )
+    parser.add_argument("--validation", type=Path, help="Labelled validation rows")
+    parser.add_argument(
+        "--validation-size",
+        type=float,
+        default=0.2,
+        help="Share of the new rows held out when --validation is not given",
+    )
+    parser.add_argument(
+        "--history", type=Path, help="Full history, to gate against a full refit"
+    )
+    parser.add_argument(
+        "--timestamp-column",
+        help="ISO-8601 label time; rows already trained on are skipped",
+    )
+    parser.add_argument(
+        "--new-trees", type=int, default=10, help="Trees or stages added to ensembles"
+    )
+    parser.add_argument(
+        "--max-iter",
+        type=int,
+        default=20,
+        help="Solver iterations for logistic regression",
+    )
+    parser.add_argument(
+        "--max-auc-drop",
+        type=float,
+        default=0.005,
+        help="Largest AUC shortfall against the reference that still passes",
+    )
+    add_budget_arguments(parser)
+    parser.add_argument("--report", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    results = retrain(
+        args.data,
+        args.model_dir,
+        output=args.output,
+        validation=args.validation,
+        validation_size=args.validation_size,
+        history=args.history,
+        timestamp_column=args.timestamp_column,
+        new_trees=args.new_trees,
+        max_iter=args.max_iter,
+        max_auc_drop=args.max_auc_drop,
+        selection=Selection(
+            latency_budget_ms=args.latency_budget_ms,
+            batch_latency_budget_ms=args.batch_latency_budget_ms,
+            batch_size=args.latency_batch_size,
+        ),
+    )
+    if args.report:
+        args.report.write_text(json.dumps(results, indent=2) + "\n")
+
+    print(
+        f"Incremental update on {results['rows']} rows in "
+        f"{results['incremental_seconds']:.1f}s: validation AUC "
+        f"{results['metrics']['auc_roc']:.4f}, p99 latency "
+        f"{results['latency']['single_row_p99_ms']:.2f}ms"
+    )
+    reference_seconds = results["reference_seconds"]
+    print(
+        f"Reference ({results['reference']}"
+        + (f", {reference_seconds:.1f}s" if reference_seconds is not None else "")
+        + f"): validation AUC {results['reference_metrics']['auc_roc']:.4f}"
+    )
+    if not results["passed"]:
+        if results["over_budget"]:
+            reason = f"over the latency budget: {', '.join(results['over_budget'])}"
+        else:
+            reason = (
+                f"AUC {results['auc_drop']:.4f} below the reference, "
+                f"more than --max-auc-drop {args.max_auc_drop}"
+            )
+        print(f"\nGATE FAILED: {reason}. Nothing was written.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {results['bundle']} (sha256 {results['checksum']})")
+
+
+if __name__ == "__main__":
+    main()
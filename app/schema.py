@@ -1,6 +1,6 @@
 # app/schema.py
 
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, validator
 
@@ -103,6 +103,11 @@ class PredictionResponse(BaseModel):
     churn_prediction: str = Field(..., description="Churn prediction (Yes/No)")
     confidence: float = Field(..., ge=0, le=1, description="Model confidence")
     risk_level: str = Field(..., description="Risk level (Low/Medium/High)")
+    model_version: Optional[str] = Field(
+        None, description="Version of the model that made the prediction"
+    )
+
+    model_config = {"protected_namespaces": ()}
 
 
 class BatchPredictionRequest(BaseModel):
@@ -121,6 +126,19 @@ class BatchPredictionResponse(BaseModel):
     )
     total_processed: int = Field(..., description="Total number of customers processed")
     high_risk_count: int = Field(..., description="Number of high-risk customers")
+    model_version: Optional[str] = Field(
+        None, description="Version of the model that made the predictions"
+    )
+
+    model_config = {"protected_namespaces": ()}
+
+
+class StreamSummary(BaseModel):
+    """Trailing summary record of a streamed batch prediction"""
+
+    total_processed: int = Field(..., description="Total number of customers processed")
+    high_risk_count: int = Field(..., description="Number of high-risk customers")
+    error_count: int = Field(..., description="Number of lines that failed")
 
 
 # Update the HealthResponse class in app/schema.py to fix the warning
@@ -0,0 +1,226 @@
+# app/score_file.py
+"""
+Offline bulk scoring of customer files
+
+Usage:
+    python -m app.score_file customers.csv predictions.csv
+    python -m app.score_file customers.parquet predictions.parquet \
+        --chunk-size 100000 --workers 8 --id-column customerID
+
+The input is read in fixed-size chunks, each chunk is encoded column-wise and
+scored with a single model call, and chunks are fanned out across a process
+pool. Predictions are written in input order. Parquet support needs pyarrow.
+"""
+
+import argparse
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from .features import NUMERIC_COLUMNS
+from .model import ChurnPredictor
+from .schema import CustomerData
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_COLUMNS = [
+    "churn_probability",
+    "churn_prediction",
+    "confidence",
+    "risk_level",
+    "error",
+]
+
+# Per-process predictor, loaded once by the pool initializer
+_worker_predictor: Optional[ChurnPredictor] = None
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet files need pyarrow: pip install pyarrow")
+
+
+def read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the input file as DataFrames of at most chunk_size rows"""
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Append prediction chunks to a CSV or Parquet file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, df: pd.DataFrame):
+        if self.path.suffix == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(
+                self.path,
+                mode="w" if self._first else "a",
+                header=self._first,
+                index=False,
+            )
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def load_predictor(model_dir: Optional[str]) -> ChurnPredictor:
+    """Load a predictor from model_dir (defaults to the app directory)"""
+    predictor = ChurnPredictor()
+    if model_dir:
+        predictor.model_path = Path(model_dir)
+    if not predictor.load_model():
+        raise RuntimeError(f"Failed to load model from {predictor.model_path}")
+    return predictor
+
+
+def _init_worker(model_dir: Optional[str]):
+    global _worker_predictor
+    _worker_predictor = load_predictor(model_dir)
+
+
+def score_chunk(
+    chunk: pd.DataFrame,
+    predictor: Optional[ChurnPredictor] = None,
+    id_column: Optional[str] = None,
+) -> pd.DataFrame:
+    """Encode and score one chunk with a single vectorized model call
+
+    Rows the API would reject (unknown or blank categories, missing or
+    out-of-range numbers) are not scored and get an error message instead.
+    """
+    predictor = predictor or _worker_predictor
+    columns = {col: chunk[col].to_numpy() for col in chunk.columns}
+    # Blanks or junk in numeric columns become NaN and are reported as row errors
+    for col in NUMERIC_COLUMNS:
+        if col in columns:
+            columns[col] = pd.to_numeric(chunk[col], errors="coerce").to_numpy()
+    missing = [col for col in CustomerData.model_fields if col not in columns]
+    if missing:
+        raise ValueError(f"Input is missing columns: {', '.join(missing)}")
+
+    errors = predictor.get_validator().column_errors(columns, len(chunk))
+    X, encode_errors = predictor.preprocess_columns(columns, len(chunk))
+    for i, error in encode_errors.items():
+        errors.setdefault(i, error)
+    scored = predictor.predict_arrays(X, errors)
+
+    output = pd.DataFrame(scored)
+    output["error"] = pd.Series(errors, dtype=object).reindex(range(len(chunk)))
+    if id_column:
+        output.insert(0, id_column, chunk[id_column].to_numpy())
+    return output[([id_column] if id_column else []) + OUTPUT_COLUMNS]
+
+
+def score_file(
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 50000,
+    workers: int = 1,
+    model_dir: Optional[str] = None,
+    id_column: Optional[str] = None,
+) -> dict:
+    """Score input_path into output_path, returning run statistics"""
+    if output_path.suffix == ".parquet":
+        _require_pyarrow()
+
+    start_time = time.time()
+    rows = errors = high_risk = 0
+    writer = ChunkWriter(output_path)
+
+    def report(output: pd.DataFrame):
+        nonlocal rows, errors, high_risk
+        writer.write(output)
+        rows += len(output)
+        errors += int(output["error"].notna().sum())
+        high_risk += int((output["risk_level"] == "High").sum())
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Scored {rows} rows ({errors} errors) in {elapsed:.1f}s, "
+            f"{rows / max(elapsed, 1e-9):,.0f} rows/sec"
+        )
+
+    try:
+        if workers <= 1:
+            predictor = load_predictor(model_dir)
+            for chunk in read_chunks(input_path, chunk_size):
+                report(score_chunk(chunk, predictor, id_column))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(model_dir,)
+            ) as pool:
+                # Keep a bounded window of chunks in flight and write them in order
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(score_chunk, chunk, None, id_column))
+                    if len(pending) >= workers * 2:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.time() - start_time
+    return {
+        "rows": rows,
+        "errors": errors,
+        "high_risk": high_risk,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a customer CSV/Parquet file")
+    parser.add_argument("input", type=Path, help="Input .csv or .parquet file")
+    parser.add_argument("output", type=Path, help="Output .csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes")
+    parser.add_argument("--model-dir", help="Directory holding the model artifacts")
+    parser.add_argument("--id-column", help="Input column copied to the output")
+    args = parser.parse_args(argv)
+
+    stats = score_file(
+        args.input,
+        args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        model_dir=args.model_dir,
+        id_column=args.id_column,
+    )
+    print(
+        f"Scored {stats['rows']} rows ({stats['errors']} errors, "
+        f"{stats['high_risk']} high risk) in {stats['seconds']:.1f}s "
+        f"- {stats['rows_per_second']:,.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
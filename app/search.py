@@ -0,0 +1,489 @@
+# app/search.py
+"""
+Successive-halving hyperparameter search
+
+Usage:
+    python -m app.search data/telco_churn.csv
+    python -m app.search history.parquet --trials 81 --eta 3 --min-rows 5000 \
+        --n-jobs 16 --output app/churn_bundle.joblib
+
+Random configurations of every candidate model are sampled from
+SEARCH_SPACES. Each round (rung) fits the surviving configurations on a
+random slice of the training rows, scores them on the same validation rows,
+and promotes the best 1/eta to the next rung, which has eta times the rows.
+The last rung uses every training row. Cheap configurations are discarded
+after seeing a small slice, so most of the compute goes to the promising
+ones. The fits of a rung run in parallel on the training pipeline's process
+pool and share its cached feature matrix.
+
+The finalists (the trials of the last rung that fitted more than one) are
+refitted on the whole training split and timed, and one is chosen as
+app.train chooses its candidates: the best validation AUC within the
+latency budgets, or the fastest within ``--max-auc-loss`` of it. It is
+scored on the held-out test split and written as a model bundle; if no
+finalist meets the budgets, nothing is written. With mlflow installed, the
+search is logged as one MLflow run with a nested run per trial. Each
+trial's run is created with its parameters when the first rung finishes,
+and gets its validation AUC for every later rung as that rung finishes, so
+an interrupted search keeps what it had logged.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from scipy.stats import loguniform
+from sklearn.model_selection import ParameterSampler
+
+from .bundle import BUNDLE_FILENAME, save_bundle
+from .train import (
+    CANDIDATES,
+    Dataset,
+    Selection,
+    Split,
+    add_budget_arguments,
+    choose_model,
+    drift_profile,
+    load_matrix,
+    measure_inference,
+    prepare_dataset,
+    run_tasks,
+    split_rows,
+)
+
+try:
+    import mlflow
+except ImportError:
+    mlflow = None
+
+logger = logging.getLogger(__name__)
+
+# Hyperparameters sampled for each candidate model
+SEARCH_SPACES = {
+    "LogisticRegression": {
+        "C": loguniform(1e-3, 1e2),
+        "class_weight": [None, "balanced"],
+    },
+    "RandomForestClassifier": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 8, 16, 32],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", 0.5],
+    },
+    "GradientBoostingClassifier": {
+        "n_estimators": [100, 200, 400],
+        "learning_rate": loguniform(0.01, 0.3),
+        "max_depth": [2, 3, 4, 5],
+        "subsample": [0.7, 0.85, 1.0],
+    },
+}
+
+DEFAULT_TRACKING_URI = "sqlite:///mlflow.db"
+
+# CV fold whose validation rows score every rung
+VALIDATION_FOLD = 0
+
+
+def sample_trials(
+    candidates: Sequence[str], n_trials: int, random_state: int = 42
+) -> List[Dict]:
+    """Sample n_trials configurations, shared out evenly between candidates"""
+    trials = []
+    for k, name in enumerate(candidates):
+        count = n_trials // len(candidates) + (k < n_trials % len(candidates))
+        if not count:
+            continue
+        sampler = ParameterSampler(
+            SEARCH_SPACES[name], n_iter=count, random_state=random_state
+        )
+        for params in sampler:
+            trials.append(
+                {
+                    "id": len(trials),
+                    "name": name,
+                    # NumPy scalars from the distributions, as plain Python values
+                    "params": {
+                        key: value.item() if hasattr(value, "item") else value
+                        for key, value in params.items()
+                    },
+                    "rungs": [],
+                }
+            )
+    return trials
+
+
+def rung_sizes(total_rows: int, min_rows: int, eta: int) -> List[int]:
+    """Rows fitted at each rung: min_rows growing by eta, ending at total_rows"""
+    sizes = []
+    rows = min_rows
+    while rows < total_rows:
+        sizes.append(rows)
+        rows *= eta
+    return sizes + [total_rows]
+
+
+def successive_halving(
+    dataset: Dataset,
+    trials: List[Dict],
+    split: Split,
+    min_rows: int,
+    eta: int = 3,
+    n_jobs: int = 1,
+    on_rung: Optional[Callable[[int, List[Dict]], None]] = None,
+) -> Dict:
+    """Run the rungs and return the winning trial
+
+    Every trial's ``rungs`` list gets one entry per rung it was fitted in.
+    ``on_rung(rung, trials)`` is called with the trials fitted in each rung
+    as soon as it finishes.
+    """
+    _, y = load_matrix(dataset.directory)
+    fit_rows = len(split_rows(y, split, VALIDATION_FOLD)[0])
+    sizes = rung_sizes(fit_rows, min(min_rows, fit_rows), eta)
+    survivors = trials
+    for rung, rows in enumerate(sizes):
+        start_time = time.perf_counter()
+        tasks = [
+            (
+                dataset.directory,
+                trial["name"],
+                split,
+                VALIDATION_FOLD,
+                trial["params"],
+                rows,
+            )
+            for trial in survivors
+        ]
+        for trial, result in zip(survivors, run_tasks(tasks, n_jobs)):
+            trial["rungs"].append(
+                {
+                    "rung": rung,
+                    "rows": result["rows"],
+                    "auc_roc": result["metrics"]["auc_roc"],
+                    "fit_seconds": result["fit_seconds"],
+                }
+            )
+
+        if on_rung is not None:
+            on_rung(rung, survivors)
+
+        survivors = sorted(
+            survivors, key=lambda t: t["rungs"][-1]["auc_roc"], reverse=True
+        )
+        logger.info(
+            f"Rung {rung}: {len(survivors)} trial(s) on {rows} rows in "
+            f"{time.perf_counter() - start_time:.1f}s, best validation AUC "
+            f"{survivors[0]['rungs'][-1]['auc_roc']:.4f}"
+        )
+        if len(survivors) == 1:
+            break
+        if rung < len(sizes) - 1:
+            survivors = survivors[: max(1, len(survivors) // eta)]
+    return survivors[0]
+
+
+def finalists(trials: List[Dict]) -> Tuple[int, List[Dict]]:
+    """The last rung that fitted more than one trial, and its trials, best first
+
+    Their validation AUCs at that rung are on the same rows, so they can be
+    compared. A search of one trial has just that trial.
+    """
+    depth = max(len(trial["rungs"]) for trial in trials)
+    while depth > 1 and sum(len(t["rungs"]) >= depth for t in trials) < 2:
+        depth -= 1
+    rung = depth - 1
+    reached = [trial for trial in trials if len(trial["rungs"]) > rung]
+    return rung, sorted(
+        reached, key=lambda t: t["rungs"][rung]["auc_roc"], reverse=True
+    )
+
+
+def log_rung(rung: int, trials: List[Dict]):
+    """Log a finished rung to the nested run of each trial fitted in it
+
+    Runs inside the search's parent MLflow run. A trial's run is created,
+    with its parameters, the first time it is logged; its id is kept in
+    the trial so later rungs are added to the same run.
+    """
+    for trial in trials:
+        step = trial["rungs"][-1]
+        run_id = trial.get("run_id")
+        with mlflow.start_run(
+            run_id=run_id,
+            run_name=None if run_id else f"trial-{trial['id']}",
+            nested=True,
+        ) as run:
+            if run_id is None:
+                trial["run_id"] = run.info.run_id
+                mlflow.log_param("model", trial["name"])
+                mlflow.log_params(trial["params"])
+            mlflow.log_metric("validation_auc", step["auc_roc"], step=rung)
+            mlflow.log_metric("rows", step["rows"], step=rung)
+            mlflow.set_tag("rungs_completed", len(trial["rungs"]))
+
+
+def log_selection(results: Dict, bundle: Path):
+    """Record the winner and its test metrics once the search has finished"""
+    mlflow.log_metrics(results["test_metrics"])
+    mlflow.set_tag("best_trial", results["best"]["id"])
+    for trial in results["trials"]:
+        with mlflow.start_run(run_id=trial["run_id"], nested=True):
+            mlflow.set_tag("selected", str(trial is results["best"]).lower())
+            if "latency" in trial:
+                mlflow.log_metrics(trial["latency"])
+    mlflow.log_artifact(str(bundle))
+
+
+def search(
+    data: Path,
+    output: Path,
+    cache_dir: Optional[Path] = None,
+    candidates: Sequence[str] = tuple(CANDIDATES),
+    n_trials: int = 27,
+    eta: int = 3,
+    min_rows: int = 1000,
+    split: Split = Split(),
+    n_jobs: int = 1,
+    experiment: Optional[str] = None,
+    tracking_uri: str = DEFAULT_TRACKING_URI,
+    selection: Selection = Selection(),
+) -> Dict:
+    """Search hyperparameters on data and write the winner as a model bundle
+
+    Raises ValueError, writing nothing, if no finalist meets the latency
+    budget.
+    """
+    if experiment and mlflow is None:
+        raise RuntimeError("MLflow logging needs mlflow: pip install mlflow")
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+    if split.cv_folds < 2:
+        raise ValueError("cv_folds must be at least 2 to hold out validation rows")
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    start_time = time.time()
+    trials = sample_trials(candidates, n_trials, split.random_state)
+    settings = {
+        "trials": n_trials,
+        "eta": eta,
+        "min_rows": min_rows,
+        "cv_folds": split.cv_folds,
+        "test_size": split.test_size,
+        "random_state": split.random_state,
+    }
+    with contextlib.ExitStack() as stack:
+        if experiment:
+            mlflow.set_tracking_uri(tracking_uri)
+            mlflow.set_experiment(experiment)
+            stack.enter_context(mlflow.start_run(run_name="successive-halving"))
+            mlflow.log_params(settings)
+        results = _search(
+            data,
+            output,
+            cache_dir,
+            trials,
+            split,
+            min_rows,
+            eta,
+            n_jobs,
+            selection,
+            log_rung if experiment else None,
+        )
+        results.update(
+            settings=settings, seconds=time.time() - start_time, bundle=str(output)
+        )
+        if experiment:
+            log_selection(results, Path(output))
+    return results
+
+
+def _search(
+    data, output, cache_dir, trials, split, min_rows, eta, n_jobs, selection, on_rung
+):
+    with tempfile.TemporaryDirectory() as scratch:
+        dataset, cached = prepare_dataset(data, cache_dir or scratch)
+        if cached:
+            logger.info(f"Using cached features from {dataset.directory}")
+        if on_rung is not None:
+            mlflow.set_tag("data_sha256", dataset.sha256)
+        successive_halving(dataset, trials, split, min_rows, eta, n_jobs, on_rung)
+
+        # The finalists, refitted on the whole training split and timed as
+        # app.train times its candidates, then chosen by the same rules
+        rung, contenders = finalists(trials)
+        refits = run_tasks(
+            [
+                (dataset.directory, trial["name"], split, None, trial["params"])
+                for trial in contenders
+            ],
+            n_jobs,
+        )
+        X, y = load_matrix(dataset.directory)
+        _, test = split_rows(y, split)
+        X_test = X[test[: selection.batch_size]]
+        summary = {}
+        for trial, refit in zip(contenders, refits):
+            latency = measure_inference(
+                refit["model"],
+                refit["scaler"],
+                dataset.feature_names,
+                X_test,
+                selection.batch_size,
+            )
+            latency.pop("size_bytes")
+            trial["latency"] = latency
+            summary[trial["id"]] = {
+                "latency": latency,
+                "cv_auc_mean": trial["rungs"][rung]["auc_roc"],
+            }
+        chosen = choose_model(summary, selection)
+        best, final = next(
+            (trial, refit)
+            for trial, refit in zip(contenders, refits)
+            if trial["id"] == chosen
+        )
+        profile = drift_profile(dataset, final["model"], final["scaler"], split)
+
+    checksum = save_bundle(
+        output,
+        final["model"],
+        final["scaler"],
+        dataset.feature_names,
+        metadata={
+            "source": "app.search",
+            "training_data": str(data),
+            "training_data_sha256": dataset.sha256,
+            "training_rows": dataset.rows,
+            "params": best["params"],
+            "validation_auc": best["rungs"][-1]["auc_roc"],
+            "test_metrics": final["metrics"],
+            "latency": best["latency"],
+            "selection": selection._asdict(),
+            "drift_profile": profile,
+        },
+    )
+
+    return {
+        "best": best,
+        "test_metrics": final["metrics"],
+        "latency": best["latency"],
+        "finalists": [trial["id"] for trial in contenders],
+        "trials": trials,
+        "rows": dataset.rows,
+        "cached": cached,
+        "checksum": checksum,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving model search")
+    parser.add_argument("data", type=Path, help="Training .csv or .parquet file")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(__file__).parent / BUNDLE_FILENAME,
+        help="Model bundle to write",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(".train_cache"),
+        help="Where encoded training matrices are cached",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Encode the data for this run only"
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=list(CANDIDATES),
+        choices=list(CANDIDATES),
+        help="Model families to search",
+    )
+    parser.add_argument("--trials", type=int, default=27, help="Configurations sampled")
+    parser.add_argument(
+        "--eta",
+        type=int,
+        default=3,
+        help="Rows grow and trials shrink by this per rung",
+    )
+    parser.add_argument(
+        "--min-rows", type=int, default=1000, help="Rows fitted at the first rung"
+    )
+    parser.add_argument(
+        "--cv-folds",
+        type=int,
+        default=5,
+        help="1/cv-folds of the training split is held out for validation",
+    )
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes fitting the trials of a rung",
+    )
+    parser.add_argument("--experiment", help="Log the search to this MLflow experiment")
+    parser.add_argument(
+        "--tracking-uri", default=DEFAULT_TRACKING_URI, help="MLflow tracking URI"
+    )
+    add_budget_arguments(parser)
+    parser.add_argument(
+        "--max-auc-loss",
+        type=float,
+        default=0.0,
+        help="Pick the fastest finalist within this much validation AUC of the best",
+    )
+    parser.add_argument("--report", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        results = search(
+            args.data,
+            args.output,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            candidates=args.models,
+            n_trials=args.trials,
+            eta=args.eta,
+            min_rows=args.min_rows,
+            split=Split(test_size=args.test_size, cv_folds=args.cv_folds),
+            n_jobs=args.n_jobs,
+            experiment=args.experiment,
+            tracking_uri=args.tracking_uri,
+            selection=Selection(
+                latency_budget_ms=args.latency_budget_ms,
+                batch_latency_budget_ms=args.batch_latency_budget_ms,
+                batch_size=args.latency_batch_size,
+                max_auc_loss=args.max_auc_loss,
+            ),
+        )
+    except ValueError as e:
+        sys.exit(f"Nothing written: {e}")
+
+    best = results["best"]
+    print(f"Best trial {best['id']}: {best['name']} {json.dumps(best['params'])}")
+    for step in best["rungs"]:
+        print(
+            f"  rung {step['rung']}: {step['rows']} rows, "
+            f"validation AUC {step['auc_roc']:.4f}"
+        )
+    print(
+        f"Test AUC {results['test_metrics']['auc_roc']:.4f}, "
+        f"{len(results['trials'])} trials in {results['seconds']:.1f}s, "
+        f"p99 latency {results['latency']['single_row_p99_ms']:.2f}ms"
+    )
+    print(f"Wrote {results['bundle']} (sha256 {results['checksum']})")
+    if args.report:
+        args.report.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# app/serialization.py
+"""
+Fast JSON encoding of prediction responses
+
+Batch responses are written straight from the scored NumPy arrays, with
+no Pydantic model per row and no second validation/encoding pass by
+FastAPI. The bytes follow the ``BatchPredictionResponse`` schema field for
+field. orjson is used when installed (``pip install orjson``); otherwise
+the standard library encoder is used.
+"""
+
+import json
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# PredictionResponse fields taken from the scored arrays, in schema order
+PREDICTION_FIELDS = (
+    "churn_probability",
+    "churn_prediction",
+    "confidence",
+    "risk_level",
+)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode plain JSON data (dicts, lists, str, int, float, None) to bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def batch_response_json(
+    scored: Dict[str, np.ndarray],
+    valid: np.ndarray,
+    model_version: str,
+    high_risk_count: int,
+) -> bytes:
+    """Encode the scored rows marked valid as a BatchPredictionResponse body"""
+    rows = np.flatnonzero(valid)
+    columns = [scored[field][rows].tolist() for field in PREDICTION_FIELDS]
+    predictions = [
+        {
+            "customer_id": f"CUST_{i + 1:04d}",
+            "churn_probability": probability,
+            "churn_prediction": prediction,
+            "confidence": confidence,
+            "risk_level": risk_level,
+            "model_version": model_version,
+        }
+        for i, probability, prediction, confidence, risk_level in zip(
+            rows.tolist(), *columns
+        )
+    ]
+    return dumps(
+        {
+            "predictions": predictions,
+            "total_processed": len(predictions),
+            "high_risk_count": high_risk_count,
+            "model_version": model_version,
+        }
+    )
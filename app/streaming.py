@@ -0,0 +1,38 @@
+# app/streaming.py
+
+from typing import AsyncIterator, Tuple
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streaming response that lets the body iterator keep reading the request
+
+    ``StreamingResponse`` listens for client disconnects by consuming
+    ``receive`` concurrently, which would swallow the request body chunks we
+    still need. Here the body iterator is the only reader of ``receive``; a
+    disconnect surfaces as ``ClientDisconnect`` from ``Request.stream()``.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Split a byte stream into (line number, line) pairs, skipping blank lines"""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    if buffer.strip():
+        yield line_no + 1, buffer
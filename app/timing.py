@@ -0,0 +1,170 @@
+# app/timing.py
+"""
+Per-stage latency of the prediction pipeline
+
+A request handler creates a ``StageTimer``, times its own stages with
+``timed(timer, ...)`` and passes the timer to the inference pool. The
+pipeline code marks its stages with ``with stage("preprocess"):``;
+these only read a context variable and do nothing unless a timer is active,
+so uninstrumented calls (tests, scripts, micro-batches) pay next to nothing.
+Work done in a pool worker is timed there and the durations are returned
+with the result, so process workers are covered too.
+
+Durations are exported as ``churn_stage_latency_seconds`` by endpoint and
+stage, and for batch endpoints also per input row. They can also be sent
+back to the client in a ``Server-Timing`` header.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import Histogram
+
+stage_latency = Histogram(
+    "churn_stage_latency_seconds",
+    "Time spent in each stage of the prediction pipeline",
+    ["endpoint", "stage"],
+    buckets=(
+        0.00005,
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+    ),
+)
+
+stage_latency_per_row = Histogram(
+    "churn_stage_latency_per_row_seconds",
+    "Time spent in each stage of a batch prediction, divided by its rows",
+    ["endpoint", "stage"],
+    buckets=(
+        0.0000001,
+        0.00000025,
+        0.0000005,
+        0.000001,
+        0.0000025,
+        0.000005,
+        0.00001,
+        0.000025,
+        0.00005,
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+    ),
+)
+
+# Timer of the call running in this thread / task, if it is being timed
+_active: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+# (histogram, endpoint, stage) -> labelled child, to skip the label lookup
+_children: Dict[Tuple[int, str, str], object] = {}
+
+
+def _child(histogram: Histogram, endpoint: str, name: str):
+    key = (id(histogram), endpoint, name)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = histogram.labels(endpoint=endpoint, stage=name)
+    return child
+
+
+class StageTimer:
+    """Accumulate the time a request spends in each pipeline stage"""
+
+    __slots__ = ("durations",)
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def merge(self, durations: Dict[str, float]):
+        for name, seconds in durations.items():
+            self.add(name, seconds)
+
+    def observe(self, endpoint: str, rows: Optional[int] = None):
+        """Export the durations, per row as well when rows is given"""
+        for name, seconds in self.durations.items():
+            _child(stage_latency, endpoint, name).observe(seconds)
+            if rows:
+                _child(stage_latency_per_row, endpoint, name).observe(seconds / rows)
+
+    def server_timing(self) -> str:
+        """Format the durations as a Server-Timing header value (milliseconds)"""
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.3f}"
+            for name, seconds in self.durations.items()
+        )
+
+
+class _Stage:
+    __slots__ = ("name", "timer", "start")
+
+    def __init__(self, name: str, timer: StageTimer):
+        self.name = name
+        self.timer = timer
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+# Shared by every untimed block, so they allocate nothing
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """Time a block as ``name`` if the current call is being timed"""
+    timer = _active.get()
+    if timer is None:
+        return _NULL_STAGE
+    return _Stage(name, timer)
+
+
+def timed(timer: Optional[StageTimer], name: str):
+    """Time a block of a request handler as ``name`` if timer is not None"""
+    if timer is None:
+        return _NULL_STAGE
+    return _Stage(name, timer)
+
+
+def call_timed(fn, *args) -> Tuple[object, Dict[str, float], float]:
+    """Run ``fn(*args)`` with a fresh active timer
+
+    Returns the result, the stage durations recorded inside the call and
+    the call's total duration. Used by the inference pool workers.
+    """
+    timer = StageTimer()
+    token = _active.set(timer)
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    finally:
+        _active.reset(token)
+    return result, timer.durations, time.perf_counter() - start
@@ -0,0 +1,774 @@
+# app/train.py
+"""
+Training pipeline
+
+Usage:
+    python -m app.train data/telco_churn.csv
+    python -m app.train history.parquet --n-jobs 16 --cv-folds 5 \
+        --output app/churn_bundle.joblib
+
+Customers are encoded by the same FeatureEncoder the API uses, so training
+and serving features cannot drift apart. The encoded matrix is cached on
+disk, keyed by the contents of the input file, and every worker
+memory-maps it instead of receiving a copy. The cross-validation folds and
+final fit of every candidate model are independent tasks spread across a
+process pool. Parquet input needs pyarrow.
+
+Every candidate's final model is also loaded the way the API loads a bundle
+(FUSED_SCALER, TREE_ENGINE and INFERENCE_PRECISION apply) and timed scoring
+one row and a batch of held-out rows; its bundle size is recorded too. The
+candidate with the best mean cross-validated ROC AUC is written as a model
+bundle, except that:
+
+- ``--latency-budget-ms`` and ``--batch-latency-budget-ms`` rule out
+  candidates whose p99 single-row or batch latency is over budget. If none
+  is left, nothing is written
+- ``--max-auc-loss`` picks the fastest candidate whose AUC is within that
+  much of the best, trading a little accuracy for latency along the
+  accuracy-latency Pareto front
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from .bundle import BUNDLE_FILENAME, save_bundle
+from .drift import feature_profile, probability_profile
+from .features import (
+    BINARY_MAPPINGS,
+    CATEGORICAL_COLUMNS,
+    ENGINEERED_FEATURES,
+    NUMERIC_COLUMNS,
+    CategoricalColumn,
+    FeatureEncoder,
+)
+from .model import ChurnPredictor
+from .schema import CustomerData
+
+try:
+    import mlflow
+except ImportError:
+    mlflow = None
+
+logger = logging.getLogger(__name__)
+
+# Candidate models, with the training notebook's hyperparameters
+CANDIDATES = {
+    "LogisticRegression": lambda: LogisticRegression(random_state=42, max_iter=1000),
+    "RandomForestClassifier": lambda: RandomForestClassifier(
+        n_estimators=100, random_state=42
+    ),
+    "GradientBoostingClassifier": lambda: GradientBoostingClassifier(
+        n_estimators=100, random_state=42
+    ),
+}
+
+TARGET_COLUMN = "Churn"
+TARGET_MAPPING = {"Yes": 1, "No": 0}
+
+# Bump when the encoding changes, so stale cached matrices are not reused
+CACHE_VERSION = 2
+
+
+class Dataset(NamedTuple):
+    """Encoded training data cached on disk"""
+
+    directory: Path
+    feature_names: List[str]
+    rows: int
+    sha256: str
+    # Reference feature distributions for the drift monitor
+    profile: Optional[Dict] = None
+
+
+class Split(NamedTuple):
+    """How rows are divided into test, training and cross-validation sets"""
+
+    test_size: float = 0.2
+    cv_folds: int = 5
+    random_state: int = 42
+
+
+class Selection(NamedTuple):
+    """How the deployed candidate is chosen from the cross-validated ones"""
+
+    # p99 milliseconds to score one row, and a batch of batch_size rows
+    latency_budget_ms: Optional[float] = None
+    batch_latency_budget_ms: Optional[float] = None
+    batch_size: int = 1000
+    # AUC the fastest eligible candidate may give up against the most accurate
+    max_auc_loss: float = 0.0
+
+
+def feature_names_for(categories: Mapping[str, Sequence[str]]) -> List[str]:
+    """Feature layout of the training notebook for the categories in the data"""
+    names = [col for col in CustomerData.model_fields if col not in categories]
+    for col in CATEGORICAL_COLUMNS:
+        names += [f"{col}_{category}" for category in sorted(categories[col])]
+    return names + ENGINEERED_FEATURES
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_training_frame(path: Path, extra_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """Load the customer fields and target, string columns as categoricals"""
+    columns = list(CustomerData.model_fields) + [TARGET_COLUMN]
+    strings = [col for col in columns if col not in NUMERIC_COLUMNS]
+    columns += list(extra_columns)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=columns)
+        df = df.astype({col: "category" for col in strings})
+    else:
+        try:
+            import pyarrow  # noqa: F401
+
+            engine = "pyarrow"
+        except ImportError:
+            engine = "c"
+        df = pd.read_csv(
+            path,
+            usecols=columns,
+            dtype={col: "category" for col in strings},
+            engine=engine,
+        )
+
+    # As in the notebook: blank TotalCharges become the median
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["TotalCharges"] = df["TotalCharges"].fillna(df["TotalCharges"].median())
+    return df
+
+
+def usable_rows(df: pd.DataFrame) -> np.ndarray:
+    """Rows with a known target, binary values and numeric fields"""
+    valid = df[TARGET_COLUMN].isin(list(TARGET_MAPPING)).to_numpy()
+    for col, mapping in BINARY_MAPPINGS.items():
+        valid &= df[col].isin(list(mapping)).to_numpy()
+    for col in NUMERIC_COLUMNS:
+        valid &= df[col].notna().to_numpy()
+    return valid
+
+
+def encode_frame(
+    df: pd.DataFrame, encoder: FeatureEncoder, out: np.ndarray, chunk_size: int
+):
+    """Encode a training frame into out, chunk by chunk"""
+    columns = {}
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            values = df[col].cat
+            columns[col] = CategoricalColumn(
+                values.codes.to_numpy(), list(values.categories)
+            )
+        else:
+            columns[col] = df[col].to_numpy(dtype=np.float64)
+
+    for start in range(0, len(df), chunk_size):
+        stop = min(start + chunk_size, len(df))
+        chunk = {
+            col: (
+                CategoricalColumn(values.codes[start:stop], values.categories)
+                if isinstance(values, CategoricalColumn)
+                else values[start:stop]
+            )
+            for col, values in columns.items()
+        }
+        out[start:stop] = encoder.encode_columns(chunk, stop - start)
+
+
+def prepare_dataset(
+    path: Path, cache_dir: Path, chunk_size: int = 500000
+) -> Tuple[Dataset, bool]:
+    """Encode a training file, or reuse its cached matrix
+
+    Returns the dataset and whether it came from the cache.
+    """
+    path = Path(path)
+    sha256 = file_sha256(path)
+    directory = Path(cache_dir) / f"{path.stem}-v{CACHE_VERSION}-{sha256[:16]}"
+    meta_file = directory / "meta.json"
+    if meta_file.exists():
+        meta = json.loads(meta_file.read_text())
+        return (
+            Dataset(
+                directory,
+                meta["feature_names"],
+                meta["rows"],
+                sha256,
+                meta["feature_profile"],
+            ),
+            True,
+        )
+
+    start_time = time.perf_counter()
+    df = read_training_frame(path)
+    valid = usable_rows(df)
+    if not valid.all():
+        logger.warning(
+            f"Dropping {int((~valid).sum())} rows with a missing or unknown "
+            "target, binary or numeric value"
+        )
+        df = df[valid].reset_index(drop=True)
+    if df.empty:
+        raise ValueError(f"No usable training rows in {path}")
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+
+    categories = {
+        col: [str(c) for c in df[col].cat.categories] for col in CATEGORICAL_COLUMNS
+    }
+    feature_names = feature_names_for(categories)
+    encoder = FeatureEncoder(feature_names)
+    profile = feature_profile(df)
+
+    # Built in a scratch directory and renamed, so a cache entry is always whole
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    scratch = Path(tempfile.mkdtemp(dir=cache_dir, suffix=".tmp"))
+    try:
+        X = np.lib.format.open_memmap(
+            scratch / "X.npy", mode="w+", shape=(len(df), len(feature_names))
+        )
+        encode_frame(df.drop(columns=TARGET_COLUMN), encoder, X, chunk_size)
+        X.flush()
+        del X
+        y = df[TARGET_COLUMN].map(TARGET_MAPPING).to_numpy(dtype=np.int8)
+        np.save(scratch / "y.npy", y)
+        (scratch / "meta.json").write_text(
+            json.dumps(
+                {
+                    "source": str(path),
+                    "sha256": sha256,
+                    "rows": len(df),
+                    "feature_names": feature_names,
+                    "feature_profile": profile,
+                }
+            )
+        )
+        os.rename(scratch, directory)
+    except OSError:
+        # Another run finished the same entry first
+        shutil.rmtree(scratch, ignore_errors=True)
+        if not meta_file.exists():
+            raise
+    except BaseException:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+
+    logger.info(
+        f"Encoded {len(df)} rows x {len(feature_names)} features from {path} "
+        f"in {time.perf_counter() - start_time:.1f}s"
+    )
+    return Dataset(directory, feature_names, len(df), sha256, profile), False
+
+
+def load_matrix(directory: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """Memory-map a cached feature matrix and load its target"""
+    directory = Path(directory)
+    return np.load(directory / "X.npy", mmap_mode="r"), np.load(directory / "y.npy")
+
+
+def split_rows(
+    y: np.ndarray, split: Split, fold: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Training and evaluation rows: the test split, or one CV fold of the rest
+
+    Deterministic, so every worker can work out its own rows from y.
+    """
+    rows = np.arange(len(y))
+    train, test = train_test_split(
+        rows, test_size=split.test_size, stratify=y, random_state=split.random_state
+    )
+    if fold is None:
+        return np.sort(train), np.sort(test)
+    folds = StratifiedKFold(
+        n_splits=split.cv_folds, shuffle=True, random_state=split.random_state
+    )
+    fit, validate = list(folds.split(train, y[train]))[fold]
+    return np.sort(train[fit]), np.sort(train[validate])
+
+
+def evaluate(y_true: np.ndarray, probabilities: np.ndarray) -> Dict[str, float]:
+    """The training notebook's metrics"""
+    y_pred = (probabilities >= 0.5).astype(int)
+    return {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred),
+        "f1_score": f1_score(y_true, y_pred),
+        "auc_roc": roc_auc_score(y_true, probabilities),
+    }
+
+
+def drift_profile(dataset: Dataset, model, scaler, split: Split) -> Dict:
+    """The dataset's feature profile plus the model's test-split probabilities"""
+    X, y = load_matrix(dataset.directory)
+    _, test = split_rows(y, split)
+    X_test = scaler.transform(np.asarray(X[test], dtype=np.float64), copy=False)
+    return {
+        **dataset.profile,
+        "probability": probability_profile(model.predict_proba(X_test)[:, 1]),
+    }
+
+
+def fit_candidate(
+    directory: Path,
+    name: str,
+    split: Split,
+    fold: Optional[int] = None,
+    params: Optional[Dict] = None,
+    max_rows: Optional[int] = None,
+) -> Dict:
+    """Fit one candidate on one fold (or the full training split) and score it
+
+    Runs in a pool worker. ``params`` override the candidate's default
+    hyperparameters, and ``max_rows`` fits on a random subset of the rows;
+    smaller subsets are prefixes of larger ones. The fitted model and scaler
+    are only returned for the full training split.
+    """
+    X, y = load_matrix(directory)
+    train, test = split_rows(y, split, fold)
+    if max_rows is not None and max_rows < len(train):
+        rng = np.random.default_rng(split.random_state)
+        train = np.sort(rng.permutation(train)[:max_rows])
+
+    start_time = time.perf_counter()
+    X_train = np.asarray(X[train], dtype=np.float64)
+    scaler = StandardScaler().fit(X_train)
+    model = CANDIDATES[name]().set_params(**(params or {}))
+    model.fit(scaler.transform(X_train, copy=False), y[train])
+    del X_train
+    fit_seconds = time.perf_counter() - start_time
+
+    X_test = scaler.transform(np.asarray(X[test], dtype=np.float64), copy=False)
+    result = {
+        "name": name,
+        "fold": fold,
+        "rows": len(train),
+        "fit_seconds": fit_seconds,
+        "metrics": evaluate(y[test], model.predict_proba(X_test)[:, 1]),
+    }
+    if fold is None:
+        result["model"] = model
+        result["scaler"] = scaler
+    return result
+
+
+def run_tasks(tasks: List[Tuple], n_jobs: int) -> List[Dict]:
+    """Run fit_candidate for every task, across n_jobs processes"""
+    if n_jobs <= 1:
+        return [fit_candidate(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+        futures = [pool.submit(fit_candidate, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def time_calls(fn, min_calls: int, min_time: float) -> np.ndarray:
+    """Call fn() until both min_calls and min_time are reached; seconds per call"""
+    fn()  # warm-up, not timed
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_calls or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def measure_inference(
+    model,
+    scaler,
+    feature_names: List[str],
+    X: np.ndarray,
+    batch_size: int = 1000,
+    min_calls: int = 50,
+    min_time: float = 0.25,
+) -> Dict[str, float]:
+    """Time a model as the API would serve it, and measure its bundle size
+
+    The model is written as a bundle and loaded by a ChurnPredictor, so the
+    serving settings apply. Each call scores a fresh copy of encoded rows
+    from X, as a request would.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        bundle_file = Path(directory) / BUNDLE_FILENAME
+        save_bundle(bundle_file, model, scaler, feature_names)
+        size_bytes = bundle_file.stat().st_size
+        predictor = ChurnPredictor()
+        predictor.model_path = Path(directory)
+        if not predictor.load_model():
+            raise RuntimeError(f"Cannot load a {type(model).__name__} bundle")
+
+        # The bundle may be memory-mapped, so time it before it is deleted
+        one = np.array(X[:1], dtype=np.float64)
+        batch = np.array(X[:batch_size], dtype=np.float64)
+        single = time_calls(lambda: predictor.score(one.copy()), min_calls, min_time)
+        batched = time_calls(
+            lambda: predictor.score(batch.copy()), max(1, min_calls // 5), min_time
+        )
+    return {
+        "single_row_p50_ms": float(np.percentile(single, 50)) * 1000,
+        "single_row_p99_ms": float(np.percentile(single, 99)) * 1000,
+        "batch_rows": len(batch),
+        "batch_p50_ms": float(np.percentile(batched, 50)) * 1000,
+        "batch_p99_ms": float(np.percentile(batched, 99)) * 1000,
+        "batch_rows_per_sec": len(batch) / float(np.percentile(batched, 50)),
+        "size_bytes": size_bytes,
+    }
+
+
+def pareto_front(points: Mapping[str, Tuple[float, float]]) -> List[str]:
+    """Names whose (auc, latency) no other point beats on both counts"""
+    return [
+        name
+        for name, (auc, latency) in points.items()
+        if not any(
+            other_auc >= auc
+            and other_latency <= latency
+            and (other_auc, other_latency) != (auc, latency)
+            for other_auc, other_latency in points.values()
+        )
+    ]
+
+
+def selection_auc(candidate: Dict) -> float:
+    """The AUC candidates are compared on"""
+    if candidate["cv_auc_mean"] is not None:
+        return candidate["cv_auc_mean"]
+    # Without CV folds the test split decides, as in the notebook
+    return candidate["test_metrics"]["auc_roc"]
+
+
+def over_budget(latency: Mapping[str, float], selection: Selection) -> List[str]:
+    """The measured latencies that break the selection's budgets, if any"""
+    return [
+        f"{key} {latency[key]:.3f}ms > {budget}ms"
+        for key, budget in (
+            ("single_row_p99_ms", selection.latency_budget_ms),
+            ("batch_p99_ms", selection.batch_latency_budget_ms),
+        )
+        if budget is not None and latency[key] > budget
+    ]
+
+
+def choose_model(summary: Dict[str, Dict], selection: Selection) -> str:
+    """Apply the latency budgets and accuracy-latency rule to the candidates"""
+    eligible = []
+    for name, candidate in summary.items():
+        over = over_budget(candidate["latency"], selection)
+        if over:
+            logger.info(f"{name} is over the latency budget: {', '.join(over)}")
+        else:
+            eligible.append(name)
+    if not eligible:
+        raise ValueError("No candidate model meets the latency budget")
+
+    best_auc = max(selection_auc(summary[name]) for name in eligible)
+    close = [
+        name
+        for name in eligible
+        if selection_auc(summary[name]) >= best_auc - selection.max_auc_loss
+    ]
+    return min(close, key=lambda name: summary[name]["latency"]["single_row_p50_ms"])
+
+
+def select_model(
+    dataset: Dataset,
+    candidates: Sequence[str] = tuple(CANDIDATES),
+    split: Split = Split(),
+    n_jobs: int = 1,
+    selection: Selection = Selection(),
+) -> Dict:
+    """Cross-validate every candidate and return the best, refitted
+
+    Every fold and final fit is a separate task, so they all run at once
+    given enough workers. The final fits use the whole training split and
+    are scored on the held-out test split. Latency is measured afterwards
+    in this process, one candidate at a time, so the fits cannot skew it.
+    """
+    folds = list(range(split.cv_folds)) if split.cv_folds > 1 else []
+    tasks = [
+        (dataset.directory, name, split, fold)
+        for name in candidates
+        for fold in folds + [None]
+    ]
+    logger.info(f"Running {len(tasks)} fits across {n_jobs} worker(s)")
+    results = run_tasks(tasks, n_jobs)
+
+    summary = {}
+    for name in candidates:
+        final = next(r for r in results if r["name"] == name and r["fold"] is None)
+        aucs = [
+            r["metrics"]["auc_roc"]
+            for r in results
+            if r["name"] == name and r["fold"] is not None
+        ]
+        summary[name] = {
+            # Without CV folds the test split decides, as in the notebook
+            "cv_auc_mean": float(np.mean(aucs)) if aucs else None,
+            "cv_auc_std": float(np.std(aucs)) if aucs else None,
+            "test_metrics": final["metrics"],
+            "fit_seconds": final["fit_seconds"],
+            "model": final["model"],
+            "scaler": final["scaler"],
+            "params": final["model"].get_params(),
+        }
+
+    X, y = load_matrix(dataset.directory)
+    _, test = split_rows(y, split)
+    X_test = X[test[: selection.batch_size]]
+    for name, candidate in summary.items():
+        latency = measure_inference(
+            candidate["model"],
+            candidate["scaler"],
+            dataset.feature_names,
+            X_test,
+            selection.batch_size,
+        )
+        candidate["size_bytes"] = latency.pop("size_bytes")
+        candidate["latency"] = latency
+
+    front = pareto_front(
+        {
+            name: (
+                selection_auc(candidate),
+                candidate["latency"]["single_row_p50_ms"],
+            )
+            for name, candidate in summary.items()
+        }
+    )
+    for name, candidate in summary.items():
+        candidate["pareto"] = name in front
+    return {"best": choose_model(summary, selection), "candidates": summary}
+
+
+def log_to_mlflow(selection: Dict, dataset: Dataset, experiment: str):
+    """Record one MLflow run per candidate, as the training notebook does"""
+    mlflow.set_experiment(experiment)
+    for name, candidate in selection["candidates"].items():
+        with mlflow.start_run(run_name=name):
+            mlflow.log_params(candidate["params"])
+            mlflow.log_metrics(candidate["test_metrics"])
+            mlflow.log_metrics(candidate["latency"])
+            mlflow.log_metric("size_bytes", candidate["size_bytes"])
+            if candidate["cv_auc_mean"] is not None:
+                mlflow.log_metric("cv_auc_mean", candidate["cv_auc_mean"])
+                mlflow.log_metric("cv_auc_std", candidate["cv_auc_std"])
+            mlflow.set_tags(
+                {
+                    "data_sha256": dataset.sha256,
+                    "selected": str(name == selection["best"]).lower(),
+                    "pareto": str(candidate["pareto"]).lower(),
+                }
+            )
+
+
+def train(
+    data: Path,
+    output: Path,
+    cache_dir: Optional[Path] = None,
+    candidates: Sequence[str] = tuple(CANDIDATES),
+    split: Split = Split(),
+    n_jobs: int = 1,
+    experiment: Optional[str] = None,
+    selection: Selection = Selection(),
+) -> Dict:
+    """Train every candidate on data and write the best as a model bundle
+
+    Without a cache_dir the encoded matrix is kept in a temporary directory
+    for this run only. Raises ValueError, writing nothing, if no candidate
+    meets the latency budget.
+    """
+    if experiment and mlflow is None:
+        raise RuntimeError("MLflow logging needs mlflow: pip install mlflow")
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    start_time = time.time()
+    with tempfile.TemporaryDirectory() as scratch:
+        dataset, cached = prepare_dataset(data, cache_dir or scratch)
+        if cached:
+            logger.info(f"Using cached features from {dataset.directory}")
+        chosen = select_model(dataset, candidates, split, n_jobs, selection)
+        best = chosen["candidates"][chosen["best"]]
+        profile = drift_profile(dataset, best["model"], best["scaler"], split)
+
+    checksum = save_bundle(
+        output,
+        best["model"],
+        best["scaler"],
+        dataset.feature_names,
+        metadata={
+            "source": "app.train",
+            "training_data": str(data),
+            "training_data_sha256": dataset.sha256,
+            "training_rows": dataset.rows,
+            "cv_auc_mean": best["cv_auc_mean"],
+            "test_metrics": best["test_metrics"],
+            "latency": best["latency"],
+            "selection": selection._asdict(),
+            "drift_profile": profile,
+        },
+    )
+    if experiment:
+        log_to_mlflow(chosen, dataset, experiment)
+
+    return {
+        "best": chosen["best"],
+        "rows": dataset.rows,
+        "cached": cached,
+        "seconds": time.time() - start_time,
+        "bundle": str(output),
+        "checksum": checksum,
+        "candidates": {
+            name: {
+                key: value
+                for key, value in candidate.items()
+                if key not in ("model", "scaler", "params")
+            }
+            for name, candidate in chosen["candidates"].items()
+        },
+    }
+
+
+def add_budget_arguments(parser: argparse.ArgumentParser):
+    """The latency budget options of a command line that writes a bundle"""
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        help="Largest p99 single-row latency allowed",
+    )
+    parser.add_argument(
+        "--batch-latency-budget-ms",
+        type=float,
+        help="Largest p99 batch latency allowed",
+    )
+    parser.add_argument(
+        "--latency-batch-size",
+        type=int,
+        default=1000,
+        help="Rows per batch when timing batch latency",
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and select a churn model")
+    parser.add_argument("data", type=Path, help="Training .csv or .parquet file")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(__file__).parent / BUNDLE_FILENAME,
+        help="Model bundle to write",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(".train_cache"),
+        help="Where encoded training matrices are cached",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Encode the data for this run only"
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=list(CANDIDATES),
+        choices=list(CANDIDATES),
+        help="Candidate models",
+    )
+    parser.add_argument("--cv-folds", type=int, default=5, help="0 to skip CV")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes fitting candidates and folds",
+    )
+    parser.add_argument(
+        "--experiment", help="Log the candidates to this MLflow experiment"
+    )
+    add_budget_arguments(parser)
+    parser.add_argument(
+        "--max-auc-loss",
+        type=float,
+        default=0.0,
+        help="Pick the fastest candidate within this much AUC of the best",
+    )
+    parser.add_argument("--report", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        results = train(
+            args.data,
+            args.output,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            candidates=args.models,
+            split=Split(test_size=args.test_size, cv_folds=args.cv_folds),
+            n_jobs=args.n_jobs,
+            experiment=args.experiment,
+            selection=Selection(
+                latency_budget_ms=args.latency_budget_ms,
+                batch_latency_budget_ms=args.batch_latency_budget_ms,
+                batch_size=args.latency_batch_size,
+                max_auc_loss=args.max_auc_loss,
+            ),
+        )
+    except ValueError as e:
+        sys.exit(f"Nothing written: {e}")
+
+    print(
+        f"{'model':<28}{'cv auc':>10}{'test auc':>10}{'fit s':>9}"
+        f"{'p99 ms':>9}{'batch ms':>10}{'size KB':>9}"
+    )
+    for name, candidate in results["candidates"].items():
+        cv_auc = candidate["cv_auc_mean"]
+        latency = candidate["latency"]
+        print(
+            f"{name:<28}{'-' if cv_auc is None else f'{cv_auc:.4f}':>10}"
+            f"{candidate['test_metrics']['auc_roc']:>10.4f}"
+            f"{candidate['fit_seconds']:>9.1f}"
+            f"{latency['single_row_p99_ms']:>9.2f}"
+            f"{latency['batch_p99_ms']:>10.1f}"
+            f"{candidate['size_bytes'] / 1024:>9.0f}"
+            f"{'  pareto' if candidate['pareto'] else ''}"
+        )
+    print(
+        f"\nBest model: {results['best']}, trained on {results['rows']} rows "
+        f"in {results['seconds']:.1f}s"
+    )
+    print(f"Wrote {results['bundle']} (sha256 {results['checksum']})")
+    if args.report:
+        args.report.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
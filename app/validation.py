@@ -0,0 +1,287 @@
+# app/validation.py
+"""
+Compiled validation of customer records
+
+The rules are compiled once per model: every categorical field is checked
+against the categories the model was trained on (binary mappings and
+one-hot columns), and numeric fields against the bounds declared on
+``CustomerData``. A batch is validated column by column, so a clean column
+costs a single set or NumPy operation instead of a Pydantic model per row.
+Errors use Pydantic's ``{"type", "loc", "msg", "input"}`` format.
+
+Numeric strings are accepted where Pydantic's lax mode accepts them on
+``/predict`` ("12", "12.0" for integers, "70.5", "1e2" for numbers), and are
+converted to numbers in the customer records so they can be encoded.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import BINARY_MAPPINGS, CategoricalColumn, FeatureEncoder
+from .schema import CustomerData
+
+_MISSING = object()
+
+# Pydantic error type and message for each numeric bound
+_BOUNDS = {
+    "gt": ("greater_than", "greater than", np.greater),
+    "ge": ("greater_than_equal", "greater than or equal to", np.greater_equal),
+    "lt": ("less_than", "less than", np.less),
+    "le": ("less_than_equal", "less than or equal to", np.less_equal),
+}
+
+
+# Integer strings Pydantic accepts: digits, optionally with a zero fraction
+_INT_STRING = re.compile(r"[+-]?\d+(\.0*)?")
+
+
+def _parse_number(value: str, annotation):
+    """The number Pydantic would parse from a string, or None"""
+    if "_" in value or value != value.strip():
+        return None
+    if annotation is int:
+        return int(float(value)) if _INT_STRING.fullmatch(value) else None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _expected(categories: Sequence[str]) -> str:
+    quoted = [f"'{c}'" for c in categories]
+    if len(quoted) == 1:
+        return quoted[0]
+    return f"{', '.join(quoted[:-1])} or {quoted[-1]}"
+
+
+class CustomerValidator:
+    """Validate customer records against a model's category vocabulary"""
+
+    def __init__(self, encoder: FeatureEncoder):
+        self.fields = list(CustomerData.model_fields)
+        # field -> categories accepted by the model (None: any string)
+        self.categorical = {}
+        # field -> (annotation, [(bound, limit)])
+        self.numeric = {}
+
+        categories = encoder.categories
+        for name, field in CustomerData.model_fields.items():
+            if field.annotation is str:
+                if name in BINARY_MAPPINGS:
+                    vocabulary = list(BINARY_MAPPINGS[name])
+                else:
+                    # A column the model has no dummies for accepts any value
+                    vocabulary = categories.get(name) or None
+                self.categorical[name] = vocabulary
+            else:
+                bounds = []
+                for constraint in field.metadata:
+                    for bound in _BOUNDS:
+                        limit = getattr(constraint, bound, None)
+                        if limit is not None:
+                            bounds.append((bound, limit))
+                self.numeric[name] = (field.annotation, bounds)
+
+        self._vocabulary_sets = {
+            name: frozenset(vocabulary) if vocabulary is not None else None
+            for name, vocabulary in self.categorical.items()
+        }
+        self._messages = {
+            name: f"Input should be {_expected(vocabulary)}"
+            for name, vocabulary in self.categorical.items()
+            if vocabulary is not None
+        }
+
+    def _categorical_errors(self, name: str, column: List[Any]):
+        vocabulary = self._vocabulary_sets[name]
+        if vocabulary is not None:
+            try:
+                # One pass in C for the common all-valid column
+                if vocabulary.issuperset(column):
+                    return
+            except TypeError:
+                pass  # unhashable values, report them below
+
+        for i, value in enumerate(column):
+            if value is _MISSING:
+                yield i, "missing", "Field required", None
+            elif not isinstance(value, str):
+                yield i, "string_type", "Input should be a valid string", value
+            elif vocabulary is not None and value not in vocabulary:
+                yield i, "literal_error", self._messages[name], value
+
+    def _numeric_errors(
+        self, name: str, column: List[Any], rows: Optional[List[Dict]] = None
+    ):
+        annotation, bounds = self.numeric[name]
+        try:
+            values = np.asarray(column) if len(column) else np.zeros(0)
+        except ValueError:
+            values = np.asarray(column, dtype=object)  # ragged nested lists
+        valid = np.ones(len(column), dtype=bool)
+
+        if values.dtype.kind not in "biuf" or values.ndim != 1:
+            # Mixed column: find the entries that are not numbers
+            values = np.zeros(len(column), dtype=np.float64)
+            for i, value in enumerate(column):
+                if value is _MISSING:
+                    valid[i] = False
+                    yield i, "missing", "Field required", None
+                elif isinstance(value, (bool, int, float)):
+                    values[i] = value
+                elif isinstance(value, str):
+                    number = _parse_number(value, annotation)
+                    if number is not None:
+                        values[i] = number
+                        if rows is not None:
+                            rows[i][name] = number
+                    elif annotation is int:
+                        valid[i] = False
+                        yield (
+                            i,
+                            "int_parsing",
+                            "Input should be a valid integer, unable to parse "
+                            "string as an integer",
+                            value,
+                        )
+                    else:
+                        valid[i] = False
+                        yield (
+                            i,
+                            "float_parsing",
+                            "Input should be a valid number, unable to parse "
+                            "string as a number",
+                            value,
+                        )
+                elif annotation is int:
+                    valid[i] = False
+                    yield i, "int_type", "Input should be a valid integer", value
+                else:
+                    valid[i] = False
+                    yield i, "float_type", "Input should be a valid number", value
+
+        values = values.astype(np.float64, copy=False)
+        if annotation is int:
+            fractional = valid & (values != np.trunc(values))
+            for i in np.flatnonzero(fractional).tolist():
+                valid[i] = False
+                yield (
+                    i,
+                    "int_from_float",
+                    "Input should be a valid integer, got a number with a "
+                    "fractional part",
+                    column[i],
+                )
+
+        for bound, limit in bounds:
+            error_type, text, compare = _BOUNDS[bound]
+            with np.errstate(invalid="ignore"):
+                failed = valid & ~compare(values, limit)
+            for i in np.flatnonzero(failed).tolist():
+                valid[i] = False
+                yield i, error_type, f"Input should be {text} {limit}", column[i]
+
+    def errors(self, customers: Sequence[Any]) -> List[Tuple[int, str, str, str, Any]]:
+        """Return (row, field, type, message, input) for every invalid value
+
+        Valid numeric strings are replaced by their numbers in the customers.
+        """
+        found = []
+        rows = []
+        for i, customer in enumerate(customers):
+            if isinstance(customer, dict):
+                rows.append(customer)
+            else:
+                found.append(
+                    (
+                        i,
+                        None,
+                        "model_type",
+                        "Input should be a valid dictionary or object to "
+                        "extract fields from",
+                        customer,
+                    )
+                )
+                rows.append({})
+
+        for name in self.fields:
+            column = [row.get(name, _MISSING) for row in rows]
+            if name in self.categorical:
+                field_errors = self._categorical_errors(name, column)
+            else:
+                field_errors = self._numeric_errors(name, column, rows)
+            for i, error_type, message, value in field_errors:
+                if isinstance(customers[i], dict):
+                    found.append((i, name, error_type, message, value))
+
+        order = {name: position for position, name in enumerate(self.fields)}
+        found.sort(key=lambda e: (e[0], -1 if e[1] is None else order[e[1]]))
+        return found
+
+    def column_errors(self, columns: Mapping[str, Any], n_rows: int) -> Dict[int, str]:
+        """Per-row error messages for column arrays, e.g. from an Arrow table
+
+        String columns may be ``CategoricalColumn``s, checked once per
+        category. Numeric columns are float arrays with NaN for missing values.
+        """
+        messages = {}
+
+        def report(rows, message):
+            for i in rows.tolist():
+                messages.setdefault(i, []).append(message)
+
+        for name in self.fields:
+            values = columns[name]
+            if name in self.categorical:
+                vocabulary = self._vocabulary_sets[name]
+                if not isinstance(values, CategoricalColumn):
+                    for i, _, msg, _ in self._categorical_errors(name, list(values)):
+                        messages.setdefault(i, []).append(f"{name}: {msg}")
+                    continue
+                report(np.flatnonzero(values.codes < 0), f"{name}: Field required")
+                if vocabulary is not None:
+                    unknown = [
+                        code
+                        for code, category in enumerate(values.categories)
+                        if category not in vocabulary
+                    ]
+                    if unknown:
+                        rows = np.flatnonzero(np.isin(values.codes, unknown))
+                        report(rows, f"{name}: {self._messages[name]}")
+            else:
+                values = np.asarray(values, dtype=np.float64)
+                missing = np.isnan(values)
+                report(np.flatnonzero(missing), f"{name}: Field required")
+                for i, _, msg, _ in self._numeric_errors(name, values):
+                    if not missing[i]:
+                        messages.setdefault(i, []).append(f"{name}: {msg}")
+
+        return {i: "; ".join(parts) for i, parts in sorted(messages.items())}
+
+    def validate(
+        self, customers: Sequence[Any], loc: Tuple = ("body", "customers")
+    ) -> List[Dict]:
+        """Pydantic-style error dicts for a batch, located under loc"""
+        return [
+            _error_dict(loc + (i,) + ((field,) if field else ()), t, msg, value)
+            for i, field, t, msg, value in self.errors(customers)
+        ]
+
+    def validate_one(self, customer: Dict, loc: Tuple = ("body",)) -> List[Dict]:
+        """Pydantic-style error dicts for a single customer"""
+        return [
+            _error_dict(loc + ((field,) if field else ()), t, msg, value)
+            for _, field, t, msg, value in self.errors([customer])
+        ]
+
+
+def _error_dict(loc: Tuple, error_type: str, message: str, value: Any) -> Dict:
+    if isinstance(value, float) and not math.isfinite(value):
+        value = str(value)
+    error = {"type": error_type, "loc": list(loc), "msg": message}
+    if error_type != "missing":
+        error["input"] = value
+    return error
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark suite for the inference hot path
+
+Times ChurnPredictor.preprocess_input, predict and predict_batch, and the
+/predict and /batch_predict endpoints through an in-process ASGI client,
+for every model type and batch size. Each case reports rows/sec, p50/p99
+call latency and the peak memory one call allocates, and the whole run can
+be written as JSON. Given a baseline, any case whose p50, p99 or peak
+allocation grew beyond its tolerance is reported and the exit status is 1.
+
+Usage:
+    python scripts/benchmark.py --output results.json
+    python scripts/benchmark.py --baseline scripts/benchmark_baseline.json
+    python scripts/benchmark.py --save-baseline scripts/benchmark_baseline.json
+    python scripts/benchmark.py --model-dir app --sizes 1 1000
+
+Without --model-dir, a model of every type in the training notebook is
+trained on synthetic customers. Serving settings such as FUSED_SCALER,
+TREE_ENGINE and INFERENCE_PRECISION are read from the environment as usual.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import joblib
+import numpy as np
+import sklearn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import model as model_module  # noqa: E402
+from app.model import ChurnPredictor  # noqa: E402
+from scripts.synthetic_data import (  # noqa: E402
+    MODEL_TYPES,
+    synthetic_customers,
+    synthetic_models,
+)
+
+CASES = ("preprocess_input", "predict", "predict_batch", "api_predict", "api_batch")
+
+# Allocation growth below this is noise (allocator and interpreter caches)
+MEMORY_SLACK_MB = 1.0
+
+
+def peak_alloc_mb(fn) -> float:
+    """Peak memory allocated by one call of fn, excluding what existed before
+
+    Traced in a separate untimed call, so the tracing overhead does not
+    reach the timings and earlier cases do not affect the result.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, rows, min_calls, min_time):
+    """Call fn() until both min_calls and min_time are reached
+
+    Returns the rows/sec and latency percentiles of the timed calls, and
+    the peak allocation of one more call.
+    """
+    fn()  # warm-up, not timed
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_calls or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings)
+    p50 = float(np.percentile(timings, 50))
+    return {
+        "rows": rows,
+        "calls": len(timings),
+        "p50_ms": p50 * 1000,
+        "p99_ms": float(np.percentile(timings, 99)) * 1000,
+        "mean_ms": float(timings.mean()) * 1000,
+        "rows_per_sec": rows / p50,
+        "peak_alloc_mb": peak_alloc_mb(fn),
+    }
+
+
+def load_predictor(model, scaler, feature_names, directory: Path) -> ChurnPredictor:
+    """Load model files the way the API does, applying the serving settings"""
+    joblib.dump(model, directory / "churn_model.pkl")
+    joblib.dump(scaler, directory / "scaler.pkl")
+    joblib.dump(feature_names, directory / "feature_names.pkl")
+    predictor = ChurnPredictor()
+    predictor.model_path = directory
+    if not predictor.load_model():
+        raise SystemExit(f"Failed to load model from {directory}")
+    return predictor
+
+
+def benchmark_predictor(predictor, cases, sizes, customers, args):
+    """Yield results of the cases that call the predictor directly"""
+    one = customers[0]
+    if "preprocess_input" in cases:
+        yield "preprocess_input", measure(
+            lambda: predictor.preprocess_input(one), 1, args.min_calls, args.min_time
+        )
+    if "predict" in cases:
+        yield "predict", measure(
+            lambda: predictor.predict(one), 1, args.min_calls, args.min_time
+        )
+    if "predict_batch" in cases:
+        for n in sizes:
+            batch = customers[:n]
+            yield "predict_batch", measure(
+                lambda: predictor.predict_batch(batch), n, args.min_calls, args.min_time
+            )
+
+
+def benchmark_api(predictor, cases, sizes, customers, args):
+    """Yield results of the cases that go through the FastAPI app"""
+    import httpx
+
+    from app.main import app
+
+    model_module.swap_predictor(predictor)
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(app=app, base_url="http://benchmark")
+    headers = {"Content-Type": "application/json"}
+
+    def post(path, body):
+        # Bodies are encoded up front so only the server side is timed
+        def call():
+            response = loop.run_until_complete(
+                client.post(path, content=body, headers=headers)
+            )
+            if response.status_code != 200:
+                raise SystemExit(f"{path} returned {response.status_code}")
+
+        return call
+
+    try:
+        if "api_predict" in cases:
+            body = json.dumps(customers[0]).encode()
+            yield "api_predict", measure(
+                post("/predict", body), 1, args.min_calls, args.min_time
+            )
+        if "api_batch" in cases:
+            for n in sizes:
+                body = json.dumps({"customers": customers[:n]}).encode()
+                yield "api_batch", measure(
+                    post("/batch_predict", body), n, args.min_calls, args.min_time
+                )
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+
+
+def run(args):
+    """Run every case for every model and return the result rows"""
+    customers = synthetic_customers(max(args.sizes), seed=7)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.model_dir:
+            predictor = ChurnPredictor()
+            predictor.model_path = args.model_dir
+            if not predictor.load_model():
+                raise SystemExit(f"Failed to load model from {args.model_dir}")
+            predictors = [(type(predictor.model).__name__, predictor)]
+        else:
+            predictors = []
+            for name, model, scaler, names in synthetic_models(args.models):
+                directory = Path(tmp) / name
+                directory.mkdir()
+                predictors.append(
+                    (name, load_predictor(model, scaler, names, directory))
+                )
+
+        for name, predictor in predictors:
+            for runner in (benchmark_predictor, benchmark_api):
+                for case, result in runner(
+                    predictor, args.cases, args.sizes, customers, args
+                ):
+                    result = {"case": case, "model": name, **result}
+                    print_row(result)
+                    results.append(result)
+    return results
+
+
+def environment():
+    """Versions and serving settings the results depend on"""
+    from app import config
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "fused_scaler": config.FUSED_SCALER,
+        "tree_engine": config.TREE_ENGINE,
+        "inference_precision": config.INFERENCE_PRECISION,
+    }
+
+
+def compare(results, baseline, args):
+    """Return a message for every case that regressed against the baseline"""
+    expected = {(r["case"], r["model"], r["rows"]): r for r in baseline["results"]}
+    checks = (
+        ("p50_ms", args.tolerance, 0.0),
+        ("p99_ms", args.p99_tolerance, 0.0),
+        ("peak_alloc_mb", args.memory_tolerance, MEMORY_SLACK_MB),
+    )
+    regressions = []
+    for result in results:
+        base = expected.get((result["case"], result["model"], result["rows"]))
+        if base is None:
+            continue
+        for metric, tolerance, slack in checks:
+            if metric not in base:
+                continue  # baseline recorded before the metric existed
+            limit = base[metric] * (1 + tolerance) + slack
+            if result[metric] > limit:
+                regressions.append(
+                    f"{result['case']} {result['model']} rows={result['rows']}: "
+                    f"{metric} {result[metric]:.3f} > {limit:.3f} "
+                    f"(baseline {base[metric]:.3f} + {tolerance:.0%})"
+                )
+    return regressions
+
+
+def print_row(result):
+    print(
+        f"{result['case']:<18}{result['model']:<28}{result['rows']:>8}"
+        f"{result['rows_per_sec']:>14,.0f}{result['p50_ms']:>11.3f}"
+        f"{result['p99_ms']:>11.3f}{result['peak_alloc_mb']:>11.2f}",
+        flush=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the inference hot path")
+    parser.add_argument("--model-dir", type=Path, help="Benchmark a trained model")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=list(MODEL_TYPES),
+        choices=list(MODEL_TYPES),
+        help="Synthetic model types to benchmark",
+    )
+    parser.add_argument(
+        "--cases", nargs="+", default=list(CASES), choices=CASES, help="Cases to run"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1, 10, 100, 1000, 10000, 100000],
+        help="Batch sizes for predict_batch and api_batch",
+    )
+    parser.add_argument(
+        "--min-calls", type=int, default=3, help="Minimum timed calls per case"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="Minimum seconds timed per case"
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Fail on regressions vs this")
+    parser.add_argument(
+        "--save-baseline", type=Path, help="Write the results as the new baseline"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed p50 slowdown"
+    )
+    parser.add_argument(
+        "--p99-tolerance", type=float, default=1.0, help="Allowed p99 slowdown"
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed growth of the peak allocation per call",
+    )
+    args = parser.parse_args(argv)
+
+    # Keep per-request log lines out of the timings
+    logging.disable(logging.INFO)
+
+    print(
+        f"{'case':<18}{'model':<28}{'rows':>8}{'rows/sec':>14}"
+        f"{'p50 ms':>11}{'p99 ms':>11}{'alloc MB':>11}"
+    )
+    report = {"environment": environment(), "results": run(args)}
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("environment") != report["environment"]:
+            print(
+                "warning: baseline was recorded in a different environment: "
+                f"{baseline.get('environment')}",
+                file=sys.stderr,
+            )
+        regressions = compare(report["results"], baseline, args)
+        if regressions:
+            print(
+                f"\nPERFORMANCE REGRESSION: {len(regressions)} case(s) slower "
+                f"than {args.baseline}",
+                file=sys.stderr,
+            )
+            for message in regressions:
+                print(f"  {message}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Latency of the NumPy tree engine against sklearn's predict_proba
+
+Usage:
+    python scripts/benchmark_tree_engine.py
+    python scripts/benchmark_tree_engine.py --model-dir app --rows 1 64 10000
+
+Without --model-dir, RandomForest and GradientBoosting models are trained on
+synthetic customers with the notebook's hyperparameters.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.model import ChurnPredictor  # noqa: E402
+from app.tree_engine import TreeEnsembleEngine  # noqa: E402
+from scripts.synthetic_data import synthetic_frame, synthetic_models  # noqa: E402
+
+
+def time_call(fn, repeat):
+    """Median wall time of fn() in milliseconds"""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy tree engine")
+    parser.add_argument("--model-dir", type=Path, help="Benchmark a trained model")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1, 64, 10000],
+        help="Batch sizes to time",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per size")
+    args = parser.parse_args(argv)
+
+    if args.model_dir:
+        predictor = ChurnPredictor()
+        predictor.model_path = args.model_dir
+        if not predictor.load_model():
+            raise SystemExit(f"Failed to load model from {args.model_dir}")
+        models = [
+            (
+                type(predictor.model).__name__,
+                predictor.model,
+                predictor.scaler,
+                predictor.feature_names,
+            )
+        ]
+    else:
+        models = synthetic_models(
+            ["RandomForestClassifier", "GradientBoostingClassifier"]
+        )
+
+    X_raw, _ = synthetic_frame(max(args.rows), seed=7)
+    print(f"{'model':<28}{'rows':>8}{'sklearn ms':>14}{'engine ms':>14}{'speedup':>10}")
+    for name, model, scaler, feature_names in models:
+        engine = TreeEnsembleEngine.from_estimator(model)
+        if engine is None:
+            print(f"{name}: not supported by the tree engine")
+            continue
+        X = scaler.transform(X_raw.reindex(columns=feature_names, fill_value=0).values)
+
+        delta = np.abs(engine.predict_proba(X) - model.predict_proba(X)).max()
+        for n in args.rows:
+            batch = X[:n]
+            sklearn_ms = time_call(lambda: model.predict_proba(batch), args.repeat)
+            engine_ms = time_call(lambda: engine.predict_proba(batch), args.repeat)
+            print(
+                f"{name:<28}{n:>8}{sklearn_ms:>14.3f}{engine_ms:>14.3f}"
+                f"{sklearn_ms / engine_ms:>9.1f}x"
+            )
+        print(f"{name:<28}max |delta p| = {delta:.2e}")
+
+
+if __name__ == "__main__":
+    main()
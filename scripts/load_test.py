@@ -1,17 +1,45 @@
 #!/usr/bin/env python3
 """
-Load testing script for the churn prediction API
+Load generator for the churn prediction API
+
+By default traffic is open-loop: requests are sent at a constant arrival
+rate (or along a ramp schedule), whether or not earlier responses have
+come back. Latency is measured from the time each request was due, so
+time spent queued behind a slow server is counted (no coordinated
+omission). Connections are pooled and reused.
+
+Usage:
+    python scripts/load_test.py --rate 200 --duration 60
+    python scripts/load_test.py --stages 30:50 30:100 30:200 30:400 \\
+        --mix predict=9 batch_predict=1 --batch-size 100
+    python scripts/load_test.py --mode closed --concurrency 20 --requests 1000
+
+A stage "30:200" ramps linearly to 200 requests/sec over 30 seconds,
+starting from the previous stage's rate (or --start-rate). The per-stage
+table shows where the achieved rate stops following the target rate and
+tail latency takes off: the service's saturation point.
 """
 
-import requests
+import argparse
+import asyncio
 import json
-import time
+import math
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import statistics
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
 
 API_URL = "http://localhost:8000"
 
+ENDPOINTS = {"predict": "/predict", "batch_predict": "/batch_predict"}
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Percentiles shown in the summary tables
+SUMMARY_PERCENTILES = (50, 75, 90, 99, 99.9, 99.99)
+
 
 def generate_random_customer():
     """Generate random customer data for testing"""
@@ -40,66 +68,427 @@ def generate_random_customer():
     }
 
 
-def make_prediction():
-    """Make a single prediction request"""
-    start_time = time.time()
+class LatencyHistogram:
+    """Log-linear latency histogram in the style of HdrHistogram
+
+    Values are recorded in microseconds with ``significant_figures``
+    digits of precision, in constant memory however many are recorded.
+    Percentiles report the highest value equivalent to their bucket.
+    """
+
+    def __init__(self, significant_figures: int = 3):
+        # Sub-buckets per power of two, enough for the requested precision
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10**significant_figures))
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        value = max(int(seconds * 1e6), 0)
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        self.counts[(shift, value >> shift)] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, value)
+
+    def percentile(self, percentile: float) -> float:
+        """Latency in seconds at or below which ``percentile`` % of values fall"""
+        if not self.total:
+            return 0.0
+        if percentile >= 100:
+            return self.max_us / 1e6
+        rank = max(math.ceil(self.total * percentile / 100), 1)
+        seen = 0
+        for shift, sub_bucket in sorted(self.counts, key=lambda k: k[1] << k[0]):
+            seen += self.counts[(shift, sub_bucket)]
+            if seen >= rank:
+                highest = ((sub_bucket + 1) << shift) - 1
+                return min(highest, self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    def distribution(self, ticks_per_half: int = 5) -> List[Tuple[float, float]]:
+        """(percentile, seconds) rows, denser towards the tail like HdrHistogram"""
+        rows = []
+        level = 0
+        while self.total and 1 / (1 - (100 - 100 / 2**level) / 100) <= self.total:
+            start = 100 - 100 / 2**level
+            end = 100 - 100 / 2 ** (level + 1)
+            for tick in range(ticks_per_half):
+                percentile = start + (end - start) * tick / ticks_per_half
+                rows.append((percentile, self.percentile(percentile)))
+            level += 1
+        rows.append((100.0, self.percentile(100)))
+        return rows
+
+
+class Stats:
+    """Outcome counts and latency histograms for a set of requests"""
+
+    def __init__(self):
+        self.ok = 0
+        self.errors: Counter = Counter()
+        # From the time the request was due: what a user would see
+        self.response = LatencyHistogram()
+        # From the time the request was actually sent
+        self.service = LatencyHistogram()
+
+    def record(self, status, response: float, service: float):
+        if status == 200:
+            self.ok += 1
+            self.response.record(response)
+            self.service.record(service)
+        else:
+            self.errors[str(status)] += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        return {
+            "ok": self.ok,
+            "errors": dict(self.errors),
+            "throughput": self.ok / elapsed if elapsed > 0 else 0.0,
+            "response_ms": {
+                f"p{p:g}": self.response.percentile(p) * 1000
+                for p in SUMMARY_PERCENTILES + (100,)
+            },
+            "service_ms": {
+                f"p{p:g}": self.service.percentile(p) * 1000
+                for p in SUMMARY_PERCENTILES + (100,)
+            },
+        }
+
+
+class Schedule:
+    """Arrival rate over time as linear ramps between (seconds, rate) stages"""
+
+    def __init__(self, stages: List[Tuple[float, float]], start_rate: float):
+        self.stages = stages
+        self.start_rate = start_rate
+
+    @property
+    def duration(self) -> float:
+        return sum(seconds for seconds, _ in self.stages)
+
+    def arrivals(self) -> Iterator[Tuple[int, float]]:
+        """Yield (stage index, offset in seconds) of every request
+
+        Offsets solve N(t) = k for the k-th request, where N is the expected
+        number of arrivals by time t, so ramps are followed exactly.
+        """
+        rate = self.start_rate
+        stage_start = 0.0
+        # Arrival count of the next request, relative to the current stage
+        position = 1.0
+        for index, (seconds, target) in enumerate(self.stages):
+            slope = (target - rate) / seconds
+            count = rate * seconds + slope * seconds**2 / 2
+            while position <= count:
+                if slope:
+                    offset = (
+                        math.sqrt(rate**2 + 2 * slope * position) - rate
+                    ) / slope
+                else:
+                    offset = position / rate
+                yield index, stage_start + offset
+                position += 1
+            position -= count
+            stage_start += seconds
+            rate = target
+
+
+class Workload:
+    """Pre-encoded request bodies, picked according to the endpoint mix"""
+
+    def __init__(self, mix: Dict[str, float], batch_size: int, pool_size: int = 500):
+        self.endpoints = list(mix)
+        self.weights = [mix[e] for e in self.endpoints]
+        # Encoding happens up front so the generator spends its time sending
+        self.bodies = {
+            "predict": [
+                json.dumps(generate_random_customer()).encode()
+                for _ in range(pool_size)
+            ],
+            "batch_predict": [
+                json.dumps(
+                    {
+                        "customers": [
+                            generate_random_customer() for _ in range(batch_size)
+                        ]
+                    }
+                ).encode()
+                for _ in range(max(pool_size // batch_size, 10))
+            ],
+        }
+
+    def next(self) -> Tuple[str, bytes]:
+        endpoint = random.choices(self.endpoints, self.weights)[0]
+        return endpoint, random.choice(self.bodies[endpoint])
+
+
+class Recorder:
+    """Stats per endpoint, per schedule stage and overall"""
+
+    def __init__(self, n_stages: int):
+        self.endpoints: Dict[str, Stats] = defaultdict(Stats)
+        self.total = Stats()
+        self.stages = [Stats() for _ in range(n_stages)]
+        # How late requests were sent; large values mean the generator lagged
+        self.send_lag = LatencyHistogram()
+        self.dropped = 0
+
+    def record(self, endpoint, stage, status, due, sent, done):
+        for stats in (self.endpoints[endpoint], self.total, self.stages[stage]):
+            stats.record(status, done - due, done - sent)
+        self.send_lag.record(sent - due)
+
+
+async def send(client, workload, recorder, stage, due):
+    loop = asyncio.get_running_loop()
+    endpoint, body = workload.next()
+    sent = loop.time()
     try:
-        response = requests.post(
-            f"{API_URL}/predict",
-            json=generate_random_customer(),
-            headers={"Content-Type": "application/json"},
+        response = await client.post(
+            ENDPOINTS[endpoint], content=body, headers=JSON_HEADERS
         )
-        elapsed_time = time.time() - start_time
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    recorder.record(endpoint, stage, status, due, sent, loop.time())
 
-        if response.status_code == 200:
-            return True, elapsed_time
-        else:
-            return False, elapsed_time
-    except Exception as e:
-        return False, time.time() - start_time
 
+async def open_loop(client, workload, schedule, recorder, max_in_flight):
+    """Send requests on schedule, without waiting for earlier responses"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    in_flight = set()
+    for stage, offset in schedule.arrivals():
+        due = start + offset
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            recorder.dropped += 1
+            continue
+        task = asyncio.create_task(send(client, workload, recorder, stage, due))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return loop.time() - start
 
-def load_test(num_requests=100, num_workers=10):
-    """Run load test"""
+
+async def closed_loop(client, workload, recorder, concurrency, requests):
+    """Each of ``concurrency`` users sends its next request after a response"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    remaining = requests
+
+    async def user():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await send(client, workload, recorder, 0, loop.time())
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return loop.time() - start
+
+
+def parse_stages(values: List[str]) -> List[Tuple[float, float]]:
+    stages = []
+    for value in values:
+        seconds, rate = value.split(":")
+        stages.append((float(seconds), float(rate)))
+    return stages
+
+
+def parse_mix(values: List[str]) -> Dict[str, float]:
+    mix = {}
+    for value in values:
+        endpoint, weight = value.split("=")
+        if endpoint not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {endpoint}")
+        mix[endpoint] = float(weight)
+    return mix
+
+
+def print_latency_table(title: str, rows: List[Tuple[str, Stats]], attr: str):
+    print(f"\n{title}")
+    header = "".join(f"{f'p{p:g}':>10}" for p in SUMMARY_PERCENTILES)
+    print(f"{'':<16}{'ok':>9}{'errors':>8}{header}{'max':>10}  (ms)")
+    for name, stats in rows:
+        histogram = getattr(stats, attr)
+        values = "".join(
+            f"{histogram.percentile(p) * 1000:>10.2f}"
+            for p in SUMMARY_PERCENTILES + (100,)
+        )
+        print(f"{name:<16}{stats.ok:>9}{sum(stats.errors.values()):>8}{values}")
+
+
+def report(recorder, schedule, elapsed, args):
+    """Print the summary tables and return the results as a dict"""
+    rows = sorted(recorder.endpoints.items()) + [("all", recorder.total)]
+    print(f"\nLoad Test Results ({args.mode} loop, {elapsed:.1f}s)")
     print(
-        f"Starting load test with {num_requests} requests using {num_workers} workers..."
+        f"Successful: {recorder.total.ok}, errors: {dict(recorder.total.errors)}, "
+        f"dropped: {recorder.dropped}, "
+        f"throughput: {recorder.total.ok / elapsed:.1f} req/s"
+    )
+    print_latency_table(
+        "Response time (from when each request was due)", rows, "response"
+    )
+    print_latency_table(
+        "Service time (from when each request was sent)", rows, "service"
     )
 
-    success_count = 0
-    response_times = []
+    results = {
+        "mode": args.mode,
+        "elapsed": elapsed,
+        "dropped": recorder.dropped,
+        "endpoints": {name: stats.summary(elapsed) for name, stats in rows},
+    }
 
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = [executor.submit(make_prediction) for _ in range(num_requests)]
+    if schedule is not None:
+        print(
+            f"\n{'stage':<7}{'target/s':>10}{'achieved/s':>12}{'errors':>8}"
+            f"{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>10}"
+        )
+        results["stages"] = []
+        for index, ((seconds, target), stats) in enumerate(
+            zip(schedule.stages, recorder.stages)
+        ):
+            summary = stats.summary(seconds)
+            summary["target_rate"] = target
+            results["stages"].append(summary)
+            print(
+                f"{index:<7}{target:>10.1f}{summary['throughput']:>12.1f}"
+                f"{sum(stats.errors.values()):>8}"
+                f"{summary['response_ms']['p50']:>10.2f}"
+                f"{summary['response_ms']['p99']:>10.2f}"
+                f"{summary['response_ms']['p99.9']:>10.2f}"
+            )
 
-        for future in as_completed(futures):
-            success, elapsed_time = future.result()
-            if success:
-                success_count += 1
-            response_times.append(elapsed_time)
+        lag = recorder.send_lag.percentile(99) * 1000
+        if lag > 10:
+            print(
+                f"\nwarning: p99 send lag was {lag:.1f} ms; the generator could not "
+                "keep up, so the highest rates were not fully offered",
+                file=sys.stderr,
+            )
 
-    # Calculate statistics
-    success_rate = (success_count / num_requests) * 100
-    avg_response_time = statistics.mean(response_times)
-    p95_response_time = statistics.quantiles(response_times, n=20)[
-        18
-    ]  # 95th percentile
+    if args.distribution:
+        print("\nResponse time percentile distribution (all endpoints)")
+        print(f"{'Value (ms)':>12}{'Percentile':>14}{'1/(1-Percentile)':>20}")
+        for percentile, seconds in recorder.total.response.distribution():
+            inverse = 1 / (1 - percentile / 100) if percentile < 100 else math.inf
+            print(f"{seconds * 1000:>12.3f}{percentile / 100:>14.6f}{inverse:>20.2f}")
 
-    print(f"\nLoad Test Results:")
-    print(f"Total Requests: {num_requests}")
-    print(f"Successful Requests: {success_count}")
-    print(f"Success Rate: {success_rate:.2f}%")
-    print(f"Average Response Time: {avg_response_time:.3f}s")
-    print(f"95th Percentile Response Time: {p95_response_time:.3f}s")
+    return results
 
 
-if __name__ == "__main__":
-    # Check if API is running
-    try:
-        response = requests.get(f"{API_URL}/health")
-        if response.status_code == 200:
-            print("API is healthy, starting load test...")
-            load_test(num_requests=1000, num_workers=20)
+async def load_test(args):
+    """Run load test"""
+    mix = parse_mix(args.mix)
+    workload = Workload(mix, args.batch_size)
+
+    if args.mode == "open":
+        if args.stages:
+            stages = parse_stages(args.stages)
+            start_rate = args.start_rate
         else:
-            print("API health check failed!")
-    except Exception as e:
-        print(f"Cannot connect to API: {e}")
+            stages = [(args.duration, args.rate)]
+            start_rate = args.rate
+        schedule = Schedule(stages, start_rate)
+        recorder = Recorder(len(stages))
+    else:
+        schedule = None
+        recorder = Recorder(1)
+
+    limits = httpx.Limits(
+        max_connections=args.connections, max_keepalive_connections=args.connections
+    )
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        response = await client.get("/health")
+        if response.status_code != 200 or not response.json().get("model_loaded"):
+            raise SystemExit(f"API health check failed: {response.text}")
+        print("API is healthy, starting load test...")
+
+        if schedule is not None:
+            print(
+                f"Open loop for {schedule.duration:.0f}s, stages "
+                f"{schedule.stages}, mix {mix}"
+            )
+            elapsed = await open_loop(
+                client, workload, schedule, recorder, args.max_in_flight
+            )
+        else:
+            print(
+                f"Closed loop: {args.requests} requests from "
+                f"{args.concurrency} users, mix {mix}"
+            )
+            elapsed = await closed_loop(
+                client, workload, recorder, args.concurrency, args.requests
+            )
+
+    return report(recorder, schedule, elapsed, args)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test the churn prediction API")
+    parser.add_argument("--url", default=API_URL, help="Base URL of the API")
+    parser.add_argument("--mode", choices=("open", "closed"), default="open")
+    parser.add_argument("--rate", type=float, default=50, help="Requests/sec (open)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds (open)")
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        metavar="SECONDS:RATE",
+        help="Ramp schedule for the open loop, replacing --rate/--duration",
+    )
+    parser.add_argument(
+        "--start-rate", type=float, default=0, help="Rate the first stage ramps from"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=20, help="Users in the closed loop"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=1000, help="Requests in the closed loop"
+    )
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        default=["predict=1"],
+        metavar="ENDPOINT=WEIGHT",
+        help="Relative weights of predict and batch_predict requests",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="Customers per batch request"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=100, help="Connection pool size"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=10000,
+        help="Open-loop requests outstanding before new ones are dropped",
+    )
+    parser.add_argument("--timeout", type=float, default=30, help="Request timeout")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--distribution", action="store_true", help="Print the full percentile table"
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    try:
+        results = asyncio.run(load_test(args))
+    except httpx.HTTPError as e:
+        raise SystemExit(f"Cannot connect to API: {e}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Replay recorded API traffic and compare the responses
+
+The traffic file is newline-delimited JSON, one request per line:
+
+    {"timestamp": 1718000000.123, "endpoint": "/predict",
+     "request": {...}, "response": {...}}
+
+``timestamp`` is in seconds, ``request`` the JSON body that was sent and
+``response`` (optional) the JSON body that came back. Requests are sent
+at their original spacing, divided by --speed, without waiting for
+earlier responses. Latency is measured from when each request was due.
+Recorded responses are compared with the new ones, prediction by
+prediction, to show how far a new model or new settings move the scores.
+
+Usage:
+    python scripts/replay.py traffic.jsonl
+    python scripts/replay.py traffic.jsonl --speed 5 --max-delta 0.01
+    python scripts/replay.py traffic.jsonl --speed 0 --save-responses baseline.jsonl
+
+--speed 0 sends every request as soon as a connection is free. Replaying
+against the current model with --save-responses writes a file in the same
+format, to compare a candidate model or configuration against later.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.load_test import (  # noqa: E402
+    API_URL,
+    JSON_HEADERS,
+    Stats,
+    print_latency_table,
+)
+
+ENDPOINTS = ("/predict", "/batch_predict")
+
+
+def read_traffic(path: Path) -> Iterator[Dict]:
+    """Yield the records of a traffic file, which may be gzipped"""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                print(f"warning: line {line_no}: invalid JSON: {e}", file=sys.stderr)
+                continue
+            yield record
+
+
+def predictions_of(body) -> List[Dict]:
+    """The prediction dicts of a /predict or /batch_predict response body"""
+    if not isinstance(body, dict):
+        return []
+    if "predictions" in body:
+        return body["predictions"]
+    return [body] if "churn_probability" in body else []
+
+
+class DriftReport:
+    """Differences between recorded and replayed predictions"""
+
+    def __init__(self):
+        self.deltas = array("d")
+        self.prediction_flips = 0
+        self.risk_level_flips = 0
+        self.missing = 0
+        self.model_versions: Counter = Counter()
+
+    def compare(self, recorded, replayed):
+        old = predictions_of(recorded)
+        new = predictions_of(replayed)
+        if len(old) != len(new):
+            self.missing += abs(len(old) - len(new))
+        for before, after in zip(old, new):
+            if "churn_probability" not in before or "churn_probability" not in after:
+                self.missing += 1
+                continue
+            self.deltas.append(
+                abs(after["churn_probability"] - before["churn_probability"])
+            )
+            self.prediction_flips += before.get("churn_prediction") != after.get(
+                "churn_prediction"
+            )
+            self.risk_level_flips += before.get("risk_level") != after.get("risk_level")
+            self.model_versions[
+                (before.get("model_version"), after.get("model_version"))
+            ] += 1
+
+    def summary(self) -> Dict:
+        deltas = sorted(self.deltas)
+        compared = len(deltas)
+        return {
+            "compared": compared,
+            "missing": self.missing,
+            "max_probability_delta": deltas[-1] if compared else 0.0,
+            "mean_probability_delta": sum(deltas) / compared if compared else 0.0,
+            "p99_probability_delta": (
+                deltas[min(int(compared * 0.99), compared - 1)] if compared else 0.0
+            ),
+            "prediction_flips": self.prediction_flips,
+            "risk_level_flips": self.risk_level_flips,
+            "model_versions": [
+                {"recorded": old, "replayed": new, "predictions": count}
+                for (old, new), count in self.model_versions.items()
+            ],
+        }
+
+
+class Replayer:
+    """Send recorded requests and collect latency and drift statistics"""
+
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.stats: Dict[str, Stats] = defaultdict(Stats)
+        self.total = Stats()
+        self.drift = DriftReport()
+        self.skipped = 0
+        self.dropped = 0
+        self.output = open(args.save_responses, "w") if args.save_responses else None
+
+    async def send(self, record, due):
+        loop = asyncio.get_running_loop()
+        endpoint = record["endpoint"]
+        sent = loop.time()
+        body = None
+        try:
+            response = await self.client.post(
+                endpoint, content=json.dumps(record["request"]), headers=JSON_HEADERS
+            )
+            status = response.status_code
+            if status == 200:
+                body = response.json()
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        done = loop.time()
+
+        for stats in (self.stats[endpoint], self.total):
+            stats.record(status, done - due, done - sent)
+        if body is not None and "response" in record:
+            self.drift.compare(record["response"], body)
+        if self.output is not None and body is not None:
+            line = {
+                "timestamp": record.get("timestamp"),
+                "endpoint": endpoint,
+                "request": record["request"],
+                "response": body,
+            }
+            self.output.write(json.dumps(line) + "\n")
+
+    async def run(self, records: Iterator[Dict]) -> float:
+        """Send every record on its (scaled) original schedule"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        first_timestamp = None
+        in_flight = set()
+        for record in records:
+            if record.get("endpoint") not in ENDPOINTS or "request" not in record:
+                self.skipped += 1
+                continue
+
+            if self.args.speed > 0:
+                timestamp = float(record.get("timestamp", 0))
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                due = start + max(timestamp - first_timestamp, 0) / self.args.speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                # As fast as possible: wait for room instead of dropping
+                while len(in_flight) >= self.args.connections:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                due = loop.time()
+
+            if len(in_flight) >= self.args.max_in_flight:
+                self.dropped += 1
+                continue
+            task = asyncio.create_task(self.send(record, due))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        if self.output is not None:
+            self.output.close()
+        return loop.time() - start
+
+
+def report(replayer: Replayer, elapsed: float) -> Dict:
+    rows = sorted(replayer.stats.items()) + [("all", replayer.total)]
+    print(f"\nReplay Results ({elapsed:.1f}s)")
+    print(
+        f"Successful: {replayer.total.ok}, errors: {dict(replayer.total.errors)}, "
+        f"skipped: {replayer.skipped}, dropped: {replayer.dropped}"
+    )
+    print_latency_table(
+        "Response time (from when each request was due)", rows, "response"
+    )
+    print_latency_table(
+        "Service time (from when each request was sent)", rows, "service"
+    )
+
+    drift = replayer.drift.summary()
+    print(f"\nPredictions compared with the recording: {drift['compared']}")
+    if drift["compared"]:
+        print(
+            f"  |delta p| max {drift['max_probability_delta']:.6f}, "
+            f"mean {drift['mean_probability_delta']:.6f}, "
+            f"p99 {drift['p99_probability_delta']:.6f}"
+        )
+        print(
+            f"  prediction flips: {drift['prediction_flips']}, "
+            f"risk level flips: {drift['risk_level_flips']}, "
+            f"missing: {drift['missing']}"
+        )
+        for versions in drift["model_versions"]:
+            print(
+                f"  model {versions['recorded']} -> {versions['replayed']}: "
+                f"{versions['predictions']} predictions"
+            )
+
+    return {
+        "elapsed": elapsed,
+        "skipped": replayer.skipped,
+        "dropped": replayer.dropped,
+        "endpoints": {name: stats.summary(elapsed) for name, stats in rows},
+        "drift": drift,
+    }
+
+
+async def replay(args) -> Dict:
+    limits = httpx.Limits(
+        max_connections=args.connections, max_keepalive_connections=args.connections
+    )
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        replayer = Replayer(client, args)
+        elapsed = await replayer.run(read_traffic(args.traffic))
+    return report(replayer, elapsed)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic")
+    parser.add_argument("traffic", type=Path, help="NDJSON traffic file (.gz ok)")
+    parser.add_argument("--url", default=API_URL, help="Base URL of the API")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed as a multiple of the original; 0 for as fast as possible",
+    )
+    parser.add_argument(
+        "--connections", type=int, default=100, help="Connection pool size"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=10000,
+        help="Requests outstanding before new ones are dropped",
+    )
+    parser.add_argument("--timeout", type=float, default=30, help="Request timeout")
+    parser.add_argument(
+        "--max-delta",
+        type=float,
+        help="Exit 1 if any churn probability moved by more than this",
+    )
+    parser.add_argument(
+        "--save-responses", type=Path, help="Write the replayed traffic here"
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(replay(args))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    max_delta = results["drift"]["max_probability_delta"]
+    if args.max_delta is not None and max_delta > args.max_delta:
+        print(
+            f"\nDRIFT: churn probability moved by up to {max_delta:.6f}, "
+            f"more than --max-delta {args.max_delta}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
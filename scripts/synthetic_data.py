@@ -0,0 +1,85 @@
+"""
+Synthetic customers and models for the benchmark scripts
+
+The customers have the shape of the training notebook's sample data, and
+the models are the training pipeline's candidates, so the scripts can run
+without a trained model on disk.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.features import BINARY_MAPPINGS, CATEGORICAL_COLUMNS  # noqa: E402
+from app.train import CANDIDATES  # noqa: E402
+
+CATEGORY_VALUES = {
+    "gender": ["Male", "Female"],
+    "Partner": ["Yes", "No"],
+    "Dependents": ["Yes", "No"],
+    "PhoneService": ["Yes", "No"],
+    "PaperlessBilling": ["Yes", "No"],
+    "MultipleLines": ["Yes", "No", "No phone service"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": ["Yes", "No", "No internet service"],
+    "OnlineBackup": ["Yes", "No", "No internet service"],
+    "DeviceProtection": ["Yes", "No", "No internet service"],
+    "TechSupport": ["Yes", "No", "No internet service"],
+    "StreamingTV": ["Yes", "No", "No internet service"],
+    "StreamingMovies": ["Yes", "No", "No internet service"],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaymentMethod": [
+        "Electronic check",
+        "Mailed check",
+        "Bank transfer",
+        "Credit card",
+    ],
+}
+
+# The training pipeline's candidate models
+MODEL_TYPES = CANDIDATES
+
+
+def synthetic_raw_frame(n, seed=42):
+    """Random customers as a DataFrame of CustomerData fields"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.choice(v, n) for col, v in CATEGORY_VALUES.items()})
+    df["SeniorCitizen"] = rng.integers(0, 2, n)
+    df["tenure"] = rng.integers(0, 72, n)
+    df["MonthlyCharges"] = rng.uniform(20, 120, n).round(2)
+    df["TotalCharges"] = rng.uniform(20, 8000, n).round(2)
+    return df
+
+
+def synthetic_customers(n, seed=42):
+    """Random customers as CustomerData dicts, the API's input"""
+    return synthetic_raw_frame(n, seed).to_dict("records")
+
+
+def synthetic_frame(n, seed=42):
+    """Random customers encoded the way the training notebook does"""
+    df = synthetic_raw_frame(n, seed)
+    rng = np.random.default_rng(seed + 1)
+    y = (rng.uniform(size=n) < 0.27).astype(int)
+
+    for col, mapping in BINARY_MAPPINGS.items():
+        df[col] = df[col].map(mapping)
+    df = pd.get_dummies(df, columns=CATEGORICAL_COLUMNS)
+    df["tenure_MonthlyCharges"] = df["tenure"] * df["MonthlyCharges"]
+    df["TotalCharges_per_Month"] = df["TotalCharges"] / (df["tenure"] + 1)
+    return df, y
+
+
+def synthetic_models(names=MODEL_TYPES, n_rows=5000):
+    """Yield (name, model, scaler, feature names) trained on synthetic data"""
+    X, y = synthetic_frame(n_rows)
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    for name in names:
+        model = MODEL_TYPES[name]().fit(X_scaled, y)
+        yield name, model, scaler, list(X.columns)
@@ -0,0 +1,117 @@
+# tests/conftest.py
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from app.model import ChurnPredictor
+
+CATEGORY_VALUES = {
+    "gender": ["Male", "Female"],
+    "Partner": ["Yes", "No"],
+    "Dependents": ["Yes", "No"],
+    "PhoneService": ["Yes", "No"],
+    "MultipleLines": ["Yes", "No", "No phone service"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": ["Yes", "No", "No internet service"],
+    "OnlineBackup": ["Yes", "No", "No internet service"],
+    "DeviceProtection": ["Yes", "No", "No internet service"],
+    "TechSupport": ["Yes", "No", "No internet service"],
+    "StreamingTV": ["Yes", "No", "No internet service"],
+    "StreamingMovies": ["Yes", "No", "No internet service"],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaperlessBilling": ["Yes", "No"],
+    "PaymentMethod": [
+        "Electronic check",
+        "Mailed check",
+        "Bank transfer",
+        "Credit card",
+    ],
+}
+
+
+def make_customers(n, seed=0):
+    """Random customers in the same shape as the training notebook data"""
+    rng = np.random.default_rng(seed)
+    customers = []
+    for _ in range(n):
+        customer = {col: str(rng.choice(v)) for col, v in CATEGORY_VALUES.items()}
+        customer["SeniorCitizen"] = int(rng.integers(0, 2))
+        customer["tenure"] = int(rng.integers(0, 72))
+        customer["MonthlyCharges"] = float(round(rng.uniform(20, 120), 2))
+        customer["TotalCharges"] = float(round(rng.uniform(20, 8000), 2))
+        customers.append(customer)
+    return customers
+
+
+def make_training_frame(n=500, seed=42):
+    """Encoded training frame built exactly like notebooks/train_model.ipynb"""
+    df = pd.DataFrame(make_customers(n, seed))
+    rng = np.random.default_rng(seed)
+    df["Churn"] = rng.choice(["Yes", "No"], n, p=[0.27, 0.73])
+
+    binary_cols = [
+        "gender",
+        "Partner",
+        "Dependents",
+        "PhoneService",
+        "PaperlessBilling",
+    ]
+    for col in binary_cols:
+        df[col] = df[col].map({"Yes": 1, "No": 0, "Male": 1, "Female": 0})
+    categorical_cols = [c for c in CATEGORY_VALUES if c not in binary_cols]
+    df = pd.get_dummies(df, columns=categorical_cols)
+    df["Churn"] = df["Churn"].map({"Yes": 1, "No": 0})
+    df["tenure_MonthlyCharges"] = df["tenure"] * df["MonthlyCharges"]
+    df["TotalCharges_per_Month"] = df["TotalCharges"] / (df["tenure"] + 1)
+
+    X = df.drop("Churn", axis=1)
+    y = df["Churn"]
+    return X, y
+
+
+@pytest.fixture(scope="session")
+def training_data():
+    return make_training_frame()
+
+
+@pytest.fixture
+def fitted_predictor(training_data):
+    """ChurnPredictor wired to a small model trained on synthetic data"""
+    X, y = training_data
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    model = LogisticRegression(random_state=42, max_iter=1000).fit(X_scaled, y)
+
+    predictor = ChurnPredictor()
+    predictor.model = model
+    predictor.scaler = scaler
+    predictor.feature_names = X.columns.tolist()
+    return predictor
+
+
+@pytest.fixture
+def loaded_predictor(fitted_predictor, monkeypatch):
+    """Load the synthetic model into the global predictor used by the API"""
+    from app.model import predictor
+
+    for attr in ("model", "scaler", "feature_names", "encoder", "validator"):
+        monkeypatch.setattr(predictor, attr, getattr(fitted_predictor, attr))
+    return predictor
+
+
+def save_artifacts(predictor, directory):
+    """Write a predictor's model files the way the training notebook does"""
+    joblib.dump(predictor.model, directory / "churn_model.pkl")
+    joblib.dump(predictor.scaler, directory / "scaler.pkl")
+    joblib.dump(predictor.feature_names, directory / "feature_names.pkl")
+
+
+@pytest.fixture
+def model_dir(tmp_path, fitted_predictor):
+    """Directory holding artifacts of the synthetic model"""
+    save_artifacts(fitted_predictor, tmp_path)
+    return tmp_path
@@ -1,5 +1,7 @@
 # tests/test_api.py
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
@@ -103,3 +105,163 @@ def test_batch_predict():
     assert "predictions" in data
     assert "total_processed" in data
     assert data["total_processed"] == 1
+
+
+def test_batch_predict_stream(loaded_predictor):
+    from tests.conftest import make_customers
+
+    customers = make_customers(5, seed=30)
+    lines = [json.dumps(c) for c in customers]
+    lines.insert(2, json.dumps({"gender": "Invalid"}))
+    lines.insert(4, "")  # blank lines are ignored
+    body = "\n".join(lines) + "\n"
+
+    response = client.post("/batch_predict/stream", content=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    summary = records.pop()["summary"]
+    assert summary == {
+        "total_processed": 5,
+        "high_risk_count": sum(r.get("risk_level") == "High" for r in records),
+        "error_count": 1,
+    }
+    assert "error" in records[2]
+    expected = loaded_predictor.predict_batch(customers)
+    scored = [r for r in records if "error" not in r]
+    assert [r["churn_probability"] for r in scored] == [
+        r["churn_probability"] for r in expected
+    ]
+
+
+def test_batch_predict_stream_chunks(loaded_predictor, monkeypatch):
+    from app import config
+    from tests.conftest import make_customers
+
+    monkeypatch.setattr(config, "STREAM_CHUNK_SIZE", 3)
+    customers = make_customers(10, seed=31)
+    body = "".join(json.dumps(c) + "\n" for c in customers)
+
+    response = client.post("/batch_predict/stream", content=body)
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[-1]["summary"]["total_processed"] == 10
+    assert [r["customer_id"] for r in records[:-1]] == [
+        f"CUST_{i:04d}" for i in range(1, 11)
+    ]
+
+
+def test_batch_predict_matches_predictor(loaded_predictor):
+    from tests.conftest import make_customers
+
+    customers = make_customers(20, seed=32)
+    response = client.post("/batch_predict", json={"customers": customers})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_processed"] == 20
+    expected = loaded_predictor.predict_batch(customers)
+    assert [p["churn_probability"] for p in data["predictions"]] == [
+        r["churn_probability"] for r in expected
+    ]
+
+
+def test_batch_predict_rejects_unknown_category(loaded_predictor):
+    from tests.conftest import make_customers
+
+    customers = make_customers(3, seed=33)
+    customers[1]["PaymentMethod"] = "Bitcoin"
+    del customers[2]["tenure"]
+
+    response = client.post("/batch_predict", json={"customers": customers})
+
+    assert response.status_code == 422
+    errors = response.json()["detail"]
+    assert [e["loc"] for e in errors] == [
+        ["body", "customers", 1, "PaymentMethod"],
+        ["body", "customers", 2, "tenure"],
+    ]
+    assert errors[0]["input"] == "Bitcoin"
+
+
+@pytest.mark.parametrize(
+    "body", ['{"customers": ', "[]", "{}", '{"customers": {}}', '{"customers": [1]}']
+)
+def test_batch_predict_malformed_body(loaded_predictor, body):
+    response = client.post(
+        "/batch_predict", content=body, headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 422
+
+
+def test_predict_rejects_unknown_category(loaded_predictor):
+    from tests.conftest import make_customers
+
+    customer = make_customers(1, seed=34)[0]
+    customer["InternetService"] = "Cable"
+
+    response = client.post("/predict", json=customer)
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "InternetService"]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_batch_predict_response_matches_schema(
+    loaded_predictor, monkeypatch, use_orjson
+):
+    from app import serialization
+    from app.schema import BatchPredictionResponse, PredictionResponse
+    from tests.conftest import make_customers
+
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+
+    customers = make_customers(50, seed=35)
+    response = client.post("/batch_predict", json={"customers": customers})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    parsed = BatchPredictionResponse.model_validate(data)
+    assert list(data["predictions"][0]) == list(PredictionResponse.model_fields)
+    assert list(data) == list(BatchPredictionResponse.model_fields)
+
+    expected = loaded_predictor.predict_batch(customers)
+    assert [p.model_dump() for p in parsed.predictions] == [
+        PredictionResponse(**r).model_dump() for r in expected
+    ]
+    assert parsed.high_risk_count == sum(r["risk_level"] == "High" for r in expected)
+    assert parsed.model_version == loaded_predictor.model_version
+
+
+def test_numeric_strings_are_treated_alike_by_both_endpoints(loaded_predictor):
+    from tests.conftest import make_customers
+
+    customer = make_customers(1, seed=60)[0]
+    expected = client.post("/predict", json=customer).json()["churn_probability"]
+    as_strings = dict(
+        customer,
+        tenure=str(customer["tenure"]),
+        MonthlyCharges=str(customer["MonthlyCharges"]),
+    )
+
+    single = client.post("/predict", json=as_strings)
+    batch = client.post("/batch_predict", json={"customers": [as_strings]})
+
+    assert single.status_code == batch.status_code == 200
+    assert single.json()["churn_probability"] == pytest.approx(expected)
+    assert batch.json()["predictions"][0]["churn_probability"] == pytest.approx(
+        expected
+    )
+
+    fractional = dict(customer, tenure="12.5")
+    single = client.post("/predict", json=fractional)
+    batch = client.post("/batch_predict", json={"customers": [fractional]})
+    assert single.status_code == batch.status_code == 422
+    assert single.json()["detail"][0]["type"] == "int_parsing"
+    assert batch.json()["detail"][0]["type"] == "int_parsing"
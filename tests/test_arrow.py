@@ -0,0 +1,104 @@
+# tests/test_arrow.py
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from tests.conftest import make_customers
+
+pa = pytest.importorskip("pyarrow")
+pc = pytest.importorskip("pyarrow.compute")
+
+client = TestClient(app)
+
+
+def to_ipc(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def read_ipc(content):
+    return pa.ipc.open_stream(pa.py_buffer(content)).read_all()
+
+
+def post_arrow(table, **params):
+    return client.post(
+        "/batch_predict/arrow",
+        content=to_ipc(table),
+        params=params,
+        headers={"Content-Type": "application/vnd.apache.arrow.stream"},
+    )
+
+
+def test_arrow_matches_predictor(loaded_predictor):
+    customers = make_customers(50, seed=40)
+    response = post_arrow(pa.Table.from_pylist(customers))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    result = read_ipc(response.content).to_pydict()
+    expected = loaded_predictor.predict_batch(customers)
+    assert result["churn_probability"] == [r["churn_probability"] for r in expected]
+    assert result["churn_prediction"] == [r["churn_prediction"] for r in expected]
+    assert result["risk_level"] == [r["risk_level"] for r in expected]
+    assert result["error"] == [None] * 50
+
+
+def test_arrow_reports_invalid_rows(loaded_predictor):
+    customers = make_customers(4, seed=41)
+    customers[1]["PaymentMethod"] = "Bitcoin"
+    customers[2]["tenure"] = None
+    customers[3]["Contract"] = None
+
+    response = post_arrow(pa.Table.from_pylist(customers))
+
+    assert response.status_code == 200
+    result = read_ipc(response.content).to_pydict()
+    assert result["churn_probability"][0] is not None
+    assert result["churn_probability"][1:] == [None, None, None]
+    assert result["risk_level"][1:] == [None, None, None]
+    assert result["error"][0] is None
+    assert result["error"][1].startswith("PaymentMethod: Input should be")
+    assert result["error"][2] == "tenure: Field required"
+    assert result["error"][3] == "Contract: Field required"
+
+
+def test_arrow_chunked_dictionary_columns(loaded_predictor):
+    customers = make_customers(30, seed=42)
+    first = pa.Table.from_pylist(customers[:10])
+    second = pa.Table.from_pylist(customers[10:])
+    # Dictionary columns whose chunks have different dictionaries
+    chunks = []
+    for table in (first, second):
+        columns = [
+            pc.dictionary_encode(c) if pa.types.is_string(c.type) else c
+            for c in table.columns
+        ]
+        chunks.append(pa.Table.from_arrays(columns, names=table.column_names))
+    table = pa.concat_tables(chunks)
+    table = table.append_column("customer_id", pa.array([f"C{i}" for i in range(30)]))
+
+    response = post_arrow(table, id_column="customer_id")
+
+    assert response.status_code == 200
+    result = read_ipc(response.content)
+    assert result.column_names[0] == "customer_id"
+    assert result.column("customer_id").to_pylist() == [f"C{i}" for i in range(30)]
+    expected = loaded_predictor.predict_batch(customers)
+    np.testing.assert_array_equal(
+        result.column("churn_probability").to_numpy(),
+        [r["churn_probability"] for r in expected],
+    )
+
+
+def test_arrow_rejects_bad_schema(loaded_predictor):
+    table = pa.Table.from_pylist(make_customers(2, seed=43)).drop(["tenure"])
+    response = post_arrow(table)
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Missing column: tenure"
+
+    response = client.post("/batch_predict/arrow", content=b"not arrow")
+    assert response.status_code == 422
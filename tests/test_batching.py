@@ -0,0 +1,112 @@
+# tests/test_batching.py
+
+import asyncio
+
+import pytest
+
+from app.batching import MicroBatcher
+
+
+class RecordingScorer:
+    """Fake predict_batch that records the size of every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, customers):
+        self.calls.append(len(customers))
+        results = []
+        for i, customer in enumerate(customers):
+            if customer.get("bad"):
+                results.append({"customer_id": f"CUST_{i+1:04d}", "error": "bad row"})
+            else:
+                results.append({"customer_id": customer["id"], "risk_level": "Low"})
+        return results
+
+
+def test_concurrent_requests_share_a_batch():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(*[batcher.submit({"id": i}) for i in range(10)])
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [r["customer_id"] for r in results] == list(range(10))
+    assert scorer.calls == [10]
+
+
+def test_batch_size_is_capped():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=4, max_wait_ms=20)
+
+    async def run():
+        await asyncio.gather(*[batcher.submit({"id": i}) for i in range(10)])
+        await batcher.stop()
+
+    asyncio.run(run())
+
+    assert sum(scorer.calls) == 10
+    assert max(scorer.calls) <= 4
+
+
+def test_row_error_only_fails_its_caller():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(
+            batcher.submit({"id": 0}),
+            batcher.submit({"id": 1, "bad": True}),
+            batcher.submit({"id": 2}),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    ok, failed, ok_again = asyncio.run(run())
+
+    assert ok["customer_id"] == 0
+    assert isinstance(failed, ValueError)
+    assert ok_again["customer_id"] == 2
+
+
+def test_scorer_failure_fails_whole_batch():
+    def broken(customers):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(broken, max_batch_size=8, max_wait_ms=5)
+
+    async def run():
+        try:
+            with pytest.raises(RuntimeError):
+                await batcher.submit({"id": 0})
+        finally:
+            await batcher.stop()
+
+    asyncio.run(run())
+
+
+def test_requests_for_different_predictors_are_not_mixed():
+    calls = []
+
+    def scorer(customers, predictor):
+        calls.append((predictor, [c["id"] for c in customers]))
+        return [{"customer_id": c["id"], "model": predictor} for c in customers]
+
+    batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(
+            *[batcher.submit({"id": i}, "old" if i < 3 else "new") for i in range(6)]
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [r["model"] for r in results] == ["old"] * 3 + ["new"] * 3
+    assert sorted(calls) == [("new", [3, 4, 5]), ("old", [0, 1, 2])]
@@ -0,0 +1,92 @@
+# tests/test_bundle.py
+
+import numpy as np
+import pytest
+
+from app.bundle import (
+    BUNDLE_FILENAME,
+    BundleError,
+    load_bundle,
+    main,
+    read_checksum,
+    save_bundle,
+)
+from app.model import ChurnPredictor
+from tests.conftest import make_customers
+
+
+@pytest.fixture
+def bundle_path(tmp_path, fitted_predictor):
+    path = tmp_path / BUNDLE_FILENAME
+    save_bundle(
+        path,
+        fitted_predictor.model,
+        fitted_predictor.scaler,
+        fitted_predictor.feature_names,
+        metadata={"auc_roc": 0.81},
+    )
+    return path
+
+
+def test_roundtrip_memory_maps_arrays(bundle_path, fitted_predictor):
+    payload = load_bundle(bundle_path)
+
+    assert isinstance(payload["model"].coef_, np.memmap)
+    assert isinstance(payload["scaler"].mean_, np.memmap)
+    np.testing.assert_array_equal(payload["model"].coef_, fitted_predictor.model.coef_)
+    assert payload["feature_layout"]["feature_names"] == fitted_predictor.feature_names
+    assert payload["metadata"]["auc_roc"] == 0.81
+    assert payload["metadata"]["model_type"] == "LogisticRegression"
+    assert payload["checksum"] == read_checksum(bundle_path)
+
+
+def test_corrupt_bundle_is_rejected(bundle_path):
+    data = bytearray(bundle_path.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    bundle_path.write_bytes(bytes(data))
+
+    with pytest.raises(BundleError):
+        load_bundle(bundle_path)
+
+
+def test_not_a_bundle(tmp_path):
+    path = tmp_path / "junk.joblib"
+    path.write_bytes(b"x" * 200)
+    with pytest.raises(BundleError):
+        load_bundle(path)
+
+
+def test_predictor_prefers_bundle(bundle_path, fitted_predictor):
+    predictor = ChurnPredictor()
+    predictor.model_path = bundle_path.parent
+
+    assert predictor.load_model()
+    assert predictor.artifact_files == [bundle_path]
+    assert predictor.model_version == read_checksum(bundle_path)[:12]
+    assert predictor.metadata["auc_roc"] == 0.81
+
+    customers = make_customers(20, seed=60)
+    assert predictor.predict_batch(customers) == [
+        {**r, "model_version": predictor.model_version}
+        for r in fitted_predictor.predict_batch(customers)
+    ]
+
+
+def test_predictor_rejects_corrupt_bundle(bundle_path):
+    data = bytearray(bundle_path.read_bytes())
+    data[100] ^= 0xFF
+    bundle_path.write_bytes(bytes(data))
+
+    predictor = ChurnPredictor()
+    predictor.model_path = bundle_path.parent
+    assert not predictor.load_model()
+
+
+def test_convert_legacy_artifacts(model_dir, capsys):
+    main(["--model-dir", str(model_dir)])
+
+    assert "Wrote" in capsys.readouterr().out
+    predictor = ChurnPredictor()
+    predictor.model_path = model_dir
+    assert predictor.load_model()
+    assert predictor.metadata["source"] == "legacy artifacts"
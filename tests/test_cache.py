@@ -0,0 +1,56 @@
+# tests/test_cache.py
+
+from app.cache import PredictionCache, cache_evictions, customer_key
+
+MODEL = object()
+
+
+def test_key_is_field_order_independent():
+    a = {"gender": "Male", "tenure": 12, "MonthlyCharges": 70.35}
+    b = {"MonthlyCharges": 70.35, "tenure": 12, "gender": "Male"}
+    assert customer_key(a) == customer_key(b)
+    assert customer_key(a) != customer_key({**a, "tenure": 13})
+
+
+def test_hit_and_miss():
+    cache = PredictionCache(max_size=10)
+    customer = {"tenure": 1}
+    assert cache.get(customer, MODEL) is None
+
+    cache.put(customer, MODEL, (0.2, "No", 0.6, "Low"))
+    assert cache.get(dict(customer), MODEL) == (0.2, "No", 0.6, "Low")
+
+
+def test_lru_eviction():
+    cache = PredictionCache(max_size=2)
+    cache.put({"id": 1}, MODEL, 1)
+    cache.put({"id": 2}, MODEL, 2)
+    cache.get({"id": 1}, MODEL)  # 1 is now most recently used
+    cache.put({"id": 3}, MODEL, 3)
+
+    assert cache.get({"id": 2}, MODEL) is None
+    assert cache.get({"id": 1}, MODEL) == 1
+    assert cache.get({"id": 3}, MODEL) == 3
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = PredictionCache(ttl_seconds=60)
+    cache.put({"id": 1}, MODEL, 1)
+
+    now[0] += 59
+    assert cache.get({"id": 1}, MODEL) == 1
+    now[0] += 2
+    assert cache.get({"id": 1}, MODEL) is None
+    assert len(cache) == 0
+
+
+def test_new_model_invalidates():
+    cache = PredictionCache()
+    cache.put({"id": 1}, MODEL, 1)
+    before = cache_evictions.labels(reason="model_reload")._value.get()
+
+    assert cache.get({"id": 1}, object()) is None
+    assert len(cache) == 0
+    assert cache_evictions.labels(reason="model_reload")._value.get() == before + 1
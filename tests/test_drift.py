@@ -0,0 +1,119 @@
+# tests/test_drift.py
+
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from app import drift
+from tests.conftest import make_customers
+
+
+def deployed(version="v1", seed=1):
+    """A stand-in predictor whose bundle carries a drift profile"""
+    rng = np.random.default_rng(seed)
+    profile = drift.feature_profile(pd.DataFrame(make_customers(2000, seed)))
+    profile["probability"] = drift.probability_profile(rng.beta(2, 5, 2000))
+    return SimpleNamespace(model_version=version, metadata={"drift_profile": profile})
+
+
+def test_shifted_traffic_scores_higher_than_matching_traffic():
+    predictor = deployed()
+    rng = np.random.default_rng(3)
+    customers = make_customers(1000, seed=2)
+
+    matching = drift.DriftMonitor()
+    matching.observe(customers, rng.beta(2, 5, 1000), predictor, now=0)
+    shifted = drift.DriftMonitor()
+    for customer in customers:
+        customer["tenure"] += 30
+        customer["Contract"] = "Two year"
+    shifted.observe(customers, rng.beta(5, 2, 1000), predictor, now=0)
+
+    calm, drifted = matching.scores(now=0), shifted.scores(now=0)
+    assert max(score["psi"] for score in calm.values()) < 0.1
+    for feature in ("tenure", "Contract", drift.PROBABILITY):
+        assert drifted[feature]["psi"] > 0.25
+    assert drifted["tenure"]["ks"] > 0.2
+    assert "ks" not in drifted["Contract"]
+    assert drifted["MonthlyCharges"]["psi"] < 0.1
+
+
+def test_old_buckets_leave_the_window():
+    predictor = deployed()
+    monitor = drift.DriftMonitor(window_seconds=60, buckets=6, min_rows=1)
+    monitor.observe(make_customers(10), np.full(10, 0.5), predictor, now=0)
+    width = monitor._counts.shape
+
+    monitor.observe(make_customers(5), np.full(5, 0.5), predictor, now=55)
+    assert monitor.window(now=55)[1] == 15
+    monitor.observe(make_customers(5), np.full(5, 0.5), predictor, now=65)
+    assert monitor.window(now=65)[1] == 10
+    assert monitor.window(now=200)[1] == 0
+    assert monitor.scores(now=200) == {}
+    assert monitor._counts.shape == width
+
+
+def test_gauges_follow_the_window_and_reset_with_a_new_model():
+    monitor = drift.DriftMonitor(min_rows=50)
+    customers = make_customers(100, seed=5)
+
+    monitor.observe(customers[:40], np.full(40, 0.2), deployed(), now=0)
+    monitor.refresh(now=0)
+    assert drift.drift_window_rows._value.get() == 40
+    assert not drift.drift_psi._metrics
+
+    monitor.observe(customers[40:], np.full(60, 0.2), deployed(), now=0)
+    monitor.refresh(now=0)
+    tenure = drift.drift_psi.labels(feature="tenure")._value.get()
+    assert tenure == monitor.scores(now=0)["tenure"]["psi"]
+
+    # Another model version starts an empty window against its own profile
+    monitor.observe(customers[:10], np.full(10, 0.2), deployed("v2", seed=7), now=0)
+    assert monitor.model_version == "v2"
+    assert monitor.window(now=0)[1] == 10
+    assert not drift.drift_psi._metrics
+
+
+def test_legacy_model_uses_the_profile_file_if_there_is_one(tmp_path):
+    legacy = SimpleNamespace(model_version="legacy", metadata={})
+    profile_path = tmp_path / "drift_profile.json"
+
+    monitor = drift.DriftMonitor(min_rows=1, profile_path=profile_path)
+    monitor.observe(make_customers(5), np.full(5, 0.5), legacy, now=0)
+    assert not monitor.active
+    assert monitor.scores(now=0) == {}
+
+    profile_path.write_text(json.dumps(deployed().metadata["drift_profile"]))
+    monitor = drift.DriftMonitor(min_rows=1, profile_path=profile_path)
+    monitor.observe(make_customers(5), np.full(5, 0.5), legacy, now=0)
+    assert drift.PROBABILITY in monitor.scores(now=0)
+
+
+def test_submitted_requests_reach_the_window_on_update():
+    predictor = deployed()
+    monitor = drift.DriftMonitor(min_rows=1, max_queue=15)
+
+    assert monitor.submit(make_customers(10), np.full(10, 0.5), predictor)
+    assert not monitor.submit(make_customers(10), np.full(10, 0.5), predictor)
+    assert monitor.submit(make_customers(5), np.full(5, 0.5), predictor)
+    assert monitor.window()[1] == 0
+
+    queued = monitor.take()
+    monitor.update(queued)
+    assert monitor.window()[1] == 15
+    assert drift.drift_window_rows._value.get() == 15
+    assert monitor.submit(make_customers(10), np.full(10, 0.5), predictor)
+
+
+def test_unknown_categories_fall_in_the_extra_bin():
+    monitor = drift.DriftMonitor(min_rows=1)
+    customers = make_customers(4)
+    customers[0]["Contract"] = "Ten year"
+
+    monitor.observe(customers, np.full(4, 0.5), deployed(), now=0)
+    (contract,) = [s for s in monitor.sketches if s.name == "Contract"]
+    counts = monitor.window(now=0)[0][contract.span]
+    assert counts[-1] == 1
+    assert counts.sum() == 4
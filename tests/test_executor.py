@@ -0,0 +1,86 @@
+# tests/test_executor.py
+
+import asyncio
+import threading
+
+import pytest
+
+from app.executor import InferenceExecutor, InferenceQueueFull, pool_queued
+
+
+def test_runs_off_the_event_loop():
+    executor = InferenceExecutor(max_workers=2, max_queue=4)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        return loop_thread, worker_thread
+
+    try:
+        loop_thread, worker_thread = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert loop_thread != worker_thread
+
+
+def test_rejects_when_saturated():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.create_task(executor.run(release.wait))
+        waiting = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert pool_queued._value.get() == 1
+
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(release.wait)
+
+        release.set()
+        await asyncio.gather(running, waiting)
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert pool_queued._value.get() == 0
+
+
+def test_event_loop_stays_responsive():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        blocked = asyncio.create_task(executor.run(release.wait))
+        # The loop can still serve other work while inference is blocked
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        release.set()
+        await blocked
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_predict_batch_uses_global_predictor(loaded_predictor):
+    from tests.conftest import make_customers
+
+    executor = InferenceExecutor(max_workers=2)
+    customers = make_customers(10, seed=20)
+    try:
+        results = asyncio.run(executor.predict_batch(customers))
+    finally:
+        executor.shutdown()
+
+    assert results == loaded_predictor.predict_batch(customers)
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind="fiber")
@@ -0,0 +1,145 @@
+# tests/test_features.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.features import FeatureEncoder
+from tests.conftest import make_customers
+
+
+def reference_preprocess(customer_data, feature_names):
+    """The original pandas preprocessing path the encoder must reproduce"""
+    df = pd.DataFrame([customer_data])
+    binary_mappings = {
+        "gender": {"Male": 1, "Female": 0},
+        "Partner": {"Yes": 1, "No": 0},
+        "Dependents": {"Yes": 1, "No": 0},
+        "PhoneService": {"Yes": 1, "No": 0},
+        "PaperlessBilling": {"Yes": 1, "No": 0},
+    }
+    for col, mapping in binary_mappings.items():
+        if col in df.columns:
+            df[col] = df[col].map(mapping)
+    categorical_cols = [
+        "MultipleLines",
+        "InternetService",
+        "OnlineSecurity",
+        "OnlineBackup",
+        "DeviceProtection",
+        "TechSupport",
+        "StreamingTV",
+        "StreamingMovies",
+        "Contract",
+        "PaymentMethod",
+    ]
+    df_encoded = pd.get_dummies(df, columns=categorical_cols)
+    df_encoded["tenure_MonthlyCharges"] = (
+        df_encoded["tenure"] * df_encoded["MonthlyCharges"]
+    )
+    df_encoded["TotalCharges_per_Month"] = df_encoded["TotalCharges"] / (
+        df_encoded["tenure"] + 1
+    )
+    for feature in feature_names:
+        if feature not in df_encoded.columns:
+            df_encoded[feature] = 0
+    return df_encoded[feature_names].to_numpy(dtype=np.float64)
+
+
+@pytest.fixture
+def feature_names(training_data):
+    X, _ = training_data
+    return X.columns.tolist()
+
+
+def test_encode_matches_reference(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    for customer in make_customers(200, seed=1):
+        expected = reference_preprocess(customer, feature_names)
+        np.testing.assert_array_equal(encoder.encode(customer), expected)
+
+
+def test_encode_batch_matches_reference(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    customers = make_customers(50, seed=2)
+    expected = np.vstack([reference_preprocess(c, feature_names) for c in customers])
+    np.testing.assert_array_equal(encoder.encode_batch(customers), expected)
+
+
+def test_encode_batch_reuses_buffer(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    out = np.full((3, encoder.n_features), 7.0)
+    customers = make_customers(3, seed=3)
+    result = encoder.encode_batch(customers, out=out)
+    assert result is out
+    expected = np.vstack([reference_preprocess(c, feature_names) for c in customers])
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_unseen_category_is_all_zero(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    customer = make_customers(1, seed=4)[0]
+    customer["InternetService"] = "Satellite"
+    expected = reference_preprocess(customer, feature_names)
+    np.testing.assert_array_equal(encoder.encode(customer), expected)
+    slots = encoder.onehot_slots["InternetService"].values()
+    assert not encoder.encode(customer)[0, list(slots)].any()
+
+
+def test_unmapped_binary_value_is_nan(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    customer = make_customers(1, seed=5)[0]
+    customer["Partner"] = "Maybe"
+    expected = reference_preprocess(customer, feature_names)
+    np.testing.assert_array_equal(encoder.encode(customer), expected)
+
+
+def test_unknown_features_are_backfilled(feature_names):
+    names = feature_names + ["not_a_column", "Contract"]
+    encoder = FeatureEncoder(names)
+    customer = make_customers(1, seed=6)[0]
+    np.testing.assert_array_equal(
+        encoder.encode(customer), reference_preprocess(customer, names)
+    )
+
+
+def test_missing_categorical_column_raises(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    customer = make_customers(1, seed=7)[0]
+    del customer["Contract"]
+    with pytest.raises(KeyError):
+        encoder.encode(customer)
+
+
+def test_categories_from_feature_names(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    assert sorted(encoder.categories["Contract"]) == [
+        "Month-to-month",
+        "One year",
+        "Two year",
+    ]
+
+
+def test_predict_matches_pandas_pipeline(fitted_predictor):
+    for customer in make_customers(20, seed=8):
+        X_ref = pd.DataFrame(
+            reference_preprocess(customer, fitted_predictor.feature_names),
+            columns=fitted_predictor.feature_names,
+        )
+        expected = fitted_predictor.model.predict_proba(
+            fitted_predictor.scaler.transform(X_ref)
+        )[0, 1]
+        probability, _, _, _ = fitted_predictor.predict(customer)
+        assert probability == expected
+
+
+def test_encode_columns_matches_encode_batch(feature_names):
+    encoder = FeatureEncoder(feature_names)
+    customers = make_customers(100, seed=9)
+    customers[5]["Partner"] = "Maybe"
+    customers[6]["InternetService"] = "Satellite"
+    df = pd.DataFrame(customers)
+
+    np.testing.assert_array_equal(
+        encoder.encode_columns(df, len(df)), encoder.encode_batch(customers)
+    )
@@ -0,0 +1,71 @@
+# tests/test_fusion.py
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.svm import SVC
+
+from app import config
+from app.fusion import fold_scaler, fuse_scaler
+from app.model import ChurnPredictor
+from tests.conftest import make_customers
+
+
+def fit_estimator(fitted_predictor, training_data, estimator):
+    X, y = training_data
+    return estimator.fit(fitted_predictor.scaler.transform(X), y)
+
+
+@pytest.mark.parametrize(
+    "estimator",
+    [
+        None,
+        RandomForestClassifier(n_estimators=20, random_state=42),
+        GradientBoostingClassifier(n_estimators=20, random_state=42),
+    ],
+    ids=["logistic_regression", "random_forest", "gradient_boosting"],
+)
+def test_fused_model_matches_pipeline(fitted_predictor, training_data, estimator):
+    if estimator is not None:
+        fitted_predictor.model = fit_estimator(
+            fitted_predictor, training_data, estimator
+        )
+    X, errors = fitted_predictor.preprocess_batch(make_customers(500, seed=20))
+    assert not errors
+
+    expected, expected_labels = fitted_predictor.score(X.copy())
+    fitted_predictor.fused_model = fold_scaler(
+        fitted_predictor.model, fitted_predictor.scaler
+    )
+    assert fitted_predictor.inference_mode == "fused"
+    actual, labels = fitted_predictor.score(X)
+
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(labels, expected_labels)
+
+
+def test_fold_leaves_original_model_untouched(fitted_predictor):
+    coef = fitted_predictor.model.coef_.copy()
+    fold_scaler(fitted_predictor.model, fitted_predictor.scaler)
+    np.testing.assert_array_equal(fitted_predictor.model.coef_, coef)
+
+
+def test_unsupported_model_is_not_fused(fitted_predictor, training_data):
+    model = fit_estimator(fitted_predictor, training_data, SVC(probability=True))
+    assert fuse_scaler(model, fitted_predictor.scaler, 1e-9) is None
+
+
+def test_fusion_falls_back_outside_tolerance(fitted_predictor):
+    assert fuse_scaler(fitted_predictor.model, fitted_predictor.scaler, -1.0) is None
+
+
+def test_load_model_fuses_when_enabled(model_dir, monkeypatch):
+    monkeypatch.setattr(config, "FUSED_SCALER", True)
+    predictor = ChurnPredictor()
+    predictor.model_path = model_dir
+    assert predictor.load_model()
+    assert predictor.inference_mode == "fused"
+
+    monkeypatch.setattr(config, "FUSED_SCALER", False)
+    assert predictor.load_model()
+    assert predictor.inference_mode == "standard"
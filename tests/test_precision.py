@@ -0,0 +1,92 @@
+# tests/test_precision.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app import config
+from app.model import ChurnPredictor
+from app.precision import main
+from tests.conftest import make_customers, save_artifacts
+
+
+@pytest.fixture
+def float32_predictor(model_dir, monkeypatch):
+    monkeypatch.setattr(config, "INFERENCE_PRECISION", "float32")
+    predictor = ChurnPredictor()
+    predictor.model_path = model_dir
+    assert predictor.load_model()
+    return predictor
+
+
+def test_float32_mode_casts_model_and_features(float32_predictor):
+    assert float32_predictor.precision == "float32"
+    assert float32_predictor.model.coef_.dtype == np.float32
+    assert float32_predictor.scaler.mean_.dtype == np.float32
+
+    X, errors = float32_predictor.preprocess_batch(make_customers(10, seed=40))
+    assert X.dtype == np.float32
+    assert not errors
+
+
+def test_float32_predictions_stay_close(float32_predictor, fitted_predictor):
+    customers = make_customers(200, seed=41)
+    expected = fitted_predictor.predict_batch(customers)
+    actual = float32_predictor.predict_batch(customers)
+
+    for result, reference in zip(actual, expected):
+        assert result["churn_probability"] == pytest.approx(
+            reference["churn_probability"], abs=1e-5
+        )
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_accuracy_report_on_reference_csv(
+    fitted_predictor, training_data, tmp_path, monkeypatch, fused
+):
+    X, y = training_data
+    fitted_predictor.model = RandomForestClassifier(
+        n_estimators=20, random_state=42
+    ).fit(fitted_predictor.scaler.transform(X), y)
+    save_artifacts(fitted_predictor, tmp_path)
+
+    reference = tmp_path / "reference.csv"
+    customers = make_customers(300, seed=42)
+    customers[5]["tenure"] = "junk"
+    pd.DataFrame(customers).to_csv(reference, index=False)
+
+    monkeypatch.setattr(config, "FUSED_SCALER", fused)
+    monkeypatch.setattr(config, "INFERENCE_PRECISION", "float32")
+    monkeypatch.setattr(config, "PRECISION_REFERENCE_DATA", str(reference))
+    predictor = ChurnPredictor()
+    predictor.model_path = tmp_path
+    assert predictor.load_model()
+
+    report = predictor.precision_report
+    assert report["precision"] == "float32"
+    assert report["rows"] == 299
+    assert 0 <= report["risk_level_flips"] <= report["rows"]
+    if fused:
+        # Fused splits already sit on float32 boundaries of the raw features
+        assert report["max_probability_delta"] == 0.0
+        assert report["risk_level_flips"] == 0
+
+
+def test_default_precision_has_no_report(model_dir):
+    predictor = ChurnPredictor()
+    predictor.model_path = model_dir
+    assert predictor.load_model()
+    assert predictor.precision == "float64"
+    assert predictor.precision_report is None
+
+
+def test_apply_precision_rejects_unknown(fitted_predictor):
+    with pytest.raises(ValueError):
+        fitted_predictor.apply_precision("float16")
+
+
+def test_cli_prints_report(model_dir, monkeypatch, capsys):
+    monkeypatch.setattr(config, "INFERENCE_PRECISION", "float32")
+    main(["--model-dir", str(model_dir)])
+    assert '"risk_level_flips"' in capsys.readouterr().out
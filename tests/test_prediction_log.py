@@ -0,0 +1,196 @@
+# tests/test_prediction_log.py
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.prediction_log import PredictionLog, log_records
+from tests.conftest import make_customers
+
+
+def scored_columns(n, unscored=()):
+    probabilities = np.linspace(0.1, 0.9, n)
+    probabilities[list(unscored)] = np.nan
+    return {
+        "churn_probability": probabilities,
+        "churn_prediction": np.where(probabilities > 0.5, "Yes", "No"),
+        "confidence": np.abs(probabilities - 0.5) * 2,
+        "risk_level": np.full(n, "Medium", dtype=object),
+    }
+
+
+def read_ndjson(directory):
+    records = []
+    for path in sorted(directory.glob("*.ndjson")):
+        records += [json.loads(line) for line in path.read_text().splitlines()]
+    return records
+
+
+def dropped():
+    return log_records.labels(result="dropped")._value.get()
+
+
+def test_ndjson_log_is_in_the_replay_format(tmp_path):
+    log = PredictionLog(tmp_path, batch_size=1000, flush_interval=60)
+    customers = make_customers(4, seed=40)
+
+    async def run():
+        await log.submit("/predict", customers[:1], scored_columns(1), "v1")
+        await log.submit("/batch_predict", customers, scored_columns(4, [2]), "v1")
+        # Nothing is written until the batch fills, the interval ends or stop()
+        assert not list(tmp_path.iterdir())
+        await log.stop()
+
+    asyncio.run(run())
+
+    assert not list(tmp_path.glob("*.inprogress"))
+    single, batch = read_ndjson(tmp_path)
+    assert single["endpoint"] == "/predict"
+    assert single["request"] == customers[0]
+    assert single["response"]["churn_probability"] == pytest.approx(0.1)
+    assert single["response"]["model_version"] == "v1"
+    assert batch["endpoint"] == "/batch_predict"
+    assert batch["request"] == {"customers": customers}
+    ids = [p["customer_id"] for p in batch["response"]["predictions"]]
+    assert ids == ["CUST_0001", "CUST_0002", "CUST_0004"]
+
+
+def test_full_batch_is_written_without_waiting(tmp_path):
+    log = PredictionLog(tmp_path, batch_size=3, flush_interval=60)
+    customers = make_customers(3, seed=41)
+
+    async def run():
+        await log.submit("/batch_predict", customers, scored_columns(3), "v1")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            written = list(tmp_path.glob("*.ndjson.inprogress"))
+            if written:
+                break
+        await log.stop()
+        return written
+
+    assert len(asyncio.run(run())) == 1
+
+
+def test_drop_new_keeps_the_queue_bounded(tmp_path):
+    log = PredictionLog(tmp_path, max_queue=5, flush_interval=60)
+    customers = make_customers(3, seed=42)
+    before = dropped()
+
+    async def run():
+        accepted = [
+            await log.submit("/batch_predict", customers, scored_columns(3), "v1")
+            for _ in range(3)
+        ]
+        await log.stop()
+        return accepted
+
+    assert asyncio.run(run()) == [True, False, False]
+    assert dropped() - before == 6
+    assert len(read_ndjson(tmp_path)) == 1
+
+
+def test_drop_oldest_keeps_the_newest(tmp_path):
+    log = PredictionLog(
+        tmp_path, max_queue=5, flush_interval=60, overflow="drop_oldest"
+    )
+    customers = make_customers(3, seed=43)
+
+    async def run():
+        for version in ("v1", "v2", "v3"):
+            await log.submit("/batch_predict", customers, scored_columns(3), version)
+        await log.stop()
+
+    asyncio.run(run())
+
+    assert [r["response"]["model_version"] for r in read_ndjson(tmp_path)] == ["v3"]
+
+
+def test_block_waits_for_room_then_drops(tmp_path):
+    log = PredictionLog(
+        tmp_path, max_queue=3, flush_interval=60, overflow="block", block_timeout_ms=20
+    )
+    customers = make_customers(3, seed=44)
+    before = dropped()
+
+    async def run():
+        await log.submit("/batch_predict", customers, scored_columns(3), "v1")
+        # No flush happens within the timeout, so this one is dropped
+        blocked = await log.submit("/batch_predict", customers, scored_columns(3), "v2")
+        # A flush while waiting makes room
+        waiting = asyncio.ensure_future(
+            log.submit("/batch_predict", customers, scored_columns(3), "v3")
+        )
+        await asyncio.sleep(0)
+        await log.flush()
+        unblocked = await waiting
+        await log.stop()
+        return blocked, unblocked
+
+    assert asyncio.run(run()) == (False, True)
+    assert dropped() - before == 3
+    versions = [r["response"]["model_version"] for r in read_ndjson(tmp_path)]
+    assert versions == ["v1", "v3"]
+
+
+def test_files_rotate_by_size(tmp_path):
+    log = PredictionLog(tmp_path, batch_size=1, flush_interval=60, rotate_bytes=1)
+    customers = make_customers(3, seed=45)
+
+    async def run():
+        for customer in customers:
+            await log.submit("/predict", [customer], scored_columns(1), "v1")
+            await log.flush()
+        await log.stop()
+
+    asyncio.run(run())
+
+    assert len(list(tmp_path.glob("*.ndjson"))) == 3
+    assert len(read_ndjson(tmp_path)) == 3
+
+
+def test_parquet_log_has_one_row_per_prediction(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    log = PredictionLog(tmp_path, fmt="parquet", flush_interval=60)
+    customers = make_customers(4, seed=46)
+
+    async def run():
+        await log.submit("/batch_predict", customers, scored_columns(4, [1]), "v1")
+        await log.stop()
+
+    asyncio.run(run())
+
+    (path,) = tmp_path.glob("*.parquet")
+    table = pq.read_table(path)
+    assert table.num_rows == 3
+    assert table.column("tenure").to_pylist() == [
+        customers[i]["tenure"] for i in (0, 2, 3)
+    ]
+    assert table.column("model_version").to_pylist() == ["v1"] * 3
+
+
+def test_api_logs_predictions(loaded_predictor, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import main
+
+    log = PredictionLog(tmp_path, flush_interval=60)
+    monkeypatch.setattr(main, "prediction_log", log)
+    customers = make_customers(3, seed=47)
+
+    with TestClient(main.app) as client:
+        client.post("/predict", json=customers[0])
+        client.post("/batch_predict", json={"customers": customers})
+        body = "".join(json.dumps(c) + "\n" for c in customers)
+        client.post("/batch_predict/stream", content=body)
+
+    # Shutdown writes what is queued
+    records = read_ndjson(tmp_path)
+    assert [r["source"] for r in records] == [
+        "/predict",
+        "/batch_predict",
+        "/batch_predict/stream",
+    ]
+    assert records[2]["request"] == {"customers": customers}
@@ -0,0 +1,151 @@
+# tests/test_reload.py
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+from app import config
+from app import model as model_module
+from app.main import app
+from app.model import ChurnPredictor
+from app.reload import ModelLoadError, ModelReloader
+from tests.conftest import make_customers, save_artifacts
+
+client = TestClient(app)
+ADMIN_HEADERS = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def active_predictor(model_dir, monkeypatch):
+    """Global predictor loaded from the temporary model directory"""
+    predictor = ChurnPredictor()
+    predictor.model_path = model_dir
+    assert predictor.load_model()
+    monkeypatch.setattr(model_module, "predictor", predictor)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    return predictor
+
+
+def retrain(predictor, training_data, model_dir):
+    """Overwrite the artifacts in model_dir with a different model"""
+    X, y = training_data
+    new = ChurnPredictor()
+    new.scaler = predictor.scaler
+    new.feature_names = predictor.feature_names
+    new.model = RandomForestClassifier(n_estimators=5, random_state=0).fit(
+        predictor.scaler.transform(X), y
+    )
+    save_artifacts(new, model_dir)
+
+
+def test_reload_swaps_model(active_predictor, training_data, model_dir):
+    old_version = active_predictor.model_version
+    customer = make_customers(1, seed=50)[0]
+    assert client.post("/predict", json=customer).json()["model_version"] == old_version
+
+    retrain(active_predictor, training_data, model_dir)
+    response = client.post("/admin/reload", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["previous_version"] == old_version
+    assert body["model_version"] != old_version
+    assert model_module.get_predictor() is not active_predictor
+    assert client.get("/model/info").json()["model_version"] == body["model_version"]
+    assert client.get("/model/info").json()["model_type"] == "RandomForestClassifier"
+    assert (
+        client.post("/predict", json=customer).json()["model_version"]
+        == body["model_version"]
+    )
+
+
+def test_failed_reload_keeps_current_model(active_predictor, model_dir):
+    (model_dir / "scaler.pkl").unlink()
+
+    response = client.post("/admin/reload", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 500
+    assert model_module.get_predictor() is active_predictor
+
+
+def test_in_flight_request_keeps_old_model(active_predictor, training_data, model_dir):
+    snapshot = model_module.get_predictor()
+    retrain(active_predictor, training_data, model_dir)
+    client.post("/admin/reload", headers=ADMIN_HEADERS)
+
+    # A request holding the old reference still scores on the old model
+    assert snapshot.model is active_predictor.model
+    assert type(model_module.get_predictor().model) is RandomForestClassifier
+
+
+def test_admin_token(active_predictor, monkeypatch):
+    assert client.post("/admin/reload").status_code == 403
+    wrong = {"X-Admin-Token": "guess"}
+    assert client.post("/admin/reload", headers=wrong).status_code == 403
+    response = client.post("/admin/reload", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+
+    # Without a configured token nobody can reload the model
+    monkeypatch.setattr(config, "ADMIN_TOKEN", None)
+    assert client.post("/admin/reload", headers=ADMIN_HEADERS).status_code == 403
+
+
+def test_watcher_reloads_changed_files(active_predictor, training_data, model_dir):
+    from app.executor import InferenceExecutor
+
+    reloader = ModelReloader(InferenceExecutor())
+
+    async def run():
+        watcher = asyncio.create_task(reloader.watch(interval=0.02))
+        await asyncio.sleep(0.05)
+        retrain(active_predictor, training_data, model_dir)
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if model_module.get_predictor() is not active_predictor:
+                break
+        watcher.cancel()
+
+    asyncio.run(run())
+
+    assert type(model_module.get_predictor().model) is RandomForestClassifier
+
+
+def test_reload_error_type(active_predictor, model_dir):
+    from app.executor import InferenceExecutor
+
+    (model_dir / "churn_model.pkl").unlink()
+    with pytest.raises(ModelLoadError):
+        asyncio.run(ModelReloader(InferenceExecutor()).reload())
+
+
+def test_process_worker_on_a_newer_model_is_not_cached(
+    active_predictor, fitted_predictor, monkeypatch
+):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app import executor, main
+    from app.cache import PredictionCache
+
+    # A worker restarted by a reload has already loaded the next model
+    worker = ChurnPredictor()
+    for attr in ("model", "scaler", "feature_names", "encoder", "validator"):
+        setattr(worker, attr, getattr(fitted_predictor, attr))
+    worker.model_version = "newer"
+    process_executor = executor.InferenceExecutor(kind="process", max_workers=1)
+    process_executor._pool = ThreadPoolExecutor(max_workers=1)
+    cache = PredictionCache()
+    monkeypatch.setattr(executor, "get_predictor", lambda: worker)
+    monkeypatch.setattr(main, "inference_executor", process_executor)
+    monkeypatch.setattr(main, "micro_batcher", None)
+    monkeypatch.setattr(main, "prediction_cache", cache)
+
+    customer = make_customers(1, seed=52)[0]
+    try:
+        result = asyncio.run(main.predict_one(customer, active_predictor))
+    finally:
+        process_executor.shutdown()
+
+    assert result[-1] == "newer"
+    assert len(cache) == 0
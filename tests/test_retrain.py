@@ -0,0 +1,143 @@
+# tests/test_retrain.py
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app import retrain, train
+from app.bundle import load_bundle
+from tests.test_train import write_training_csv
+
+
+@pytest.fixture
+def deployed_dir(tmp_path):
+    """A model directory holding a bundle trained by the training pipeline"""
+    write_training_csv(tmp_path / "history.csv", n=600, seed=1)
+    train.train(
+        tmp_path / "history.csv",
+        tmp_path / "model" / "churn_bundle.joblib",
+        candidates=["RandomForestClassifier"],
+        split=train.Split(cv_folds=0),
+    )
+    return tmp_path / "model"
+
+
+def write_new_rows(path, n=300, seed=2):
+    df = write_training_csv(path, n=n, seed=seed)
+    df["labelled_at"] = pd.date_range("2026-01-01", periods=n, freq="h").astype(str)
+    df.to_csv(path, index=False)
+
+
+def test_rescaled_model_predicts_the_same(fitted_predictor, training_data):
+    X = training_data[0].to_numpy(float)
+    scaler, model = fitted_predictor.scaler, fitted_predictor.model
+
+    updated = copy.deepcopy(scaler).partial_fit(X[:100] * 1.5 + 3)
+    rescaled = retrain.rescale_model(model, scaler, updated)
+
+    np.testing.assert_allclose(
+        rescaled.predict_proba(updated.transform(X)),
+        model.predict_proba(scaler.transform(X)),
+        atol=1e-12,
+    )
+
+
+def test_linear_model_updates_the_scaler(fitted_predictor, training_data):
+    X = training_data[0].to_numpy(float)
+    scaler = fitted_predictor.scaler
+
+    model, updated = retrain.update_scaler(fitted_predictor.model, scaler, X[:50])
+    assert updated.n_samples_seen_ == scaler.n_samples_seen_ + 50
+
+    forest = RandomForestClassifier(n_estimators=5).fit(scaler.transform(X), X[:, 0])
+    assert retrain.update_scaler(forest, scaler, X[:50]) == (forest, scaler)
+
+
+def test_retrain_grows_the_deployed_model(deployed_dir, tmp_path):
+    write_new_rows(tmp_path / "new.csv")
+    before = load_bundle(deployed_dir / "churn_bundle.joblib")
+
+    results = retrain.retrain(
+        tmp_path / "new.csv",
+        deployed_dir,
+        history=tmp_path / "history.csv",
+        new_trees=5,
+        max_auc_drop=1.0,
+    )
+
+    after = load_bundle(deployed_dir / "churn_bundle.joblib")
+    assert results["passed"]
+    assert results["reference"] == "full_refit"
+    assert results["rows"] == 240
+    assert len(after["model"].estimators_) == len(before["model"].estimators_) + 5
+    assert after["metadata"]["base_model_version"] == before["checksum"][:12]
+    assert after["model"].warm_start is False
+
+
+def test_failing_gate_writes_nothing(deployed_dir, tmp_path):
+    write_new_rows(tmp_path / "new.csv")
+    bundle_file = deployed_dir / "churn_bundle.joblib"
+    checksum = load_bundle(bundle_file)["checksum"]
+
+    # A negative allowance demands a better AUC than the deployed model's
+    results = retrain.retrain(tmp_path / "new.csv", deployed_dir, max_auc_drop=-1.0)
+
+    assert not results["passed"]
+    assert results["reference"] == "deployed"
+    assert load_bundle(bundle_file)["checksum"] == checksum
+
+
+def test_rows_already_trained_on_are_skipped(deployed_dir, tmp_path):
+    write_new_rows(tmp_path / "new.csv")
+    kwargs = {"timestamp_column": "labelled_at", "max_auc_drop": 1.0}
+
+    retrain.retrain(tmp_path / "new.csv", deployed_dir, **kwargs)
+    metadata = load_bundle(deployed_dir / "churn_bundle.joblib")["metadata"]
+
+    assert metadata["trained_through"] == "2026-01-13T11:00:00+00:00"
+    with pytest.raises(ValueError, match="No new labelled rows"):
+        retrain.retrain(tmp_path / "new.csv", deployed_dir, **kwargs)
+
+
+def test_full_refit_counts_repeated_rows_once(deployed_dir, tmp_path):
+    deployed = retrain.load_deployed(deployed_dir)
+    encoder = retrain.FeatureEncoder(deployed.feature_names)
+    X_history, y_history, _ = retrain.read_labelled(tmp_path / "history.csv", encoder)
+
+    # The new batch repeats 100 history rows and relabels them
+    _, scaler = retrain.full_refit(
+        deployed,
+        tmp_path / "history.csv",
+        X_history[:100],
+        1 - y_history[:100],
+        X_holdout=X_history[100:150],
+    )
+
+    assert scaler.n_samples_seen_ == len(X_history) - 50
+
+
+def test_retrain_over_the_latency_budget_writes_nothing(deployed_dir, tmp_path):
+    write_new_rows(tmp_path / "new.csv")
+    bundle_file = deployed_dir / "churn_bundle.joblib"
+    checksum = load_bundle(bundle_file)["checksum"]
+
+    results = retrain.retrain(
+        tmp_path / "new.csv",
+        deployed_dir,
+        max_auc_drop=1.0,
+        selection=train.Selection(latency_budget_ms=1e-6),
+    )
+
+    assert not results["passed"]
+    assert results["over_budget"][0].startswith("single_row_p99_ms")
+    assert load_bundle(bundle_file)["checksum"] == checksum
+    with pytest.raises(SystemExit) as exit_info:
+        retrain.main(
+            [str(tmp_path / "new.csv"), "--model-dir", str(deployed_dir)]
+            + ["--max-auc-drop", "1.0", "--batch-latency-budget-ms", "1e-6"]
+        )
+    assert exit_info.value.code == 1
+    assert load_bundle(bundle_file)["checksum"] == checksum
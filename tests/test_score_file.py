@@ -0,0 +1,79 @@
+# tests/test_score_file.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.score_file import main, score_file
+from tests.conftest import make_customers
+
+
+@pytest.fixture
+def customers_csv(tmp_path):
+    df = pd.DataFrame(make_customers(250, seed=40))
+    df.insert(0, "customerID", [f"ID_{i}" for i in range(len(df))])
+    df["TotalCharges"] = df["TotalCharges"].astype(object)
+    df.loc[7, "TotalCharges"] = " "  # blank charges, as in the Telco export
+    path = tmp_path / "customers.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_file_matches_predict_batch(
+    tmp_path, model_dir, customers_csv, fitted_predictor, workers
+):
+    input_path, df = customers_csv
+    output_path = tmp_path / "predictions.csv"
+
+    stats = score_file(
+        input_path,
+        output_path,
+        chunk_size=40,
+        workers=workers,
+        model_dir=str(model_dir),
+        id_column="customerID",
+    )
+
+    output = pd.read_csv(output_path)
+    assert stats["rows"] == len(df) == len(output)
+    assert stats["errors"] == 1
+    assert output["customerID"].tolist() == df["customerID"].tolist()
+    assert output.loc[7, "error"] == "TotalCharges: Field required"
+
+    expected = fitted_predictor.predict_batch(
+        [c for i, c in enumerate(make_customers(250, seed=40)) if i != 7]
+    )
+    scored = output.drop(index=7)
+    np.testing.assert_allclose(
+        scored["churn_probability"], [r["churn_probability"] for r in expected]
+    )
+    assert scored["risk_level"].tolist() == [r["risk_level"] for r in expected]
+
+
+def test_cli(tmp_path, model_dir, customers_csv, capsys):
+    input_path, _ = customers_csv
+    output_path = tmp_path / "out.csv"
+
+    main([str(input_path), str(output_path), "--model-dir", str(model_dir)])
+
+    assert "Scored 250 rows (1 errors" in capsys.readouterr().out
+    assert output_path.exists()
+
+
+def test_rows_the_api_would_reject_are_not_scored(tmp_path, model_dir):
+    df = pd.DataFrame(make_customers(5, seed=41))
+    df.loc[1, "InternetService"] = "Cable"
+    df.loc[3, "Contract"] = None
+    df.to_csv(tmp_path / "customers.csv", index=False)
+
+    stats = score_file(
+        tmp_path / "customers.csv", tmp_path / "out.csv", model_dir=str(model_dir)
+    )
+
+    output = pd.read_csv(tmp_path / "out.csv")
+    assert stats["errors"] == 2
+    assert output.loc[1, "error"].startswith("InternetService: Input should be")
+    assert output.loc[3, "error"] == "Contract: Input should be a valid string"
+    assert output.loc[[1, 3], "churn_probability"].isna().all()
+    assert output.loc[[0, 2, 4], "error"].isna().all()
@@ -0,0 +1,173 @@
+# tests/test_scripts.py
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+from scripts.load_test import LatencyHistogram, Recorder, Schedule, open_loop
+from scripts.replay import DriftReport, Replayer
+
+
+@pytest.mark.parametrize("significant_figures", [2, 3])
+def test_histogram_percentiles_match_numpy(significant_figures):
+    rng = np.random.default_rng(0)
+    seconds = rng.lognormal(mean=-5, sigma=1.5, size=12345)
+    histogram = LatencyHistogram(significant_figures)
+    for value in seconds:
+        histogram.record(value)
+
+    # The histogram records whole microseconds and reports the top of a bucket
+    micros = (seconds * 1e6).astype(np.int64)
+    precision = 10**-significant_figures
+    for percentile in (1, 50, 90, 99, 99.9, 99.99, 100):
+        exact = np.percentile(micros, percentile, method="inverted_cdf") / 1e6
+        reported = histogram.percentile(percentile)
+        assert exact <= reported <= exact * (1 + precision) + 1e-6
+
+
+def test_distribution_is_denser_towards_the_tail():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value / 1000)
+
+    rows = histogram.distribution(ticks_per_half=2)
+    percentiles = [percentile for percentile, _ in rows]
+    assert percentiles[:4] == [0, 25, 50, 62.5]
+    assert percentiles == sorted(percentiles)
+    assert [seconds for _, seconds in rows] == sorted(seconds for _, seconds in rows)
+    # Ticks stop once a percentile would need more values than were recorded
+    assert 100 - percentiles[-2] >= 100 / 1000
+    assert rows[-1] == (100.0, 1.0)
+    assert LatencyHistogram().distribution() == [(100.0, 0.0)]
+
+
+class OneBody:
+    def next(self):
+        return "predict", b"{}"
+
+
+def test_open_loop_drops_requests_over_max_in_flight():
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return httpx.Response(200, json={})
+
+    async def run():
+        recorder = Recorder(1)
+        client = httpx.AsyncClient(
+            base_url="http://api", transport=httpx.MockTransport(slow)
+        )
+        # 10 requests due within 10ms while the first is still outstanding
+        schedule = Schedule([(0.01, 1000)], start_rate=1000)
+        asyncio.get_running_loop().call_later(0.1, release.set)
+        async with client:
+            await open_loop(client, OneBody(), schedule, recorder, max_in_flight=2)
+        return recorder
+
+    recorder = asyncio.run(run())
+    assert recorder.total.ok == 2
+    assert recorder.dropped == 8
+    assert recorder.endpoints["predict"].response.percentile(50) >= 0.05
+
+
+def prediction(probability, version="v1"):
+    return {
+        "churn_probability": probability,
+        "churn_prediction": probability >= 0.5,
+        "risk_level": "High" if probability >= 0.7 else "Low",
+        "model_version": version,
+    }
+
+
+def test_drift_report_compares_predict_and_batch_bodies():
+    report = DriftReport()
+    report.compare(prediction(0.6), prediction(0.4, "v2"))
+    report.compare(
+        {"predictions": [prediction(0.1), prediction(0.8), prediction(0.3)]},
+        {"predictions": [prediction(0.1, "v2"), prediction(0.75, "v2")]},
+    )
+    # A prediction without a probability cannot be compared
+    report.compare({"predictions": [{"error": "bad row"}]}, {"predictions": [{}]})
+
+    summary = report.summary()
+    assert summary["compared"] == 3
+    assert summary["missing"] == 2
+    assert summary["max_probability_delta"] == pytest.approx(0.2)
+    assert summary["mean_probability_delta"] == pytest.approx(0.25 / 3)
+    assert summary["prediction_flips"] == 1
+    assert summary["risk_level_flips"] == 0
+    assert summary["model_versions"] == [
+        {"recorded": "v1", "replayed": "v2", "predictions": 3}
+    ]
+
+
+def test_replay_as_fast_as_possible(tmp_path):
+    in_flight, most_in_flight = 0, 0
+
+    async def api(request):
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        body = json.loads(request.content)
+        if request.url.path == "/predict":
+            return httpx.Response(200, json=prediction(body["tenure"] / 100, "v2"))
+        return httpx.Response(
+            200,
+            json={"predictions": [prediction(0.5, "v2") for _ in body["customers"]]},
+        )
+
+    records = [
+        {
+            "timestamp": 1e9 + i * 3600,
+            "endpoint": "/predict",
+            "request": {"tenure": 10 * i},
+            "response": prediction(0.1 * i),
+        }
+        for i in range(5)
+    ]
+    records += [
+        {
+            "endpoint": "/batch_predict",
+            "request": {"customers": [{}, {}]},
+            "response": {"predictions": [prediction(0.5)] * 3},
+        },
+        {"endpoint": "/model/info", "request": {}},
+        {"endpoint": "/predict"},
+    ]
+    args = SimpleNamespace(
+        speed=0,
+        connections=2,
+        max_in_flight=100,
+        save_responses=tmp_path / "replayed.jsonl",
+    )
+
+    async def run():
+        transport = httpx.MockTransport(api)
+        async with httpx.AsyncClient(base_url="http://api", transport=transport) as c:
+            replayer = Replayer(c, args)
+            # Hours apart in the recording, but nothing waits at speed 0
+            elapsed = await replayer.run(iter(records))
+        return replayer, elapsed
+
+    replayer, elapsed = asyncio.run(run())
+    assert elapsed < 1
+    assert most_in_flight == 2
+    assert replayer.total.ok == 6
+    assert (replayer.skipped, replayer.dropped) == (2, 0)
+    drift = replayer.drift.summary()
+    assert drift["compared"] == 7
+    assert drift["missing"] == 1
+    assert drift["max_probability_delta"] == pytest.approx(0)
+    saved = (tmp_path / "replayed.jsonl").read_text().splitlines()
+    assert len(saved) == 6
+    assert {json.loads(line)["endpoint"] for line in saved} == {
+        "/predict",
+        "/batch_predict",
+    }
@@ -0,0 +1,182 @@
+# tests/test_search.py
+
+import pytest
+
+from app import search
+from app.bundle import load_bundle
+from app.model import ChurnPredictor
+from app.train import Selection, Split
+from tests.conftest import make_customers
+from tests.test_train import write_training_csv
+
+
+def test_rung_sizes_grow_by_eta_up_to_all_rows():
+    assert search.rung_sizes(1000, 50, 3) == [50, 150, 450, 1000]
+    assert search.rung_sizes(100, 100, 3) == [100]
+
+
+def test_trials_are_shared_between_candidates():
+    trials = search.sample_trials(
+        ["LogisticRegression", "RandomForestClassifier"], n_trials=5
+    )
+
+    assert [t["name"] for t in trials] == ["LogisticRegression"] * 3 + [
+        "RandomForestClassifier"
+    ] * 2
+    assert [t["id"] for t in trials] == list(range(5))
+    assert all(isinstance(t["params"]["C"], float) for t in trials[:3])
+
+
+def test_successive_halving_promotes_the_best_and_exports_a_bundle(tmp_path):
+    write_training_csv(tmp_path / "churn.csv", n=1000)
+    output = tmp_path / "model" / "churn_bundle.joblib"
+
+    results = search.search(
+        tmp_path / "churn.csv",
+        output,
+        cache_dir=tmp_path / "cache",
+        candidates=["LogisticRegression"],
+        n_trials=9,
+        eta=3,
+        min_rows=50,
+        split=Split(cv_folds=4),
+        n_jobs=2,
+    )
+
+    # 9 trials on 50 rows, the best 3 on 150 rows, the best 1 on 450 rows
+    trials = results["trials"]
+    fitted = [sum(len(t["rungs"]) > rung for t in trials) for rung in range(4)]
+    assert fitted == [9, 3, 1, 0]
+    assert [step["rows"] for step in results["best"]["rungs"]] == [50, 150, 450]
+    for rung in range(2):
+        scores = {
+            t["id"]: t["rungs"][rung]["auc_roc"]
+            for t in trials
+            if len(t["rungs"]) > rung
+        }
+        promoted = {t["id"] for t in trials if len(t["rungs"]) > rung + 1}
+        assert min(scores[i] for i in promoted) >= max(
+            score for i, score in scores.items() if i not in promoted
+        )
+
+    payload = load_bundle(output)
+    assert payload["metadata"]["params"] == results["best"]["params"]
+    assert payload["model"].C == results["best"]["params"]["C"]
+    predictor = ChurnPredictor()
+    predictor.model_path = output.parent
+    assert predictor.load_model()
+    assert len(predictor.predict_batch(make_customers(3, seed=51))) == 3
+
+
+def test_finalists_are_the_last_rung_with_a_choice():
+    def trial(id, *aucs):
+        return {"id": id, "rungs": [{"auc_roc": auc} for auc in aucs]}
+
+    trials = [trial(0, 0.6), trial(1, 0.7, 0.8, 0.9), trial(2, 0.8, 0.85)]
+    rung, finalists = search.finalists(trials)
+    assert rung == 1
+    assert [t["id"] for t in finalists] == [2, 1]
+    assert search.finalists(trials[:1]) == (0, trials[:1])
+
+
+@pytest.mark.parametrize(
+    "selection, chosen",
+    [
+        (Selection(), 0),
+        (Selection(latency_budget_ms=5), 1),
+        (Selection(max_auc_loss=1.0), 2),
+    ],
+)
+def test_finalists_are_chosen_within_the_latency_budget(
+    tmp_path, monkeypatch, selection, chosen
+):
+    write_training_csv(tmp_path / "churn.csv", n=300)
+    output = tmp_path / "model" / "churn_bundle.joblib"
+    # The best finalist is the slowest, the third the fastest
+    timings = iter([10.0, 2.0, 1.0])
+
+    def fake_latency(*args):
+        ms = next(timings)
+        return {"single_row_p50_ms": ms, "single_row_p99_ms": ms, "size_bytes": 1}
+
+    monkeypatch.setattr(search, "measure_inference", fake_latency)
+    results = search.search(
+        tmp_path / "churn.csv",
+        output,
+        candidates=["LogisticRegression"],
+        n_trials=9,
+        min_rows=50,
+        selection=selection,
+    )
+
+    assert len(results["finalists"]) == 3
+    assert results["best"]["id"] == results["finalists"][chosen]
+    metadata = load_bundle(output)["metadata"]
+    assert metadata["params"] == results["best"]["params"]
+    assert metadata["selection"]["max_auc_loss"] == selection.max_auc_loss
+
+
+def test_nothing_is_written_if_no_finalist_meets_the_budget(tmp_path):
+    write_training_csv(tmp_path / "churn.csv", n=300)
+    output = tmp_path / "model" / "churn_bundle.joblib"
+
+    with pytest.raises(ValueError, match="meets the latency budget"):
+        search.search(
+            tmp_path / "churn.csv",
+            output,
+            candidates=["LogisticRegression"],
+            n_trials=3,
+            min_rows=50,
+            selection=Selection(latency_budget_ms=1e-6),
+        )
+    assert not output.exists()
+
+
+def test_search_is_logged_as_nested_mlflow_runs(tmp_path):
+    mlflow = pytest.importorskip("mlflow")
+    write_training_csv(tmp_path / "churn.csv", n=300)
+    tracking_uri = f"sqlite:///{tmp_path / 'mlflow.db'}"
+
+    results = search.search(
+        tmp_path / "churn.csv",
+        tmp_path / "churn_bundle.joblib",
+        candidates=["LogisticRegression"],
+        n_trials=3,
+        min_rows=50,
+        experiment="search-test",
+        tracking_uri=tracking_uri,
+    )
+
+    runs = mlflow.search_runs(experiment_names=["search-test"])
+    assert len(runs) == 1 + len(results["trials"])
+    parent = runs[runs["tags.mlflow.runName"] == "successive-halving"].run_id.item()
+    assert (runs["tags.mlflow.parentRunId"] == parent).sum() == len(results["trials"])
+
+
+def test_an_interrupted_search_keeps_the_rungs_it_logged(tmp_path, monkeypatch):
+    mlflow = pytest.importorskip("mlflow")
+    write_training_csv(tmp_path / "churn.csv", n=300)
+    tracking_uri = f"sqlite:///{tmp_path / 'mlflow.db'}"
+    refit = search.run_tasks
+
+    def crash_on_refit(tasks, n_jobs):
+        if tasks[0][3] is None:
+            raise KeyboardInterrupt
+        return refit(tasks, n_jobs)
+
+    monkeypatch.setattr(search, "run_tasks", crash_on_refit)
+    with pytest.raises(KeyboardInterrupt):
+        search.search(
+            tmp_path / "churn.csv",
+            tmp_path / "churn_bundle.joblib",
+            candidates=["LogisticRegression"],
+            n_trials=3,
+            min_rows=50,
+            experiment="search-test",
+            tracking_uri=tracking_uri,
+        )
+
+    runs = mlflow.search_runs(experiment_names=["search-test"])
+    trials = runs[runs["tags.mlflow.parentRunId"].notna()]
+    assert len(trials) == 3
+    assert trials["metrics.validation_auc"].notna().all()
@@ -0,0 +1,100 @@
+# tests/test_timing.py
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app import config
+from app.main import app
+from app.timing import StageTimer, call_timed, stage
+from tests.conftest import make_customers
+
+client = TestClient(app)
+
+
+def stage_count(endpoint, name, per_row=False):
+    metric = (
+        "churn_stage_latency_per_row_seconds"
+        if per_row
+        else "churn_stage_latency_seconds"
+    )
+    value = REGISTRY.get_sample_value(
+        f"{metric}_count", {"endpoint": endpoint, "stage": name}
+    )
+    return value or 0.0
+
+
+def test_call_timed_records_pipeline_stages(fitted_predictor):
+    customers = make_customers(10, seed=50)
+
+    (scored, errors, _), durations, elapsed = call_timed(
+        fitted_predictor.predict_batch_arrays, customers
+    )
+
+    assert not errors
+    assert set(durations) == {"preprocess", "scale", "predict"}
+    assert all(seconds >= 0 for seconds in durations.values())
+    assert sum(durations.values()) <= elapsed
+
+
+def test_stage_without_active_timer_is_a_no_op():
+    timer = StageTimer()
+    with stage("predict"):
+        pass
+    assert timer.durations == {}
+
+
+def test_server_timing_header():
+    timer = StageTimer()
+    timer.add("predict", 0.0015)
+    timer.add("predict", 0.0005)
+    timer.add("serialize", 0.00025)
+    assert timer.server_timing() == "predict;dur=2.000, serialize;dur=0.250"
+
+
+def test_batch_predict_stage_metrics(loaded_predictor, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_TIMING_ENABLED", True)
+    before = stage_count("batch_predict", "predict")
+    before_per_row = stage_count("batch_predict", "predict", per_row=True)
+
+    response = client.post(
+        "/batch_predict", json={"customers": make_customers(5, seed=51)}
+    )
+
+    assert response.status_code == 200
+    stages = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert set(stages) == {
+        "parse",
+        "validate",
+        "queue",
+        "preprocess",
+        "scale",
+        "predict",
+        "serialize",
+    }
+    assert stage_count("batch_predict", "predict") == before + 1
+    assert stage_count("batch_predict", "predict", per_row=True) == before_per_row + 1
+
+
+def test_predict_server_timing(loaded_predictor, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_TIMING_ENABLED", True)
+
+    response = client.post("/predict", json=make_customers(1, seed=52)[0])
+
+    assert response.status_code == 200
+    assert "preprocess;dur=" in response.headers["Server-Timing"]
+
+
+def test_stage_timing_disabled(loaded_predictor, monkeypatch):
+    monkeypatch.setattr(config, "STAGE_TIMING_ENABLED", False)
+    monkeypatch.setattr(config, "SERVER_TIMING_ENABLED", True)
+    before = stage_count("batch_predict", "predict")
+
+    response = client.post(
+        "/batch_predict", json={"customers": make_customers(5, seed=53)}
+    )
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    assert stage_count("batch_predict", "predict") == before
@@ -0,0 +1,153 @@
+# tests/test_train.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import train
+from app.bundle import load_bundle
+from app.model import ChurnPredictor
+from tests.conftest import make_customers, make_training_frame
+
+
+def write_training_csv(path, n=500, seed=42):
+    """Raw customers and target, the same rows make_training_frame encodes"""
+    df = pd.DataFrame(make_customers(n, seed))
+    rng = np.random.default_rng(seed)
+    df["Churn"] = rng.choice(["Yes", "No"], n, p=[0.27, 0.73])
+    df.insert(0, "customerID", [f"ID_{i}" for i in range(n)])
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_features_match_notebook_pipeline(tmp_path):
+    write_training_csv(tmp_path / "churn.csv")
+
+    dataset, cached = train.prepare_dataset(tmp_path / "churn.csv", tmp_path / "cache")
+    X, y = train.load_matrix(dataset.directory)
+
+    expected_X, expected_y = make_training_frame()
+    assert not cached
+    assert sorted(dataset.feature_names) == sorted(expected_X.columns)
+    np.testing.assert_allclose(X, expected_X[dataset.feature_names].to_numpy(float))
+    np.testing.assert_array_equal(y, expected_y.to_numpy())
+
+
+def test_encoded_matrix_is_cached_by_content(tmp_path):
+    df = write_training_csv(tmp_path / "churn.csv", n=200)
+    cache = tmp_path / "cache"
+
+    first, cached_first = train.prepare_dataset(tmp_path / "churn.csv", cache)
+    second, cached_second = train.prepare_dataset(tmp_path / "churn.csv", cache)
+    df.iloc[:100].to_csv(tmp_path / "churn.csv", index=False)
+    changed, cached_changed = train.prepare_dataset(tmp_path / "churn.csv", cache)
+
+    assert (cached_first, cached_second, cached_changed) == (False, True, False)
+    assert second.directory == first.directory
+    assert changed.directory != first.directory
+    assert changed.rows == 100
+    assert not list(cache.glob("*.tmp"))
+
+
+def test_unusable_rows_are_dropped(tmp_path):
+    df = write_training_csv(tmp_path / "churn.csv", n=100)
+    df.loc[3, "gender"] = "Unknown"
+    df.loc[4, "Churn"] = None
+    df.loc[5, "TotalCharges"] = None
+    df.to_csv(tmp_path / "churn.csv", index=False)
+
+    dataset, _ = train.prepare_dataset(tmp_path / "churn.csv", tmp_path / "cache")
+    X, y = train.load_matrix(dataset.directory)
+
+    # Blank TotalCharges are filled with the median, as in the notebook
+    assert dataset.rows == len(X) == len(y) == 98
+    assert not np.isnan(X).any()
+
+
+def test_train_writes_best_model_bundle(tmp_path):
+    write_training_csv(tmp_path / "churn.csv", n=400)
+    output = tmp_path / "model" / "churn_bundle.joblib"
+
+    results = train.train(
+        tmp_path / "churn.csv",
+        output,
+        cache_dir=tmp_path / "cache",
+        candidates=["LogisticRegression", "RandomForestClassifier"],
+        split=train.Split(cv_folds=3),
+        n_jobs=2,
+    )
+
+    cv_aucs = {
+        name: candidate["cv_auc_mean"]
+        for name, candidate in results["candidates"].items()
+    }
+    assert results["best"] == max(cv_aucs, key=cv_aucs.get)
+    payload = load_bundle(output)
+    assert type(payload["model"]).__name__ == results["best"]
+    assert payload["metadata"]["training_rows"] == 400
+    assert (
+        payload["metadata"]["latency"]
+        == results["candidates"][results["best"]]["latency"]
+    )
+    assert all(c["size_bytes"] > 0 for c in results["candidates"].values())
+    profile = payload["metadata"]["drift_profile"]
+    assert sum(profile["probability"]["counts"]) == 80
+    assert sum(profile["categorical"]["Contract"]["counts"]) == 400
+
+    predictor = ChurnPredictor()
+    predictor.model_path = output.parent
+    assert predictor.load_model()
+    scored = predictor.predict_batch(make_customers(5, seed=50))
+    assert all(0 <= r["churn_probability"] <= 1 for r in scored)
+
+
+def candidate(auc, p50_ms, p99_ms=None):
+    return {
+        "cv_auc_mean": auc,
+        "latency": {
+            "single_row_p50_ms": p50_ms,
+            "single_row_p99_ms": p99_ms or p50_ms,
+            "batch_p99_ms": p50_ms * 100,
+        },
+    }
+
+
+def test_selection_trades_auc_for_latency_within_limits():
+    summary = {
+        "linear": candidate(0.840, 0.2),
+        "forest": candidate(0.845, 5.0, p99_ms=9.0),
+        "boosting": candidate(0.850, 1.0),
+    }
+
+    assert train.choose_model(summary, train.Selection()) == "boosting"
+    assert train.choose_model(summary, train.Selection(max_auc_loss=0.01)) == "linear"
+    assert (
+        train.choose_model(summary, train.Selection(max_auc_loss=0.006)) == "boosting"
+    )
+    assert (
+        train.choose_model(summary, train.Selection(batch_latency_budget_ms=50))
+        == "linear"
+    )
+    assert sorted(
+        train.pareto_front(
+            {
+                name: (c["cv_auc_mean"], c["latency"]["single_row_p50_ms"])
+                for name, c in summary.items()
+            }
+        )
+    ) == ["boosting", "linear"]
+
+
+def test_nothing_is_written_when_no_model_meets_the_latency_budget(tmp_path):
+    write_training_csv(tmp_path / "churn.csv", n=200)
+    output = tmp_path / "churn_bundle.joblib"
+
+    with pytest.raises(ValueError, match="latency budget"):
+        train.train(
+            tmp_path / "churn.csv",
+            output,
+            candidates=["LogisticRegression"],
+            split=train.Split(cv_folds=0),
+            selection=train.Selection(latency_budget_ms=1e-6),
+        )
+    assert not output.exists()
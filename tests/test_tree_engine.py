@@ -0,0 +1,95 @@
+# tests/test_tree_engine.py
+
+import numpy as np
+import pytest
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.tree import DecisionTreeClassifier
+
+from app import config, tree_engine
+from app.model import ChurnPredictor
+from app.tree_engine import TreeEnsembleEngine
+from tests.conftest import make_customers, save_artifacts
+
+TREE_MODELS = [
+    RandomForestClassifier(n_estimators=30, random_state=42),
+    ExtraTreesClassifier(n_estimators=30, random_state=42),
+    GradientBoostingClassifier(n_estimators=30, random_state=42),
+    DecisionTreeClassifier(max_depth=8, random_state=42),
+]
+
+
+@pytest.fixture
+def tree_predictor(fitted_predictor, training_data, request):
+    X, y = training_data
+    fitted_predictor.model = request.param.fit(fitted_predictor.scaler.transform(X), y)
+    return fitted_predictor
+
+
+@pytest.mark.parametrize(
+    "tree_predictor", TREE_MODELS, indirect=True, ids=lambda m: type(m).__name__
+)
+def test_engine_matches_predict_proba(tree_predictor, monkeypatch):
+    # Small blocks so the batch is walked in several pieces
+    monkeypatch.setattr(tree_engine, "BLOCK_CELLS", 500)
+    X, errors = tree_predictor.preprocess_batch(make_customers(300, seed=30))
+    assert not errors
+    X = tree_predictor.scale(X)
+
+    engine = TreeEnsembleEngine.from_estimator(tree_predictor.model)
+    expected = tree_predictor.model.predict_proba(X)
+    np.testing.assert_allclose(engine.predict_proba(X), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(
+        engine.predict_proba(X[:1]), expected[:1], rtol=0, atol=1e-12
+    )
+
+
+def test_unsupported_models(fitted_predictor, training_data):
+    X, y = training_data
+    X_scaled = fitted_predictor.scaler.transform(X)
+    exponential = GradientBoostingClassifier(
+        loss="exponential", n_estimators=5, random_state=42
+    ).fit(X_scaled, y)
+
+    assert TreeEnsembleEngine.from_estimator(fitted_predictor.model) is None
+    assert TreeEnsembleEngine.from_estimator(exponential) is None
+
+
+def test_engine_rejects_wrong_feature_count(fitted_predictor, training_data):
+    X, y = training_data
+    model = DecisionTreeClassifier(max_depth=3).fit(X, y)
+    engine = TreeEnsembleEngine.from_estimator(model)
+    with pytest.raises(ValueError):
+        engine.predict_proba(np.zeros((2, X.shape[1] + 1)))
+
+
+@pytest.mark.parametrize("fused", [False, True])
+@pytest.mark.parametrize(
+    "tree_predictor", TREE_MODELS[:1], indirect=True, ids=lambda m: type(m).__name__
+)
+def test_predictor_routes_small_batches_to_engine(
+    tree_predictor, tmp_path, monkeypatch, fused
+):
+    save_artifacts(tree_predictor, tmp_path)
+    monkeypatch.setattr(config, "TREE_ENGINE", True)
+    monkeypatch.setattr(config, "FUSED_SCALER", fused)
+    monkeypatch.setattr(config, "TREE_ENGINE_MAX_ROWS", 10)
+
+    predictor = ChurnPredictor()
+    predictor.model_path = tmp_path
+    assert predictor.load_model()
+    assert predictor.tree_engine is not None
+    assert predictor.inference_mode == ("fused+compiled" if fused else "compiled")
+
+    customers = make_customers(40, seed=31)
+    expected = tree_predictor.predict_batch(customers)
+    for size in (1, 10, 40):
+        results = predictor.predict_batch(customers[:size])
+        for result, reference in zip(results, expected):
+            assert result["churn_probability"] == pytest.approx(
+                reference["churn_probability"], abs=1e-12
+            )
+            assert result["risk_level"] == reference["risk_level"]
@@ -0,0 +1,90 @@
+# tests/test_validation.py
+
+import math
+
+import pytest
+
+from app.features import FeatureEncoder
+from app.schema import CustomerData
+from app.validation import CustomerValidator
+from tests.conftest import make_customers
+
+
+@pytest.fixture
+def validator(fitted_predictor):
+    return CustomerValidator(FeatureEncoder(fitted_predictor.feature_names))
+
+
+def test_valid_batch_has_no_errors(validator):
+    assert validator.validate(make_customers(200, seed=50)) == []
+
+
+def test_accepts_what_pydantic_accepts(validator):
+    customer = make_customers(1, seed=51)[0]
+    customer["tenure"] = 12.0
+    customer["SeniorCitizen"] = True
+    customer["MonthlyCharges"] = "70.5"
+    customer["TotalCharges"] = "1e3"
+    expected = CustomerData(**customer).model_dump()
+    assert validator.validate_one(customer) == []
+    assert customer["MonthlyCharges"] == expected["MonthlyCharges"] == 70.5
+    assert customer["TotalCharges"] == expected["TotalCharges"] == 1000.0
+
+
+@pytest.mark.parametrize(
+    "field, value, error_type",
+    [
+        ("InternetService", "Cable", "literal_error"),
+        ("Contract", 3, "string_type"),
+        ("gender", ["Male"], "string_type"),
+        ("tenure", 12.5, "int_from_float"),
+        ("tenure", 101, "less_than_equal"),
+        ("tenure", "twelve", "int_parsing"),
+        ("tenure", "12.5", "int_parsing"),
+        ("tenure", [12], "int_type"),
+        ("MonthlyCharges", " 70", "float_parsing"),
+        ("SeniorCitizen", -1, "greater_than_equal"),
+        ("MonthlyCharges", 0, "greater_than"),
+        ("TotalCharges", math.nan, "greater_than"),
+        ("TotalCharges", None, "float_type"),
+    ],
+)
+def test_invalid_values(validator, field, value, error_type):
+    customers = make_customers(4, seed=52)
+    customers[2][field] = value
+
+    errors = validator.validate(customers)
+
+    assert len(errors) == 1
+    assert errors[0]["loc"] == ["body", "customers", 2, field]
+    assert errors[0]["type"] == error_type
+
+
+def test_missing_fields_and_non_objects(validator):
+    customers = make_customers(2, seed=53)
+    del customers[0]["Contract"]
+    del customers[0]["tenure"]
+    customers.append("not a customer")
+
+    errors = validator.validate(customers)
+
+    assert [(e["loc"], e["type"]) for e in errors] == [
+        (["body", "customers", 0, "tenure"], "missing"),
+        (["body", "customers", 0, "Contract"], "missing"),
+        (["body", "customers", 2], "model_type"),
+    ]
+
+
+def test_vocabulary_comes_from_the_model():
+    encoder = FeatureEncoder(
+        ["tenure", "Contract_Month-to-month", "Contract_One year", "gender"]
+    )
+    validator = CustomerValidator(encoder)
+    customer = make_customers(1, seed=54)[0]
+
+    customer["Contract"] = "Two year"
+    assert validator.validate_one(customer)[0]["loc"] == ["body", "Contract"]
+    # No dummies for InternetService in this model, so any string is accepted
+    customer["Contract"] = "One year"
+    customer["InternetService"] = "Cable"
+    assert validator.validate_one(customer) == []